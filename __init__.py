@@ -9,18 +9,37 @@ AI 팀이 구현한 실제 AI 모듈들:
 # AI 팀 함수들을 직접 import
 from ai_modules.classifier.classifier_logic import (
     analyze_user_query,
+    enable_semantic_crisis_detection,
     start_initial_conversation,
     start_diagnosis_flow,
-    determine_victim_status
+    determine_victim_status,
+    explain_victim_status
 )
 
-from ai_modules.rag_engine.run_chain import get_rag_response
+from ai_modules.rag_engine.run_chain import (
+    get_rag_response,
+    aget_rag_response,
+    stream_rag_response,
+    astream_rag_response,
+    batch_rag_responses,
+    get_engine
+)
+
+from ai_modules.rag_engine.precomputed_answers import get_precomputed_answer
 
 __all__ = [
     'analyze_user_query',
+    'enable_semantic_crisis_detection',
     'start_initial_conversation', 
     'start_diagnosis_flow',
     'determine_victim_status',
-    'get_rag_response'
+    'explain_victim_status',
+    'get_rag_response',
+    'aget_rag_response',
+    'stream_rag_response',
+    'astream_rag_response',
+    'batch_rag_responses',
+    'get_engine',
+    'get_precomputed_answer'
 ]
 
@@ -1,5 +1,16 @@
+import os
+
 from langchain_core.prompts import ChatPromptTemplate
 
+try:
+    from .keyword_matcher import KeywordMatcher
+    from .crisis_detector import SemanticCrisisDetector
+    from .eligibility import EligibilityRules, format_explanation
+except ImportError:
+    from keyword_matcher import KeywordMatcher
+    from crisis_detector import SemanticCrisisDetector
+    from eligibility import EligibilityRules, format_explanation
+
 # ==============================================================================
 # 0. 설정 및 상수
 # ==============================================================================
@@ -21,23 +32,101 @@ EMOTION_KEYWORDS = {
 }
 
 
+# 감정 키워드 매처 (import 시 한 번만 컴파일, 우선순위: crisis > shock > confused)
+EMOTION_MATCHER = KeywordMatcher(EMOTION_KEYWORDS)
+
+# 임베딩 기반 2차 위기 감지기 (enable_semantic_crisis_detection()으로 설정, 기본 비활성)
+CRISIS_DETECTOR = None
+
+# main.py/test_cli.py에서 2차 위기 감지를 켤지 여부 (CRISIS_SEMANTIC=1일 때만)
+SEMANTIC_CRISIS_ENABLED = os.getenv("CRISIS_SEMANTIC", "0") == "1"
+
+# 2차 감지에서만 위기가 의심될 때 덧붙이는 안내 (상담은 계속 진행)
+CRISIS_NOTICE = """
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+💙 혹시 마음이 많이 힘드시다면 혼자 견디지 마세요
+자살예방상담전화 ☎️ 1393 (24시간 무료)
+정신건강 위기상담 ☎️ 1577-0199
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+
+
+# 피해자 요건 진단 질문/규칙 (eligibility_rules.json, import 시 조회 테이블로 컴파일)
+ELIGIBILITY_RULES = EligibilityRules.load()
+
+# 진단 질문 [(질문, 요건 키), ...] (start_diagnosis_flow, test_cli.run_diagnosis 공용)
+DIAGNOSIS_QUESTIONS = ELIGIBILITY_RULES.questions
+
+# determine_victim_status()가 반환할 수 있는 진단 결과 전체 (답변 사전 생성 등에서 사용)
+VICTIM_STATUSES = ELIGIBILITY_RULES.outcomes
+
+
 SYSTEM_PROMPT_PATH = "classifier/system_prompt.txt"
 
 # ==============================================================================
 # 1. 감정 감지
 # ==============================================================================
+def enable_semantic_crisis_detection(embed_fn, embed_batch_fn=None, threshold: float = None):
+    """
+    키워드에 없는 위기 표현을 임베딩 유사도로 감지하도록 설정합니다.
+
+    Args:
+        embed_fn: 문장 임베딩 함수 (RAG 엔진의 embed_query를 넘기면 모델을 새로 로드하지 않음)
+        embed_batch_fn: 여러 문장 임베딩 함수 (선택)
+        threshold: 고정 임계값 (선택, 기본은 예시 문장으로 보정)
+    """
+    global CRISIS_DETECTOR
+    CRISIS_DETECTOR = SemanticCrisisDetector(embed_fn, embed_batch_fn, threshold=threshold)
+    return CRISIS_DETECTOR
+
+
 def analyze_user_query(text: str) -> dict:
-    """사용자의 입력에서 위기/충격/혼란 상황을 감지합니다."""
-    processed = text.replace(" ", "")  # 띄어쓰기 제거
+    """
+    사용자의 입력에서 위기/충격/혼란 상황을 감지합니다. (띄어쓰기 무시)
+
+    키워드로 crisis가 아니고 임베딩 감지기가 설정되어 있으면 2차로 의미 유사도를 검사합니다.
+    2차 검사 결과는 status를 바꾸지 않고 crisis_notice(상담전화 안내 여부)로만 표시합니다.
 
-    # EMOTION_KEYWORDS 딕셔너리를 순회하도록 수정
-    for status, keywords in EMOTION_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword.replace(" ", "") in processed:
-                # status 변수('crisis', 'shock', 'confused')를 그대로 사용
-                return {"status": status, "keyword": keyword}
+    Returns:
+        {"status": 'crisis'|'shock'|'confused'|'normal', "keyword": 대표 키워드,
+         "matches": [{"status", "keyword", "start", "end"}, ...],
+         "semantic": 임베딩 감지 결과, "crisis_notice": bool (2차 검사를 한 경우)}
+    """
+    return analyze_user_queries([text])[0]
+
+
+def analyze_user_queries(texts: list) -> list:
+    """
+    여러 메시지(대화 기록 등)를 한 번에 검사합니다. 결과 형식은 analyze_user_query와 같습니다.
+
+    키워드 검사는 같은 오토마톤(EMOTION_MATCHER)을 쓰고, 2차 임베딩 검사가 필요한 메시지는
+    모아서 한 번에 임베딩합니다.
+    """
+    results = EMOTION_MATCHER.classify_batch(texts)
+    if CRISIS_DETECTOR is None:
+        return results
+
+    pending = [i for i, (text, result) in enumerate(zip(texts, results))
+               if result["status"] != "crisis" and text.strip()]
+    if not pending:
+        return results
+
+    try:
+        semantics = CRISIS_DETECTOR.detect_batch([texts[i] for i in pending])
+    except Exception as e:
+        # 임베딩 모델을 쓸 수 없으면 키워드 결과만 사용
+        print(f"  ⚠️ 임베딩 위기 감지 실패 (키워드 감지만 사용): {e}")
+        return results
+
+    for i, semantic in zip(pending, semantics):
+        _apply_semantic(results[i], semantic)
+    return results
 
-    return {"status": "normal"}
+
+def _apply_semantic(result: dict, semantic: dict) -> None:
+    # 임베딩 모델의 오탐으로 상담이 끝나지 않도록 키워드 판정은 그대로 두고 안내만 추가
+    result["semantic"] = semantic
+    result["crisis_notice"] = semantic["status"] == "crisis"
 
 
 # ==============================================================================
@@ -51,6 +140,8 @@ def start_initial_conversation(user_input: str = None) -> dict:
         user_input = input("사용자: ").strip()
     
     emotion = analyze_user_query(user_input)
+    if emotion.get("crisis_notice"):
+        print(f"\nAI 붱: {CRISIS_NOTICE}")
 
     # 각 감정 단계별 안내
     if emotion["status"] == "crisis":
@@ -95,34 +186,23 @@ def start_initial_conversation(user_input: str = None) -> dict:
 # 3. 피해자 요건 진단
 # ==============================================================================
 def determine_victim_status(user_data: dict) -> str:
-    req1 = user_data.get("요건1_대항력", False)
-    req2 = user_data.get("요건2_보증금액", False)
-    req3 = user_data.get("요건3_다수피해", False)
-    req4 = user_data.get("요건4_사기의도", False)
-    exc1 = user_data.get("제외_보증보험", False)
-    exc2 = user_data.get("제외_최우선변제", False)
-    exc3 = user_data.get("제외_자력회수", False)
-
-    if exc1 or exc2 or exc3:
-        return "지원 제외 대상"
-    if req1 and req2 and req3 and req4:
-        return "피해자 결정 (모든 지원 가능)"
-    if not req1 and req2 and req4:
-        return "피해자 결정 (금융지원 및 긴급복지 가능)"
-    if req1 and not req2 and req3 and req4:
-        return "피해자 결정 (조세채권 안분 지원 가능)"
-    return "지원 요건 미충족"
-
-def start_diagnosis_flow() -> str:
-    questions = [
-        ("주택 인도, 전입신고, 확정일자를 모두 갖추셨나요? (임차권 등기 포함)", "요건1_대항력"),
-        ("임대차 보증금이 5억 원 이하인가요?", "요건2_보증금액"),
-        ("집주인의 파산, 경매 등으로 2인 이상 임차인에게 피해가 발생했나요?", "요건3_다수피해"),
-        ("임대인이 보증금을 돌려줄 의사나 능력이 없었다고 의심되나요?", "요건4_사기의도"),
-        ("전세보증금 반환 보증보험에 가입되어 있나요?", "제외_보증보험"),
-        ("소액임차인 최우선변제 제도로 보증금 '전액'을 돌려받을 수 있나요?", "제외_최우선변제"),
-        ("대항력(경매 신청 등)을 통해 보증금 '전액'을 직접 회수할 수 있나요?", "제외_자력회수")
-    ]
+    """7개 요건/제외 답변(답이 없으면 '아니오')으로 진단 결과를 반환합니다."""
+    return ELIGIBILITY_RULES.classify(user_data)
+
+
+def explain_victim_status(user_data: dict) -> dict:
+    """진단 결과와, 더 높은 지원 등급을 받지 못한 요건을 반환합니다. (EligibilityRules.explain 참고)"""
+    return ELIGIBILITY_RULES.explain(user_data)
+
+
+def start_diagnosis_flow(user_data: dict = None) -> str:
+    """
+    진단 질문을 묻고 결과를 반환합니다.
+
+    user_data: 이미 받은 답변 (API 호출 시). 주어지면 질문하지 않습니다.
+    """
+    if user_data is not None:
+        return determine_victim_status(user_data)
 
     user_data = {}
     print("\nAI 붱: 아래 질문에 '예' 또는 '아니오'로 답해주세요.\n")
@@ -139,11 +219,14 @@ def start_diagnosis_flow() -> str:
             else:
                 print("⚠️ '예' 또는 '아니오'로만 답변해주세요.")
 
-    for q_text, q_key in questions:
+    for q_text, q_key in DIAGNOSIS_QUESTIONS:
         ask(q_text, q_key)
 
-    result = determine_victim_status(user_data)
+    explanation = explain_victim_status(user_data)
+    result = explanation["result"]
     print(f"\n📊 [진단 결과] 붱의 판단: {result}")
+    if explanation["unmet"]:
+        print(format_explanation(explanation, include_result=False))
     return result
 
 # ==============================================================================
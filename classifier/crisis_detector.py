@@ -0,0 +1,206 @@
+"""
+Crisis Detector
+
+키워드에 없는 위기 표현(바꿔 말하기)을 잡기 위한 임베딩 기반 2차 위기 감지기
+
+- 1차: EMOTION_KEYWORDS 키워드 매칭 (비용 없음, 여기서 crisis면 임베딩하지 않음)
+- 2차: 메시지 임베딩과 위기 예시 문장 그룹별 중심 벡터(centroid)의 코사인 유사도
+- 임계값은 예시 문장으로 보정: 위기 예시(자기 그룹에서 빼고 계산한 중심 벡터 기준)와
+  일반 상담 예시가 완전히 나뉘면 두 경계의 중간값, 겹치면 (위기 재현율 - 일반 오탐률)이
+  가장 큰 위기 예시 점수 (같으면 낮은 쪽 = 재현율 우선)
+- 예시 문장 임베딩(및 모델 로드)은 warm_up()으로 미리 수행 (첫 메시지에서 기다리지 않도록)
+- 임베딩 모델은 새로 로드하지 않고 RAG 엔진의 질의 임베딩 함수(LRU 캐시)를 주입받아 사용
+"""
+
+import os
+import threading
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+
+# 위기 예시 문장 (그룹마다 중심 벡터 하나)
+CRISIS_EXEMPLARS = {
+    "자살 사고": [
+        "죽고 싶다는 생각이 자꾸 들어요",
+        "차라리 죽는 게 나을 것 같아요",
+        "스스로 목숨을 끊을까 생각했어요",
+        "이번 일로 모든 걸 끝내려고 해요",
+    ],
+    "무망감": [
+        "더 이상 살아갈 자신이 없어요",
+        "앞으로 살아갈 희망이 하나도 없어요",
+        "이렇게 살아서 뭐 하나 싶어요",
+        "살아야 할 이유를 모르겠어요",
+    ],
+    "소멸 욕구": [
+        "세상에서 사라져 버리고 싶어요",
+        "아무도 모르게 없어지고 싶어요",
+        "잠들어서 다시는 깨어나지 않았으면 좋겠어요",
+        "다 내려놓고 영원히 떠나고 싶어요",
+    ],
+    "작별 및 계획": [
+        "가족에게 마지막 인사를 남겼어요",
+        "유서를 써 놓았어요",
+        "약을 잔뜩 모아 두었어요",
+        "지금 옥상에 올라와 있어요",
+    ],
+}
+
+# 임계값 보정용 일반 상담 예시 (위기로 판단하면 안 되는 문장)
+NORMAL_EXEMPLARS = [
+    "보증금을 돌려받지 못할 것 같아요",
+    "전세사기 피해자 지원 신청은 어떻게 하나요?",
+    "디딤돌 대출 금리가 얼마인가요?",
+    "집주인이 연락이 안 돼요",
+    "경매가 진행된다는 통지를 받았어요",
+    "너무 화가 나고 억울해요",
+    "이사를 가야 하는데 돈이 없어요",
+    "긴급 주거비 지원을 받을 수 있나요?",
+    "변호사 상담을 받고 싶어요",
+    "요즘 스트레스 때문에 너무 힘들어요",
+]
+
+# 환경 변수로 보정된 임계값을 덮어쓸 수 있음 (예: 0.55)
+THRESHOLD_ENV = "CRISIS_SEMANTIC_THRESHOLD"
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def _overlap_threshold(positive_scores: np.ndarray, negative_scores: np.ndarray) -> float:
+    """
+    위기/일반 예시 점수가 겹칠 때의 임계값: 위기 예시 점수 중 (재현율 - 오탐률)이 가장 큰 값
+
+    일반 예시의 최대 점수 바로 위로 잡으면 위기 예시 대부분이 임계값 아래로 내려가
+    2차 감지가 사실상 동작하지 않으므로, 일반 예시 일부의 오탐을 허용하고 재현율을 지킵니다.
+    """
+    candidates = np.unique(positive_scores)  # 오름차순
+    recall = (positive_scores[None, :] >= candidates[:, None]).mean(axis=1)
+    false_positive = (negative_scores[None, :] >= candidates[:, None]).mean(axis=1) if len(negative_scores) else 0.0
+    return float(candidates[int(np.argmax(recall - false_positive))])
+
+
+class SemanticCrisisDetector:
+    """
+    위기 예시 중심 벡터와의 코사인 유사도로 위기 여부를 판단합니다.
+
+    Args:
+        embed_fn: 문장 하나를 임베딩하는 함수 (예: RagEngine.embed_query)
+        embed_batch_fn: 여러 문장을 한 번에 임베딩하는 함수 (선택, 없으면 embed_fn 반복)
+        threshold: 고정 임계값 (None이면 환경 변수 또는 예시 문장으로 보정)
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[str], Sequence[float]],
+        embed_batch_fn: Callable[[List[str]], List[Sequence[float]]] = None,
+        exemplars: Dict[str, List[str]] = CRISIS_EXEMPLARS,
+        normal_exemplars: List[str] = NORMAL_EXEMPLARS,
+        threshold: float = None
+    ):
+        self.embed_fn = embed_fn
+        self.embed_batch_fn = embed_batch_fn
+        self.exemplars = exemplars
+        self.normal_exemplars = normal_exemplars
+        if threshold is None and os.getenv(THRESHOLD_ENV):
+            threshold = float(os.getenv(THRESHOLD_ENV))
+        self.threshold = threshold
+
+        self.groups = list(exemplars)
+        self.calibration = None
+        self._centroids = None  # (그룹 수, 차원), 행마다 정규화
+        self._lock = threading.Lock()
+
+    def _embed_many(self, texts: List[str]) -> np.ndarray:
+        if self.embed_batch_fn is not None:
+            vectors = self.embed_batch_fn(list(texts))
+        else:
+            vectors = [self.embed_fn(text) for text in texts]
+        return np.asarray(vectors, dtype=np.float32)
+
+    @property
+    def centroids(self) -> np.ndarray:
+        """그룹별 중심 벡터 (최초 사용 시 예시 문장을 임베딩하고 임계값을 보정)"""
+        if self._centroids is None:
+            with self._lock:
+                if self._centroids is None:
+                    self._build()
+        return self._centroids
+
+    def _build(self) -> None:
+        texts = [text for group in self.groups for text in self.exemplars[group]]
+        group_ids = np.repeat(np.arange(len(self.groups)), [len(self.exemplars[g]) for g in self.groups])
+        vectors = _normalize_rows(self._embed_many(texts + list(self.normal_exemplars)))
+        positives, negatives = vectors[:len(texts)], vectors[len(texts):]
+
+        sums = np.zeros((len(self.groups), vectors.shape[1]), dtype=np.float32)
+        np.add.at(sums, group_ids, positives)
+        sizes = np.bincount(group_ids, minlength=len(self.groups)).astype(np.float32)
+        centroids = _normalize_rows(sums / sizes[:, None])
+
+        # 위기 예시 점수: 자기 그룹 중심 벡터는 자신을 빼고 다시 계산 (leave-one-out)
+        similarities = positives @ centroids.T
+        own = sums[group_ids] - positives
+        own_similarity = np.einsum("ij,ij->i", _normalize_rows(own), positives)
+        has_others = sizes[group_ids] > 1
+        similarities[np.arange(len(texts)), group_ids] = np.where(has_others, own_similarity, -1.0)
+        positive_scores = similarities.max(axis=1)
+        negative_scores = (negatives @ centroids.T).max(axis=1) if len(negatives) else np.zeros(0)
+
+        min_positive = float(positive_scores.min())
+        max_negative = float(negative_scores.max()) if len(negative_scores) else min_positive - 0.1
+        if self.threshold is not None:
+            threshold = self.threshold
+        elif min_positive > max_negative:
+            threshold = (min_positive + max_negative) / 2
+        else:
+            threshold = _overlap_threshold(positive_scores, negative_scores)
+
+        self.calibration = {
+            "threshold": threshold,
+            "min_crisis_score": min_positive,
+            "max_normal_score": max_negative,
+            "exemplar_recall": float(np.mean(positive_scores >= threshold)),
+            "normal_false_positive_rate": float(np.mean(negative_scores >= threshold)) if len(negative_scores) else 0.0,
+        }
+        self.threshold = threshold
+        self._centroids = centroids
+
+    def warm_up(self) -> "SemanticCrisisDetector":
+        """예시 문장을 임베딩하고 임계값을 보정합니다. (임베딩 모델도 이때 로드됨)"""
+        self.centroids
+        return self
+
+    def scores(self, vectors) -> np.ndarray:
+        """임베딩 행렬 (N, 차원) → 그룹별 코사인 유사도 (N, 그룹 수)"""
+        matrix = _normalize_rows(np.atleast_2d(np.asarray(vectors, dtype=np.float32)))
+        return matrix @ self.centroids.T
+
+    def _result(self, row: np.ndarray) -> dict:
+        best = int(np.argmax(row))
+        score = float(row[best])
+        return {
+            "status": "crisis" if score >= self.threshold else "normal",
+            "score": score,
+            "threshold": self.threshold,
+            "group": self.groups[best],
+        }
+
+    def detect(self, text: str, vector=None) -> dict:
+        """
+        {"status": 'crisis'|'normal', "score", "threshold", "group"} 반환
+
+        vector: 이미 계산한 같은 문장의 임베딩이 있으면 전달 (모델 호출 생략)
+        """
+        if vector is None:
+            vector = self.embed_fn(text)
+        return self._result(self.scores(vector)[0])
+
+    def detect_batch(self, texts: List[str]) -> List[dict]:
+        """여러 메시지를 한 번의 배치 임베딩과 행렬 곱으로 판정합니다. (결과 형식은 detect와 같음)"""
+        if not texts:
+            return []
+        return [self._result(row) for row in self.scores(self._embed_many(texts))]
@@ -0,0 +1,167 @@
+"""
+Eligibility Rules
+
+피해자 요건 진단 규칙 엔진 (질문과 규칙은 eligibility_rules.json 한 곳에서 관리)
+
+- 답변 7개(예/아니오)를 비트마스크(질문 순서대로 1, 2, 4, ...)로 바꾸고,
+  2^7 = 128칸 조회 테이블에서 진단 결과를 바로 찾음
+- 규칙은 위에서부터 처음 만족하는 것을 적용 (all: 모두 '예', none: 모두 '아니오',
+  any: 하나 이상 '예'), 어느 규칙도 만족하지 않으면 default
+- classify_batch(): (N, 7) 답변 행렬을 NumPy로 한 번에 분류 (과거 상담 데이터 코호트 분석용)
+- explain(): 적용된 규칙과, 더 우선하는 요건 규칙을 만족하지 못한 이유(요건별)를 반환
+"""
+
+import os
+import json
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "eligibility_rules.json")
+
+
+@dataclass(frozen=True)
+class Rule:
+    result: str
+    all_mask: int
+    none_mask: int
+    any_mask: int
+    kind: str = "requirement"  # "exclusion"이면 explain()의 unmet에 넣지 않음
+
+    def matches(self, masks):
+        """비트마스크(정수 또는 정수 배열)가 규칙을 만족하는지"""
+        return (
+            ((masks & self.all_mask) == self.all_mask)
+            & ((masks & self.none_mask) == 0)
+            & (((masks & self.any_mask) != 0) | (self.any_mask == 0))
+        )
+
+
+class EligibilityRules:
+    """JSON 규칙 파일을 128칸 조회 테이블로 컴파일한 진단기"""
+
+    def __init__(self, spec: dict):
+        self.question_specs = spec["questions"]
+        self.keys = [q["key"] for q in self.question_specs]
+        self.labels = {q["key"]: q.get("label", q["key"]) for q in self.question_specs}
+        self.outcomes = tuple(spec["outcomes"])
+        self.default = spec["default"]
+
+        bits = {key: 1 << i for i, key in enumerate(self.keys)}
+
+        def mask_of(rule: dict, field: str) -> int:
+            unknown = [key for key in rule.get(field, []) if key not in bits]
+            if unknown:
+                raise ValueError(f"❌ 알 수 없는 요건 키: {unknown}")
+            return sum(bits[key] for key in rule.get(field, []))
+
+        self.rules = [
+            Rule(
+                rule["result"], mask_of(rule, "all"), mask_of(rule, "none"), mask_of(rule, "any"),
+                rule.get("kind", "requirement")
+            )
+            for rule in spec["rules"]
+        ]
+        unknown = ({rule.result for rule in self.rules} | {self.default}) - set(self.outcomes)
+        if unknown:
+            raise ValueError(f"❌ outcomes에 없는 진단 결과: {sorted(unknown)}")
+
+        # 조회 테이블: 비트마스크 → outcomes 인덱스 (앞선 규칙이 우선하도록 역순으로 덮어씀)
+        masks = np.arange(1 << len(self.keys))
+        self.table = np.full(len(masks), self.outcomes.index(self.default), dtype=np.uint8)
+        for rule in reversed(self.rules):
+            self.table[rule.matches(masks)] = self.outcomes.index(rule.result)
+
+    @classmethod
+    def load(cls, path: str = RULES_PATH) -> "EligibilityRules":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @property
+    def questions(self) -> List[Tuple[str, str]]:
+        """진단 질문 목록 [(질문, 요건 키), ...]"""
+        return [(q["text"], q["key"]) for q in self.question_specs]
+
+    def mask(self, user_data: dict) -> int:
+        """답변 딕셔너리 → 비트마스크 (답이 없는 요건은 '아니오')"""
+        return sum(1 << i for i, key in enumerate(self.keys) if user_data.get(key, False))
+
+    def classify(self, user_data: dict) -> str:
+        return self.outcomes[self.table[self.mask(user_data)]]
+
+    def classify_batch(self, answers) -> np.ndarray:
+        """
+        답변을 한 번에 분류합니다.
+
+        Args:
+            answers: (N, 질문 수) bool/0·1 행렬 (열 순서는 questions 순서)
+                     또는 (N,) 비트마스크 정수 배열
+
+        Returns:
+            (N,) uint8 배열 - outcomes 인덱스 (이름은 rules.outcomes[i])
+        """
+        answers = np.asarray(answers)
+        if answers.ndim == 2:
+            if answers.shape[1] != len(self.keys):
+                raise ValueError(f"❌ 답변 열 수({answers.shape[1]})가 질문 수({len(self.keys)})와 다릅니다.")
+            weights = np.left_shift(1, np.arange(len(self.keys), dtype=np.int64))
+            answers = (answers != 0).astype(np.int64) @ weights
+        return self.table[answers]
+
+    def explain(self, user_data: dict) -> dict:
+        """
+        진단 결과와 그 이유를 반환합니다.
+
+        Returns:
+            {"result": 진단 결과,
+             "matched": 적용된 규칙의 조건 [{"key", "label", "expected", "actual", "met"}, ...] (default면 []),
+             "unmet": {더 우선하는 요건 규칙의 결과: 만족하지 못한 조건 리스트, ...}}
+            제외 규칙(kind="exclusion")은 적용되지 않았을 때 unmet에 넣지 않습니다.
+        """
+        mask = self.mask(user_data)
+        unmet = {}
+        for rule in self.rules:
+            conditions = self._conditions(rule, mask)
+            if rule.matches(mask):
+                return {"result": rule.result, "matched": [c for c in conditions if c["met"]], "unmet": unmet}
+            if rule.kind != "exclusion":
+                unmet[rule.result] = [c for c in conditions if not c["met"]]
+        return {"result": self.default, "matched": [], "unmet": unmet}
+
+    def _conditions(self, rule: Rule, mask: int) -> List[dict]:
+        conditions = []
+        for i, key in enumerate(self.keys):
+            bit, actual = 1 << i, bool(mask & (1 << i))
+            for field_mask, expected in ((rule.all_mask, True), (rule.none_mask, False)):
+                if field_mask & bit:
+                    conditions.append({
+                        "key": key, "label": self.labels[key],
+                        "expected": expected, "actual": actual, "met": actual == expected
+                    })
+        if rule.any_mask:
+            # any 조건은 "하나 이상 '예'"를 하나의 조건으로 표시
+            keys = [key for i, key in enumerate(self.keys) if rule.any_mask & (1 << i)]
+            conditions.append({
+                "key": keys, "label": " 또는 ".join(self.labels[key] for key in keys),
+                "expected": True, "actual": bool(mask & rule.any_mask),
+                "met": bool(mask & rule.any_mask)
+            })
+        return conditions
+
+
+def format_explanation(explanation: dict, include_result: bool = True) -> str:
+    """explain() 결과를 상담 화면용 문장으로 만듭니다."""
+    def answer(value: bool) -> str:
+        return "예" if value else "아니오"
+
+    lines = [f"📊 진단 결과: {explanation['result']}"] if include_result else []
+    for condition in explanation["matched"]:
+        lines.append(f"  ✅ {condition['label']}: {answer(condition['actual'])}")
+    for result, conditions in explanation["unmet"].items():
+        reasons = ", ".join(
+            f"{c['label']}('{answer(c['expected'])}' 필요)" for c in conditions
+        )
+        lines.append(f"  ❌ {result}: {reasons}")
+    return "\n".join(lines)
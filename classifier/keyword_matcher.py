@@ -0,0 +1,137 @@
+"""
+Keyword Matcher
+
+여러 키워드를 한 번에 찾는 Aho-Corasick 오토마톤
+
+- 키워드는 공백을 제거해 정규화한 뒤 한 번만 컴파일
+- 문장 길이 + 일치 수에 비례하는 시간으로 모든 일치를 찾음 (키워드 수와 무관)
+- 일치 위치는 원문(공백 포함) 기준 오프셋으로 반환
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+def normalize(text: str) -> str:
+    """키워드 비교용 정규화 (띄어쓰기 제거)"""
+    return text.replace(" ", "")
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    status: str
+    keyword: str
+    start: int
+    end: int
+
+    def to_dict(self) -> dict:
+        return {"status": self.status, "keyword": self.keyword, "start": self.start, "end": self.end}
+
+
+class AhoCorasick:
+    """문자열 패턴 집합에 대한 Aho-Corasick 오토마톤"""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            if pattern:
+                self._insert(pattern, pattern_id)
+        self._build_links()
+
+    def _insert(self, pattern: str, pattern_id: int) -> None:
+        node = 0
+        for char in pattern:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            node = child
+        self._output[node] += (pattern_id,)
+
+    def _build_links(self) -> None:
+        """너비 우선으로 실패 링크를 만들고, 출력에 실패 링크 쪽 패턴을 합쳐 둠"""
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] += self._output[self._fail[child]]
+                queue.append(child)
+
+    def iter_matches(self, text: str):
+        """(끝 위치(미포함), 패턴 번호)를 나타나는 순서대로 생성합니다."""
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for pattern_id in output[node]:
+                yield index + 1, pattern_id
+
+
+class KeywordMatcher:
+    """
+    상태별 키워드 사전(EMOTION_KEYWORDS 형식)을 컴파일한 매처
+
+    우선순위는 사전의 상태 순서(예: crisis > shock > confused), 같은 상태 안에서는
+    키워드 목록 순서를 따릅니다.
+    """
+
+    def __init__(self, lexicon: Dict[str, Iterable[str]]):
+        self.statuses = list(lexicon)
+        # 정규화된 패턴 → [(상태 순위, 키워드 순위, 상태, 원래 키워드), ...]
+        payloads: Dict[str, list] = {}
+        for status_rank, (status, keywords) in enumerate(lexicon.items()):
+            for keyword_rank, keyword in enumerate(keywords):
+                payloads.setdefault(normalize(keyword), []).append(
+                    (status_rank, keyword_rank, status, keyword)
+                )
+        self._patterns = list(payloads)
+        self._payloads = [payloads[pattern] for pattern in self._patterns]
+        # 같은 키워드가 목록에 두 번 있으면 앞쪽 순위를 사용
+        self._ranks: Dict[tuple, tuple] = {}
+        for payload in self._payloads:
+            for status_rank, keyword_rank, status, keyword in payload:
+                self._ranks.setdefault((status, keyword), (status_rank, keyword_rank))
+        self._automaton = AhoCorasick(self._patterns)
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """모든 일치를 원문 오프셋과 함께 반환합니다. (끝 위치 순)"""
+        positions = [i for i, char in enumerate(text) if char != " "]
+        processed = normalize(text)
+
+        matches = []
+        for end, pattern_id in self._automaton.iter_matches(processed):
+            start = end - len(self._patterns[pattern_id])
+            for _, _, status, keyword in self._payloads[pattern_id]:
+                matches.append(KeywordMatch(status, keyword, positions[start], positions[end - 1] + 1))
+        return matches
+
+    def best_match(self, matches: List[KeywordMatch]) -> KeywordMatch | None:
+        """우선순위가 가장 높은 일치 (상태 순서 → 키워드 목록 순서)"""
+        return min(matches, key=lambda m: self._ranks[(m.status, m.keyword)], default=None)
+
+    def classify(self, text: str) -> dict:
+        """
+        {"status", "keyword", "matches"} 반환. 일치가 없으면 status는 "normal"
+        """
+        matches = self.find_all(text)
+        best = self.best_match(matches)
+        result = {"status": best.status, "keyword": best.keyword} if best else {"status": "normal"}
+        result["matches"] = [match.to_dict() for match in matches]
+        return result
+
+    def classify_batch(self, texts: Iterable[str]) -> List[dict]:
+        """여러 문장(대화 기록 등)을 같은 오토마톤으로 검사합니다. 결과 형식은 classify와 같음"""
+        return [self.classify(text) for text in texts]
@@ -0,0 +1,120 @@
+"""
+Topic Classifier
+
+질문 주제(주거/금융/법률/생계/신청) 태깅과 "특정 주제 집중 요청" 감지를 한 번에 수행
+
+- 관심 주제 키워드, 집중 요청 패턴, 상세 요청 표현을 하나의 Aho-Corasick 오토마톤으로
+  컴파일하여 메시지를 한 번만 훑고 주제별 점수(일치 횟수)를 계산
+- 메시지별 점수(TopicScores)는 더할 수 있으므로, 대화 기록은 메시지가 추가될 때 한 번만
+  채점해 두고 이후에는 점수만 합산 (기록 전체를 다시 이어 붙여 검사하지 않음)
+- 일치 규칙은 기존 `word in text` 검사와 같음 (띄어쓰기를 무시하지 않음, 소문자화만 적용)
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+try:
+    from .keyword_matcher import AhoCorasick
+except ImportError:
+    from keyword_matcher import AhoCorasick
+
+
+# 관련 링크/사용자 관심사용 주제 키워드
+TOPIC_KEYWORDS = {
+    "주거": ["주거", "집", "임대", "전세", "긴급주거비", "공공임대"],
+    "금융": ["금융", "대출", "이자", "상환", "디딤돌", "버팀목", "금리"],
+    "법률": ["법률", "변호사", "소송", "경매", "대항력"],
+    "생계": ["생계", "생활비", "긴급", "복지"],
+    "신청": ["신청", "절차", "서류", "방법"],
+}
+
+# "주거지원만", "금융만", "주거에 대해서만" 같은 특정 주제 집중 요청 패턴
+FOCUS_PATTERNS = {
+    "주거": ["주거지원", "주거 지원", "주거만", "집", "임대"],
+    "금융": ["금융지원", "금융 지원", "금융만", "대출", "금리"],
+    "법률": ["법률지원", "법률 지원", "법률만", "소송", "변호사"],
+    "생계": ["생계지원", "생계 지원", "생계만", "생활비", "복지"],
+}
+
+# 특정 주제에 대한 자세한 정보 요청 표현
+DETAIL_KEYWORDS = ["자세히", "구체적", "더", "상세히", "대해", "관해"]
+
+
+@dataclass(frozen=True)
+class TopicScores:
+    """주제별 일치 횟수 (0인 주제는 생략)"""
+    topics: Dict[str, int] = field(default_factory=dict)
+    focus: Dict[str, int] = field(default_factory=dict)
+    detail: int = 0
+
+    def __add__(self, other: "TopicScores") -> "TopicScores":
+        return TopicScores(
+            topics=dict(Counter(self.topics) + Counter(other.topics)),
+            focus=dict(Counter(self.focus) + Counter(other.focus)),
+            detail=self.detail + other.detail
+        )
+
+    @classmethod
+    def combine(cls, scores: Iterable["TopicScores"]) -> "TopicScores":
+        return sum(scores, cls())
+
+    def keywords(self) -> List[str]:
+        """점수가 있는 관심 주제 (TOPIC_KEYWORDS 순서)"""
+        return [topic for topic in TOPIC_KEYWORDS if self.topics.get(topic)]
+
+    def specific_focus(self) -> str | None:
+        """상세 요청 표현과 함께 주제가 정확히 하나만 언급되었으면 그 주제"""
+        if not self.detail or len(self.focus) != 1:
+            return None
+        return next(iter(self.focus))
+
+
+class TopicClassifier:
+    """TOPIC_KEYWORDS / FOCUS_PATTERNS / DETAIL_KEYWORDS를 한 번에 검사하는 컴파일된 분류기"""
+
+    def __init__(
+        self,
+        topic_keywords: Dict[str, List[str]] = TOPIC_KEYWORDS,
+        focus_patterns: Dict[str, List[str]] = FOCUS_PATTERNS,
+        detail_keywords: List[str] = DETAIL_KEYWORDS
+    ):
+        # 패턴 → [(분류, 주제), ...]  (같은 단어가 여러 분류에 속할 수 있음)
+        labels: Dict[str, list] = {}
+        for group, lexicon in (("topics", topic_keywords), ("focus", focus_patterns)):
+            for topic, words in lexicon.items():
+                for word in words:
+                    labels.setdefault(word.lower(), []).append((group, topic))
+        for word in detail_keywords:
+            labels.setdefault(word.lower(), []).append(("detail", None))
+
+        patterns = list(labels)
+        self._labels = [labels[pattern] for pattern in patterns]
+        self._automaton = AhoCorasick(patterns)
+
+    def score(self, text: str) -> TopicScores:
+        """메시지 하나를 한 번 훑어 주제별 점수를 계산합니다."""
+        counts = {"topics": Counter(), "focus": Counter(), "detail": Counter()}
+        for _, pattern_id in self._automaton.iter_matches((text or "").lower()):
+            for group, topic in self._labels[pattern_id]:
+                counts[group][topic] += 1
+        return TopicScores(
+            topics=dict(counts["topics"]),
+            focus=dict(counts["focus"]),
+            detail=counts["detail"][None]
+        )
+
+
+TOPIC_CLASSIFIER = TopicClassifier()
+
+
+@lru_cache(maxsize=1024)
+def score_topics(text: str) -> TopicScores:
+    """
+    메시지의 주제 점수 (같은 메시지는 다시 검사하지 않음)
+
+    예: score_topics("대출 금리에 대해 자세히").keywords() → ["금융"]
+        score_topics("대출 금리에 대해 자세히").specific_focus() → "금융"
+    """
+    return TOPIC_CLASSIFIER.score(text)
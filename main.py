@@ -4,8 +4,11 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'classifier'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'rag_engine'))
 
-from classifier.classifier_logic import start_initial_conversation, start_diagnosis_flow, analyze_user_query
-from rag_engine.run_chain import get_rag_response
+from classifier.classifier_logic import (
+    start_initial_conversation, start_diagnosis_flow, analyze_user_query, enable_semantic_crisis_detection,
+    SEMANTIC_CRISIS_ENABLED, CRISIS_NOTICE
+)
+from rag_engine.run_chain import get_engine, stream_rag_response, warm_up_in_background
 
 
 def main():
@@ -15,6 +18,17 @@ def main():
     print("🏠 전세사기 피해자 지원 통합 상담 시스템")
     print("="*70 + "\n")
     
+    # (선택) 키워드에 없는 위기 표현은 RAG 엔진의 임베딩 모델(질의 캐시 공유)로 2차 감지
+    # CRISIS_SEMANTIC=1일 때만 사용하며, 상담을 끝내지 않고 상담전화 안내만 덧붙임
+    warm_up_steps = []
+    if SEMANTIC_CRISIS_ENABLED:
+        engine = get_engine()
+        crisis_detector = enable_semantic_crisis_detection(engine.embed_query, engine.embed_queries)
+        warm_up_steps.append(crisis_detector.warm_up)
+    
+    # 상담 질문에 답하는 동안 위기 감지기(예시 문장 임베딩)와 RAG 엔진(임베딩/FAISS/LLM)을 미리 로드
+    warm_up_in_background(*warm_up_steps)
+    
     # ========================================
     # 1단계: 초기 상담 (팀원이 추가한 기능)
     # ========================================
@@ -60,6 +74,8 @@ def main():
 혼자 감당하지 마시고 전문가와 상담하시길 간곡히 부탁드립니다.
         """)
         return
+    if query_analysis.get("crisis_notice"):
+        print(CRISIS_NOTICE)
     
     conversation_count = 0
     
@@ -84,16 +100,17 @@ def main():
         
         # 첫 질문에만 자치구 정보 포함
         if conversation_count == 1:
-            response = get_rag_response(user_situation, user_query, district)
+            chunks = stream_rag_response(user_situation, user_query, district)
         else:
-            response = get_rag_response(user_situation, user_query)
+            chunks = stream_rag_response(user_situation, user_query)
         
-        # 답변 출력
+        # 답변 출력 (토큰이 도착하는 대로 바로 출력)
         print("="*70)
         print("📝 답변")
         print("="*70 + "\n")
-        print(response)
-        print("\n" + "="*70 + "\n")
+        for chunk in chunks:
+            print(chunk, end="", flush=True)
+        print("\n\n" + "="*70 + "\n")
         
         # 다음 질문 받기
         print("💬 추가로 궁금하신 점이 있으신가요?")
@@ -109,6 +126,8 @@ def main():
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
             """)
             break
+        if query_analysis.get("crisis_notice"):
+            print(CRISIS_NOTICE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+"""
+Approximate Nearest Neighbour Index
+
+FAISS 인덱스 종류 선택 및 검색 파라미터 / 재현율-지연시간 리포트
+
+- flat     : 정확 검색 (IndexFlatL2). 청크 수에 비례해 검색 비용 증가
+- ivf_flat : 군집(nlist)으로 나눠 nprobe개 군집만 검색
+- hnsw     : 그래프 기반 검색. efSearch로 정확도/속도 조절 (벡터 삭제 불가)
+- ivf_pq   : IVF + 곱 양자화(PQ). 메모리를 크게 줄이는 대신 근사 거리 사용
+
+인덱스 빌드는 항상 Flat 인덱스(원본)를 기준으로 하고, 서비스용 인덱스만
+이 모듈로 변환합니다. 벡터 위치(순서)는 원본과 동일하게 유지됩니다.
+"""
+
+import math
+import time
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+
+# 군집당 학습 벡터가 이보다 적으면 faiss가 경고하므로 nlist 상한으로 사용
+MIN_POINTS_PER_CENTROID = 39
+
+
+def default_nlist(count: int) -> int:
+    """벡터 수에 맞는 IVF 군집 수 (약 4·√N, 학습 데이터가 부족하지 않도록 제한)"""
+    return max(1, min(int(4 * math.sqrt(count)), count // MIN_POINTS_PER_CENTROID))
+
+
+def _pq_subquantizers(dim: int, requested: int | None) -> int:
+    """차원을 나누어떨어지게 하는 PQ 서브 양자화기 수"""
+    m = requested or max(1, dim // 8)
+    while dim % m:
+        m -= 1
+    return m
+
+
+def build_faiss_index(
+    vectors: np.ndarray,
+    index_type: str = "flat",
+    nlist: int = None,
+    pq_m: int = None,
+    pq_bits: int = 8,
+    hnsw_m: int = 32,
+    ef_construction: int = 200,
+    train_sample: int = 50000,
+    seed: int = 42
+) -> faiss.Index:
+    """
+    주어진 벡터로 FAISS 인덱스를 만들고 같은 순서로 벡터를 추가합니다.
+
+    IVF 계열은 train_sample개까지 무작위 표본으로 학습합니다. 벡터 수가 너무 적어
+    학습이 불가능하면 더 단순한 인덱스로 대체합니다.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 인덱스 종류: {index_type} (가능: {', '.join(INDEX_TYPES)})")
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    count, dim = vectors.shape
+
+    if index_type == "ivf_pq" and count < (1 << pq_bits) * MIN_POINTS_PER_CENTROID // 4:
+        print(f"  ⚠️ 벡터 {count}개로는 PQ 코드북 학습이 어려워 ivf_flat으로 대체합니다.")
+        index_type = "ivf_flat"
+    if index_type in ("ivf_flat", "ivf_pq") and count < 2 * MIN_POINTS_PER_CENTROID:
+        print(f"  ⚠️ 벡터 {count}개로는 IVF 학습이 어려워 flat으로 대체합니다.")
+        index_type = "flat"
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m)
+        index.hnsw.efConstruction = ef_construction
+    else:
+        nlist = min(nlist or default_nlist(count), max(1, count // MIN_POINTS_PER_CENTROID))
+        quantizer = faiss.IndexFlatL2(dim)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, _pq_subquantizers(dim, pq_m), pq_bits)
+
+        rng = np.random.default_rng(seed)
+        sample = vectors if count <= train_sample else vectors[rng.choice(count, train_sample, replace=False)]
+        index.train(sample)
+
+    index.add(vectors)
+    return index
+
+
+def index_type_of(index: faiss.Index) -> str:
+    """FAISS 인덱스 객체의 종류 이름"""
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf_flat"
+    return "flat"
+
+
+def apply_search_params(index: faiss.Index, nprobe: int = None, ef_search: int = None) -> faiss.Index:
+    """
+    검색 시점 파라미터를 설정합니다. 해당 인덱스에 없는 파라미터는 무시합니다.
+
+    Args:
+        nprobe: IVF 계열에서 검색할 군집 수 (클수록 정확, 느림)
+        ef_search: HNSW 탐색 후보 수 (클수록 정확, 느림)
+    """
+    if nprobe:
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            ivf.nprobe = min(nprobe, ivf.nlist)
+    if ef_search and isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+    return index
+
+
+# ----------------------------------------------------
+# 재현율 / 지연시간 리포트
+# ----------------------------------------------------
+
+
+def _search_timed(index: faiss.Index, queries: np.ndarray, k: int):
+    start = time.perf_counter()
+    _, ids = index.search(queries, k)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    return ids, elapsed_ms
+
+
+def recall_report(
+    vectors: np.ndarray,
+    index: faiss.Index,
+    k: int = 5,
+    n_queries: int = 200,
+    sweep: List[int] = None,
+    seed: int = 0
+) -> List[Dict]:
+    """
+    Flat(정확 검색) 결과를 기준으로 근사 인덱스의 recall@k와 질의당 지연시간을 측정합니다.
+
+    질의는 저장된 벡터 중 무작위 표본에 작은 잡음을 더해 만듭니다.
+
+    Returns:
+        [{"param", "value", "recall", "latency_ms", "flat_latency_ms"}, ...]
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), min(n_queries, len(vectors)), replace=False)
+    scale = float(np.std(vectors)) * 0.1
+    queries = vectors[picks] + rng.normal(0, scale, size=(len(picks), vectors.shape[1])).astype(np.float32)
+
+    flat = faiss.IndexFlatL2(vectors.shape[1])
+    flat.add(vectors)
+    truth, flat_ms = _search_timed(flat, queries, k)
+
+    kind = index_type_of(index)
+    if kind == "hnsw":
+        param, values = "efSearch", sweep or [16, 32, 64, 128, 256]
+    elif kind in ("ivf_flat", "ivf_pq"):
+        param, values = "nprobe", sweep or [1, 2, 4, 8, 16, 32, 64]
+    else:
+        param, values = "-", [None]
+
+    rows = []
+    for value in values:
+        if param == "efSearch":
+            apply_search_params(index, ef_search=value)
+        elif param == "nprobe":
+            apply_search_params(index, nprobe=value)
+        ids, ann_ms = _search_timed(index, queries, k)
+        hits = sum(len(set(found) & set(expected)) for found, expected in zip(ids, truth))
+        rows.append({
+            "param": param,
+            "value": value,
+            "recall": hits / truth.size,
+            "latency_ms": ann_ms,
+            "flat_latency_ms": flat_ms,
+        })
+    return rows
+
+
+def print_recall_report(rows: List[Dict], index_type: str, k: int = 5) -> None:
+    print(f"\n📈 {index_type} 재현율/지연시간 (Flat 기준, recall@{k})")
+    print(f"  {'파라미터':<14}{'recall':>8}{'ANN ms':>10}{'Flat ms':>10}")
+    for row in rows:
+        label = f"{row['param']}={row['value']}" if row["value"] is not None else "flat"
+        print(f"  {label:<14}{row['recall']:>8.3f}{row['latency_ms']:>10.3f}{row['flat_latency_ms']:>10.3f}")
@@ -0,0 +1,238 @@
+"""
+Answer Cache
+
+LLM 호출 앞단에 두는 RAG 답변 캐시
+
+- 1단계(정확 일치): (사용자 상황, 정규화된 질문, 자치구, 검색 필터) 키로 바로 조회
+- 2단계(의미 유사, 기본 꺼짐): 같은 (사용자 상황, 자치구, 검색 필터) 안에서 정규화된 질문만의
+  임베딩 코사인 유사도가 임계값 이상인 이전 질문의 답변을 재사용
+  (상황 문구까지 임베딩하면 같은 버킷의 항목이 모두 같은 접두어를 가져 유사도가 부풀려지므로
+  질문만 임베딩해야 함. 임계값은 실제 바꿔 말한 질문/다른 질문 쌍으로 보정한 뒤에만 켤 것)
+- TTL 만료 + LRU 방출, FAISS 인덱스 버전이 바뀌면 전체 무효화
+"""
+
+import re
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+_PUNCTUATION = re.compile(r"[?!.,~…·'\"“”‘’()\[\]{}]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """
+    캐시 키용 질문 정규화
+
+    유니코드 정규화(NFKC), 소문자화, 문장부호 제거, 공백 정리를 수행합니다.
+    예: "나는 이제 뭘해야돼?  " → "나는 이제 뭘해야돼"
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+@dataclass
+class _Entry:
+    answer: str
+    expires_at: float
+    bucket: tuple
+    vector: np.ndarray | None = None
+
+
+@dataclass
+class _Bucket:
+    """같은 (사용자 상황, 자치구, 검색 필터)에 속한 항목들의 임베딩 행렬 (변경 시에만 다시 쌓음)"""
+    keys: list = field(default_factory=list)
+    matrix: np.ndarray | None = None
+    dirty: bool = False
+
+
+class AnswerCache:
+    """스레드 안전한 2단계(정확 일치 + 의미 유사) 답변 캐시"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 3600.0,
+        similarity_threshold: float | None = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self._buckets: dict = {}
+        self._index_version = None
+        self._counters = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    @property
+    def semantic_enabled(self) -> bool:
+        """의미 유사(2단계) 조회 사용 여부 (similarity_threshold가 None이면 정확 일치만)"""
+        return self.similarity_threshold is not None
+
+    # --- 조회 / 저장 ---
+
+    def get(
+        self,
+        user_situation: str,
+        user_query: str,
+        district: str = None,
+        query_vector=None,
+        index_version: str = None,
+        focus: str = None
+    ) -> str | None:
+        """
+        캐시된 답변을 반환합니다. 없으면 None.
+
+        query_vector: 정규화된 질문(normalize_query)만의 임베딩 (의미 유사 조회용)
+        """
+        key = self._key(user_situation, user_query, district, focus)
+        now = time.monotonic()
+
+        with self._lock:
+            self._check_version(index_version)
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._counters["exact_hits"] += 1
+                    return entry.answer
+                self._remove(key)
+                self._counters["expirations"] += 1
+
+            if query_vector is not None and self.semantic_enabled:
+                answer = self._semantic_lookup(_bucket_key(key), query_vector, now)
+                if answer is not None:
+                    self._counters["semantic_hits"] += 1
+                    return answer
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(
+        self,
+        user_situation: str,
+        user_query: str,
+        district: str,
+        answer: str,
+        query_vector=None,
+        index_version: str = None,
+        focus: str = None
+    ) -> None:
+        """답변을 캐시에 저장합니다."""
+        key = self._key(user_situation, user_query, district, focus)
+        vector = None
+        if query_vector is not None and self.semantic_enabled:
+            vector = _unit_vector(query_vector)
+
+        with self._lock:
+            self._check_version(index_version)
+
+            if key in self._entries:
+                self._remove(key)
+
+            bucket_key = _bucket_key(key)
+            self._entries[key] = _Entry(
+                answer=answer,
+                expires_at=time.monotonic() + self.ttl,
+                bucket=bucket_key,
+                vector=vector
+            )
+            if vector is not None:
+                bucket = self._buckets.setdefault(bucket_key, _Bucket())
+                bucket.keys.append(key)
+                bucket.dirty = True
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self) -> dict:
+        """캐시 적중/실패 지표"""
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        hits = counters["exact_hits"] + counters["semantic_hits"]
+        total = hits + counters["misses"]
+        counters["size"] = size
+        counters["hit_rate"] = round(hits / total, 4) if total else 0.0
+        return counters
+
+    # --- 내부 구현 ---
+
+    @staticmethod
+    def _key(user_situation: str, user_query: str, district: str = None, focus: str = None) -> tuple:
+        return (user_situation or "", normalize_query(user_query), district or "", focus or "")
+
+    def _check_version(self, index_version: str | None) -> None:
+        """인덱스 버전이 바뀌었으면 이전 인덱스로 만든 답변을 모두 버립니다."""
+        if index_version is None or index_version == self._index_version:
+            return
+        if self._index_version is not None and self._entries:
+            self._counters["invalidations"] += 1
+        self._entries.clear()
+        self._buckets.clear()
+        self._index_version = index_version
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None or entry.vector is None:
+            return
+        bucket = self._buckets.get(entry.bucket)
+        if bucket is not None:
+            bucket.keys.remove(key)
+            bucket.dirty = True
+            if not bucket.keys:
+                del self._buckets[entry.bucket]
+
+    def _semantic_lookup(self, bucket_key: tuple, query_vector, now: float) -> str | None:
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            return None
+
+        if bucket.dirty:
+            bucket.matrix = np.stack([self._entries[k].vector for k in bucket.keys])
+            bucket.dirty = False
+
+        scores = bucket.matrix @ _unit_vector(query_vector)
+        for position in np.argsort(scores)[::-1]:
+            if scores[position] < self.similarity_threshold:
+                break
+            key = bucket.keys[position]
+            entry = self._entries[key]
+            if entry.expires_at > now:
+                self._entries.move_to_end(key)
+                return entry.answer
+        return None
+
+
+def _bucket_key(key: tuple) -> tuple:
+    """정확 일치 키에서 질문을 뺀 의미 유사 검색 범위"""
+    return (key[0],) + key[2:]
+
+
+def _unit_vector(vector) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm > 0 else array
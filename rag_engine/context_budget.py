@@ -0,0 +1,183 @@
+"""
+Context Budget
+
+검색된 청크를 LLM 프롬프트용 context로 조립하는 단계
+
+1. 병합: 같은 파일에서 연속된 청크(청크 ID의 순번이 이어지는 것)는 겹치는
+   부분(chunk_overlap)을 한 번만 남기고 하나로 합침
+2. 중복 제거: MinHash(문자 3-gram, 64개 해시)로 추정한 자카드 유사도가
+   임계값 이상인 청크는 순위가 높은 쪽만 남김
+3. 토큰 예산: 관련도 순서대로 예산 안에 들어가는 청크만 담음
+4. 리포트: 그대로 이어 붙였을 때 대비 절약한 토큰 수
+"""
+
+import hashlib
+import math
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+
+# Gemini 토크나이저를 로컬에서 쓸 수 없으므로 한국어 위주 텍스트 기준 근사값 사용
+CHARS_PER_TOKEN = 2.0
+
+SEPARATOR = "\n\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (한국어 약 2글자당 1토큰)"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def chunk_order(chunk_id: str):
+    """
+    청크 ID("파일명:콘텐츠해시:순번")에서 (파일 키, 순번)을 꺼냅니다.
+    형식이 다르면 None (병합 대상에서 제외)
+    """
+    if not chunk_id or chunk_id.count(":") < 2:
+        return None
+    prefix, _, number = chunk_id.rpartition(":")
+    return (prefix, int(number)) if number.isdigit() else None
+
+
+# MinHash: 메르센 소수 p = 2^31-1 위의 (a·x + b) mod p 해시 함수 NUM_PERMUTATIONS개
+# (x, a, b < 2^31 이므로 a·x + b가 uint64 범위를 넘지 않음)
+NUM_PERMUTATIONS = 64
+_MERSENNE_PRIME = (1 << 31) - 1
+_PERM_A, _PERM_B = np.random.default_rng(1).integers(
+    1, _MERSENNE_PRIME, size=(2, NUM_PERMUTATIONS), dtype=np.uint64
+)
+
+
+def minhash(text: str, shingle: int = 3) -> np.ndarray:
+    """문자 n-gram 집합의 MinHash 서명 (uint64 NUM_PERMUTATIONS개)"""
+    text = " ".join(text.split())
+    grams = {text[i:i + shingle] for i in range(max(1, len(text) - shingle + 1))}
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little") for g in grams],
+        dtype=np.uint64
+    ) % np.uint64(_MERSENNE_PRIME)
+    return ((hashes[:, None] * _PERM_A + _PERM_B) % np.uint64(_MERSENNE_PRIME)).min(axis=0)
+
+
+def estimated_jaccard(first: np.ndarray, second: np.ndarray) -> float:
+    return float(np.mean(first == second))
+
+
+def merge_overlap(first: str, second: str, max_overlap: int = 200) -> str:
+    """first의 끝과 second의 앞이 겹치면 겹치는 부분을 한 번만 남겨 이어 붙입니다."""
+    for size in range(min(max_overlap, len(first), len(second)), 0, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return first + "\n" + second
+
+
+@dataclass
+class ContextChunk:
+    text: str
+    rank: int
+    chunk_id: str = None
+
+
+@dataclass
+class ContextReport:
+    chunks_in: int = 0
+    chunks_out: int = 0
+    merged: int = 0
+    duplicates: int = 0
+    over_budget: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_in - self.tokens_out
+
+    def summary(self) -> str:
+        return (
+            f"청크 {self.chunks_in}개 → {self.chunks_out}개 "
+            f"(병합 {self.merged}, 중복 {self.duplicates}, 예산 초과 {self.over_budget}), "
+            f"토큰 {self.tokens_in} → {self.tokens_out} (절약 {self.tokens_saved})"
+        )
+
+
+class ContextBudgeter:
+    """청크 병합 + 중복 제거 + 토큰 예산 패킹"""
+
+    def __init__(self, token_budget: int = 1500, duplicate_threshold: float = 0.8):
+        self.token_budget = token_budget
+        self.duplicate_threshold = duplicate_threshold
+
+    def pack(self, chunks: List[ContextChunk]) -> Tuple[str, ContextReport]:
+        """
+        관련도 순서(rank 오름차순)로 정리된 context 문자열과 리포트를 반환합니다.
+        """
+        report = ContextReport(
+            chunks_in=len(chunks),
+            tokens_in=estimate_tokens(SEPARATOR.join(c.text for c in chunks))
+        )
+
+        groups = self._merge_adjacent(chunks, report)
+        groups = self._drop_duplicates(groups, report)
+
+        packed, used = [], 0
+        for group in groups:
+            cost = estimate_tokens(group.text) + (estimate_tokens(SEPARATOR) if packed else 0)
+            if used + cost <= self.token_budget:
+                packed.append(group)
+                used += cost
+            else:
+                report.over_budget += 1
+
+        if not packed and groups:
+            # 가장 관련도 높은 청크 하나가 예산보다 크면 잘라서라도 넣음
+            best = groups[0]
+            packed.append(ContextChunk(best.text[:int(self.token_budget * CHARS_PER_TOKEN)], best.rank))
+            report.over_budget -= 1
+
+        text = SEPARATOR.join(group.text for group in packed)
+        report.chunks_out = len(packed)
+        report.tokens_out = estimate_tokens(text)
+        return text, report
+
+    @staticmethod
+    def _merge_adjacent(chunks: List[ContextChunk], report: ContextReport) -> List[ContextChunk]:
+        """같은 파일의 연속 청크를 합칩니다. 합친 청크의 순위는 구성 청크 중 가장 높은 순위"""
+        ordered = sorted(
+            (order + (chunk,) for chunk in chunks if (order := chunk_order(chunk.chunk_id))),
+            key=lambda item: (item[0], item[1])
+        )
+        merged, run, previous = [], None, None
+        for key, number, chunk in ordered:
+            if run is not None and previous == (key, number - 1):
+                run = ContextChunk(merge_overlap(run.text, chunk.text), min(run.rank, chunk.rank), run.chunk_id)
+                report.merged += 1
+            elif previous == (key, number):
+                # 같은 청크가 두 번 검색된 경우
+                report.duplicates += 1
+            else:
+                if run is not None:
+                    merged.append(run)
+                run = chunk
+            previous = (key, number)
+        if run is not None:
+            merged.append(run)
+
+        merged.extend(chunk for chunk in chunks if not chunk_order(chunk.chunk_id))
+        return sorted(merged, key=lambda chunk: chunk.rank)
+
+    def _drop_duplicates(self, groups: List[ContextChunk], report: ContextReport) -> List[ContextChunk]:
+        kept, fingerprints = [], []
+        for group in groups:
+            fingerprint = minhash(group.text)
+            if any(
+                estimated_jaccard(fingerprint, other) >= self.duplicate_threshold
+                or group.text in kept_group.text
+                for other, kept_group in zip(fingerprints, kept)
+            ):
+                report.duplicates += 1
+                continue
+            kept.append(group)
+            fingerprints.append(fingerprint)
+        return kept
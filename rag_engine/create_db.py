@@ -1,11 +1,29 @@
 import os
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
-from typing import List
+from typing import Dict, List
 from langchain_core.documents import Document
 
+try:
+    # 패키지로 import될 때
+    from .embedding_service import EmbeddingService
+    from .mmap_store import export_mmap_index, new_build_dir, publish_build_dir, resolve_index_dir
+    from .ann_index import INDEX_TYPES, build_faiss_index, recall_report, print_recall_report
+except ImportError:
+    # 스크립트로 직접 실행될 때
+    from embedding_service import EmbeddingService
+    from mmap_store import export_mmap_index, new_build_dir, publish_build_dir, resolve_index_dir
+    from ann_index import INDEX_TYPES, build_faiss_index, recall_report, print_recall_report
+
 
 # --- 환경 및 경로 설정 ---
 # 현재 파일의 디렉토리 기준으로 경로 설정 (run_chain.py와 동일)
@@ -15,100 +33,458 @@ DB_PATH = os.path.join(CURRENT_DIR, "index")
 DB_NAME = "jeonse_vector_index"
 MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2" 
 
+# 파일별 콘텐츠 해시와 청크 ID를 기록하는 매니페스트 (증분 빌드용)
+MANIFEST_NAME = f"{DB_NAME}.manifest.json"
+MANIFEST_VERSION = 1
+
+SUPPORTED_EXTENSIONS = (".pdf", ".md", ".txt")
+
+# 병렬 파이프라인: 파싱/청킹 워커 프로세스 수, 임베딩 배치 크기
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+EMBED_BATCH_SIZE = 64
+
+# 콘텐츠 해시 기준 임베딩 캐시 (재빌드 시 같은 청크는 다시 임베딩하지 않음)
+EMBEDDING_CACHE_DIR = os.path.join(DB_PATH, "embedding_cache")
+
 
 # ----------------------------------------------------
 # 문서 로딩 및 청킹 함수
 # ----------------------------------------------------
 
 
-def load_and_split_documents(data_folder_path: str) -> List[Document]:
-    """PDF와 MD 파일을 모두 로드하고 청크로 분할하며 메타데이터를 태깅합니다."""
-    all_chunks = []
-    
-    text_splitter = RecursiveCharacterTextSplitter(
+def _create_text_splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
         chunk_size=700,
         chunk_overlap=100,
         separators=["\n\n", "\n", "."], 
         length_function=len
     )
 
-    for filename in os.listdir(data_folder_path):
-        file_path = os.path.join(data_folder_path, filename)
-        documents = []
 
-        if filename.endswith(".pdf"):
-            print(f"  -> Loading PDF: {filename}")
-            loader = PyPDFLoader(file_path)
-            documents = loader.load()
-            file_tag = "법규_법률"
-        
-        elif filename.endswith((".md", ".txt")):
-            print(f"  -> Loading MD/TXT: {filename}")
-            loader = TextLoader(file_path, encoding='utf-8') 
-            documents = loader.load()
-            file_tag = "지원_실무"
-        
-        else:
-            continue
+def tag_chunk(chunk: Document, filename: str, file_tag: str) -> Document:
+    """청크에 출처와 핵심 내용 기반의 필터링 태그를 추가합니다."""
+    chunk.metadata["source"] = filename
+    chunk.metadata["file_type"] = file_tag
 
-        # 청킹 및 메타데이터 태깅
-        chunks = text_splitter.split_documents(documents)
-        
-        for chunk in chunks:
-            chunk.metadata["source"] = filename
-            chunk.metadata["file_type"] = file_tag
-
-            # 핵심 내용 기반의 필터링 태그 추가
-            content = chunk.page_content
-            if "금융지원" in content or "대환대출" in content or "분할상환" in content:
-                chunk.metadata["action_type"] = "금융"
-            elif "경매" in content or "공매" in content or "법률전문가" in content:
-                chunk.metadata["action_type"] = "경공매_법률"
-            elif "생계비" in content or "심리 상담" in content:
-                chunk.metadata["action_type"] = "복지_심리"
-            elif "종로구" in content or "강남구" in content or "자치구" in content:
-                chunk.metadata["action_type"] = "연락처_행정"
-            else:
-                chunk.metadata["action_type"] = "일반_요건"
+    # 핵심 내용 기반의 필터링 태그 추가
+    content = chunk.page_content
+    if "금융지원" in content or "대환대출" in content or "분할상환" in content:
+        chunk.metadata["action_type"] = "금융"
+    elif "경매" in content or "공매" in content or "법률전문가" in content:
+        chunk.metadata["action_type"] = "경공매_법률"
+    elif "생계비" in content or "심리 상담" in content:
+        chunk.metadata["action_type"] = "복지_심리"
+    elif "종로구" in content or "강남구" in content or "자치구" in content:
+        chunk.metadata["action_type"] = "연락처_행정"
+    else:
+        chunk.metadata["action_type"] = "일반_요건"
+    return chunk
 
-        # 인덴트 수정: chunks를 all_chunks에 추가
+
+def load_and_split_file(file_path: str, text_splitter=None) -> List[Document]:
+    """PDF 또는 MD/TXT 파일 하나를 로드하고 청크로 분할하며 메타데이터를 태깅합니다."""
+    filename = os.path.basename(file_path)
+    text_splitter = text_splitter or _create_text_splitter()
+
+    if filename.endswith(".pdf"):
+        print(f"  -> Loading PDF: {filename}")
+        loader = PyPDFLoader(file_path)
+        file_tag = "법규_법률"
+
+    elif filename.endswith((".md", ".txt")):
+        print(f"  -> Loading MD/TXT: {filename}")
+        loader = TextLoader(file_path, encoding='utf-8') 
+        file_tag = "지원_실무"
+
+    else:
+        return []
+
+    # 청킹 및 메타데이터 태깅
+    chunks = text_splitter.split_documents(loader.load())
+    for chunk in chunks:
+        tag_chunk(chunk, filename, file_tag)
+    return chunks
+
+
+def load_and_split_documents(data_folder_path: str, workers: int = DEFAULT_WORKERS) -> List[Document]:
+    """
+    PDF와 MD 파일을 모두 로드하고 청크로 분할하며 메타데이터를 태깅합니다.
+    
+    전체 청크 리스트가 필요한 경우용입니다. 인덱스 구축은 청크를 모으지 않고
+    배치 단위로 바로 임베딩하는 build_index()를 사용하세요.
+    """
+    files = {
+        filename: ""
+        for filename in sorted(os.listdir(data_folder_path))
+        if filename.endswith(SUPPORTED_EXTENSIONS)
+    }
+    all_chunks = []
+    for _, chunks, _, _ in iter_file_chunks(data_folder_path, files, workers):
         all_chunks.extend(chunks)
-            
     return all_chunks
 
 
+# ----------------------------------------------------
+# 매니페스트 (파일별 콘텐츠 해시 / 청크 ID)
+# ----------------------------------------------------
+
+
+def file_sha256(file_path: str) -> str:
+    """파일 내용의 SHA-256 해시"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_knowledge_base(data_folder_path: str) -> Dict[str, str]:
+    """지식 폴더의 {파일명: 콘텐츠 해시}"""
+    return {
+        filename: file_sha256(os.path.join(data_folder_path, filename))
+        for filename in sorted(os.listdir(data_folder_path))
+        if filename.endswith(SUPPORTED_EXTENSIONS)
+    }
+
+
+def make_chunk_ids(filename: str, content_hash: str, count: int) -> List[str]:
+    """파일명과 콘텐츠 해시로 결정되는 청크 ID 목록"""
+    return [f"{filename}:{content_hash[:12]}:{i}" for i in range(count)]
+
+
+def load_manifest(db_path: str = DB_PATH) -> dict | None:
+    path = os.path.join(resolve_index_dir(db_path, DB_NAME), MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("model") != MODEL_NAME:
+        return None
+    return manifest
+
+
+# ----------------------------------------------------
+# 병렬 로딩/청킹 파이프라인
+# ----------------------------------------------------
+
+
+class StageTimer:
+    """파이프라인 단계별 누적 소요 시간 기록"""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def report(self) -> None:
+        print("\n⏱️ 단계별 소요 시간")
+        for name, seconds in self.seconds.items():
+            print(f"  - {name}: {seconds:.2f}s")
+        print(f"  - 전체 경과: {time.perf_counter() - self._started:.2f}s")
+
+
+def _chunk_file(data_folder_path: str, filename: str, content_hash: str):
+    """
+    파일 하나를 청킹하고 결정적인 청크 ID를 붙여 반환합니다. (워커 프로세스에서 실행)
+    
+    Returns:
+        (파일명, 청크 리스트, 청크 ID 리스트, 소요 시간)
+    """
+    start = time.perf_counter()
+    chunks = load_and_split_file(os.path.join(data_folder_path, filename))
+    ids = make_chunk_ids(filename, content_hash, len(chunks))
+    return filename, chunks, ids, time.perf_counter() - start
+
+
+def iter_file_chunks(data_folder_path: str, files: Dict[str, str], workers: int = DEFAULT_WORKERS):
+    """
+    파일들을 프로세스 풀에서 병렬로 파싱/청킹하고, 끝나는 순서대로 결과를 yield합니다.
+    
+    Args:
+        files: {파일명: 콘텐츠 해시}
+        workers: 워커 프로세스 수 (1 이하이면 현재 프로세스에서 순차 처리)
+    
+    Yields:
+        (파일명, 청크 리스트, 청크 ID 리스트, 소요 시간)
+    """
+    if workers <= 1 or len(files) <= 1:
+        for filename, content_hash in files.items():
+            yield _chunk_file(data_folder_path, filename, content_hash)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+        futures = [
+            pool.submit(_chunk_file, data_folder_path, filename, content_hash)
+            for filename, content_hash in files.items()
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+class _BatchIndexWriter:
+    """
+    청크를 배치 단위로 모아 벡터스토어에 임베딩/추가합니다.
+    
+    파일 파싱이 끝나는 대로 청크가 들어오므로, 워커가 다음 파일을 처리하는 동안
+    메인 프로세스에서 임베딩이 진행됩니다.
+    """
+
+    def __init__(self, embeddings, vectorstore=None, batch_size: int = EMBED_BATCH_SIZE, timer: StageTimer = None):
+        self.embeddings = embeddings
+        self.vectorstore = vectorstore
+        self.batch_size = batch_size
+        self.timer = timer or StageTimer()
+        self.added = 0
+        self._chunks: List[Document] = []
+        self._ids: List[str] = []
+
+    def add(self, chunks: List[Document], ids: List[str]) -> None:
+        for chunk, chunk_id in zip(chunks, ids):
+            self._chunks.append(chunk)
+            self._ids.append(chunk_id)
+            if len(self._chunks) >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        if not self._chunks:
+            return
+        with self.timer.stage("임베딩/인덱싱"):
+            if self.vectorstore is None:
+                self.vectorstore = FAISS.from_documents(self._chunks, self.embeddings, ids=self._ids)
+            else:
+                self.vectorstore.add_documents(self._chunks, ids=self._ids)
+        self.added += len(self._chunks)
+        self._chunks, self._ids = [], []
+
+
+def _index_files(writer: _BatchIndexWriter, data_folder_path: str, files: Dict[str, str], workers: int) -> dict:
+    """
+    파일들을 병렬 청킹 → 배치 임베딩 파이프라인으로 흘려보냅니다.
+    
+    Returns:
+        매니페스트용 {파일명: {"sha256", "chunk_ids"}}
+    """
+    entries = {}
+    for done, (filename, chunks, ids, elapsed) in enumerate(
+        iter_file_chunks(data_folder_path, files, workers), start=1
+    ):
+        writer.timer.add("파싱/청킹 (워커 합계)", elapsed)
+        print(f"  [{done}/{len(files)}] {filename}: {len(chunks)}개 청크 ({elapsed:.2f}s)")
+        entries[filename] = {"sha256": files[filename], "chunk_ids": ids}
+        writer.add(chunks, ids)
+    writer.flush()
+    return entries
+
+
 # ----------------------------------------------------
 # 벡터 DB 생성 및 저장 함수
 # ----------------------------------------------------
 
 
-def create_vector_db(chunks: List[Document]):
+def build_serving_index(vectorstore, index_options: dict = None):
+    """
+    빌드용 Flat 인덱스의 벡터로 서비스용 인덱스(flat/ivf_flat/hnsw/ivf_pq)를 만듭니다.
+    벡터 순서는 그대로 유지되므로 문서 위치 매핑을 공유합니다.
+    """
+    index_options = index_options or {"index_type": "flat"}
+    if index_options.get("index_type", "flat") == "flat":
+        return vectorstore.index
+    vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)
+    return build_faiss_index(vectors, **index_options)
+
+
+def save_index_atomically(vectorstore, manifest: dict, db_path: str = DB_PATH, serving_index=None) -> None:
+    """
+    새 빌드 폴더(builds/{DB_NAME}-{빌드 ID}/)에 인덱스 파일을 모두 쓴 뒤 포인터 하나만 바꿔 공개합니다.
+    
+    .pkl/.faiss, 매니페스트, 서비스용 mmap 형식(pickle 없음)과 태그/BM25 역색인이 같은 폴더에 들어가고,
+    {DB_NAME}.current 포인터를 os.replace로 바꾸는 순간 한꺼번에 교체됩니다. 따라서 읽는 쪽(RagEngine)은
+    이전 빌드나 새 빌드 중 하나의 파일만 보고, 두 빌드의 파일이 섞인 상태를 보지 않습니다.
+    serving_index가 주어지면 그 인덱스(근사 검색용 등)를 mmap 형식으로 저장합니다.
+    
+    .pkl/.faiss는 증분 갱신(벡터 추가/삭제)을 위해 항상 Flat 인덱스로 유지합니다.
+    """
+    os.makedirs(db_path, exist_ok=True)
+    build_dir = new_build_dir(db_path, DB_NAME)
+    try:
+        vectorstore.save_local(folder_path=build_dir, index_name=DB_NAME)
+        with open(os.path.join(build_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        export_mmap_index(vectorstore, build_dir, DB_NAME, index=serving_index)
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    publish_build_dir(db_path, DB_NAME, build_dir)
+
+
+def create_vector_db(chunks: List[Document], ids: List[str] = None, manifest: dict = None):
     """문서 청크를 벡터화하여 FAISS DB로 저장합니다."""
     
     print(f"  -> 임베딩 모델 로드: {MODEL_NAME}")
     
-    embeddings = HuggingFaceEmbeddings(model_name=MODEL_NAME)
-    
-    if not os.path.exists(DB_PATH):
-        os.makedirs(DB_PATH)
+    embeddings = EmbeddingService(MODEL_NAME, cache_dir=EMBEDDING_CACHE_DIR)
         
-    vectorstore = FAISS.from_documents(chunks, embeddings)
-    vectorstore.save_local(folder_path=DB_PATH, index_name=DB_NAME)
+    vectorstore = FAISS.from_documents(chunks, embeddings, ids=ids)
+    save_index_atomically(vectorstore, manifest or _new_manifest({}))
     
-    print(f"\n✅ 벡터 DB가 '{DB_PATH}/{DB_NAME}.faiss'에 {len(chunks)}개 청크로 저장 완료되었습니다.")
+    print(f"\n✅ 벡터 DB가 '{resolve_index_dir(DB_PATH, DB_NAME)}/{DB_NAME}.faiss'에 {len(chunks)}개 청크로 저장 완료되었습니다.")
+
+
+def _new_manifest(files: dict, index_options: dict = None) -> dict:
+    return {
+        "version": MANIFEST_VERSION,
+        "model": MODEL_NAME,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+        "serving_index": index_options or {"index_type": "flat"},
+        "files": files,
+    }
+
+
+def build_index(
+    data_folder_path: str = KB_PATH,
+    full_rebuild: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    batch_size: int = EMBED_BATCH_SIZE,
+    index_options: dict = None,
+    report: bool = False
+) -> dict:
+    """
+    지식 폴더와 매니페스트를 비교하여 인덱스를 증분 갱신합니다.
+    
+    - 새로 추가되었거나 내용이 바뀐 파일만 파싱/임베딩 (프로세스 풀 병렬 처리)
+    - 삭제되었거나 바뀐 파일의 기존 벡터는 제거
+    - 매니페스트가 없거나 임베딩 모델이 바뀌었으면 전체 재빌드
+    
+    Args:
+        index_options: 서비스용 인덱스 설정 (ann_index.build_faiss_index 인자,
+                       예: {"index_type": "hnsw", "hnsw_m": 32})
+        report: 서비스용 인덱스의 재현율/지연시간 리포트 출력 여부
+    
+    Returns:
+        {"added": [...], "updated": [...], "deleted": [...], "chunks": 총 청크 수}
+    """
+    timer = StageTimer()
+    with timer.stage("파일 해시 계산"):
+        current = scan_knowledge_base(data_folder_path)
+    manifest = None if full_rebuild else load_manifest()
+    index_dir = resolve_index_dir(DB_PATH, DB_NAME)
+    index_exists = os.path.exists(os.path.join(index_dir, f"{DB_NAME}.faiss"))
+
+    if manifest is None or not index_exists:
+        print(f"--- 전체 빌드: 문서 {len(current)}개를 병렬로 로드하고 임베딩합니다 (워커 {workers}개) ---")
+        previous, added, updated, deleted = {}, list(current), [], []
+    else:
+        previous = manifest["files"]
+        added = [f for f in current if f not in previous]
+        updated = [f for f in current if f in previous and previous[f]["sha256"] != current[f]]
+        deleted = [f for f in previous if f not in current]
+
+        options_changed = index_options is not None and index_options != manifest.get("serving_index")
+        if not (added or updated or deleted or options_changed or report):
+            print("✅ 변경된 문서가 없습니다. 인덱스가 최신 상태입니다.")
+            return {"added": [], "updated": [], "deleted": [], "chunks": sum(
+                len(entry["chunk_ids"]) for entry in previous.values()
+            )}
+        print(f"--- 증분 빌드: 추가 {len(added)}개, 변경 {len(updated)}개, 삭제 {len(deleted)}개 ---")
+
+    print(f"  -> 임베딩 모델 로드: {MODEL_NAME}")
+    with timer.stage("모델/인덱스 로드"):
+        embeddings = EmbeddingService(MODEL_NAME, batch_size=batch_size, cache_dir=EMBEDDING_CACHE_DIR)
+        vectorstore = None
+        if previous:
+            vectorstore = FAISS.load_local(
+                folder_path=index_dir,
+                index_name=DB_NAME,
+                embeddings=embeddings,
+                allow_dangerous_deserialization=True
+            )
+
+    stale_ids = [cid for f in updated + deleted for cid in previous[f]["chunk_ids"]]
+    if stale_ids:
+        with timer.stage("기존 벡터 제거"):
+            vectorstore.delete(stale_ids)
+
+    files = {f: entry for f, entry in previous.items() if f in current and f not in updated}
+    writer = _BatchIndexWriter(embeddings, vectorstore, batch_size=batch_size, timer=timer)
+    changed = {f: current[f] for f in added + updated}
+    files.update(_index_files(writer, data_folder_path, changed, workers))
+
+    total = sum(len(entry["chunk_ids"]) for entry in files.values())
+    if writer.vectorstore is None or total == 0:
+        if previous:
+            # 남는 청크가 없으면 빈 인덱스를 만들 수 없으므로 전체 재빌드로 처리
+            return build_index(data_folder_path, True, workers, batch_size, index_options, report)
+        print("🚨 임베딩할 문서가 없습니다. knowledge_base 폴더를 확인하세요.")
+        return {"added": [], "updated": [], "deleted": [], "chunks": 0}
+
+    if index_options is None:
+        index_options = (manifest or {}).get("serving_index", {"index_type": "flat"})
+    with timer.stage("서비스 인덱스 빌드"):
+        serving_index = build_serving_index(writer.vectorstore, index_options)
+
+    with timer.stage("저장"):
+        save_index_atomically(
+            writer.vectorstore,
+            _new_manifest(files, index_options),
+            serving_index=serving_index
+        )
+
+    print(f"\n✅ 벡터 DB 저장 완료: 새 청크 {writer.added}개, 제거 {len(stale_ids)}개 (총 {total}개)")
+    print(
+        f"   -> 임베딩 캐시 적중 {embeddings.counters['document_hits']}건, "
+        f"새로 임베딩 {embeddings.counters['document_misses']}건"
+    )
+    timer.report()
+
+    if report:
+        vectors = writer.vectorstore.index.reconstruct_n(0, writer.vectorstore.index.ntotal)
+        rows = recall_report(vectors, serving_index)
+        print_recall_report(rows, index_options.get("index_type", "flat"))
+    return {"added": added, "updated": updated, "deleted": deleted, "chunks": total}
 
 
 # ----------------------------------------------------
 # 메인 실행
 # ----------------------------------------------------
 if __name__ == "__main__":
-    if os.path.exists(f"{DB_PATH}/{DB_NAME}.faiss"):
-        print(f"✅ 벡터 DB가 이미 존재합니다. 'index' 폴더를 삭제하고 재실행하세요.")
-    else:
-        print("--- 1. 문서 로드 및 청킹 시작 ---")
-        documents_to_embed = load_and_split_documents(KB_PATH)
-        print(f"   -> 총 {len(documents_to_embed)}개 청크 생성 완료.")
-        
-        print("\n--- 2. 벡터 인덱스 생성 시작 ---")
-        create_vector_db(documents_to_embed)
-        print("\n[실행 완료]")
+    parser = argparse.ArgumentParser(description="지식 문서를 벡터화하여 FAISS 인덱스를 구축/갱신합니다.")
+    parser.add_argument("--rebuild", action="store_true", help="매니페스트를 무시하고 전체 재빌드")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="파싱/청킹 워커 프로세스 수")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="임베딩 배치 크기")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, help="서비스용 인덱스 종류 (기본: 이전 빌드 설정, 없으면 flat)")
+    parser.add_argument("--nlist", type=int, help="IVF 군집 수 (기본: 약 4·√N)")
+    parser.add_argument("--pq-m", type=int, help="IVF-PQ 서브 양자화기 수 (차원의 약수)")
+    parser.add_argument("--hnsw-m", type=int, default=32, help="HNSW 노드당 연결 수")
+    parser.add_argument("--train-sample", type=int, default=50000, help="IVF 학습 표본 수")
+    parser.add_argument("--report", action="store_true", help="Flat 대비 재현율/지연시간 리포트 출력")
+    args = parser.parse_args()
+
+    index_options = None
+    if args.index_type:
+        index_options = {"index_type": args.index_type, "train_sample": args.train_sample}
+        if args.index_type in ("ivf_flat", "ivf_pq") and args.nlist:
+            index_options["nlist"] = args.nlist
+        if args.index_type == "ivf_pq" and args.pq_m:
+            index_options["pq_m"] = args.pq_m
+        if args.index_type == "hnsw":
+            index_options["hnsw_m"] = args.hnsw_m
+
+    build_index(
+        KB_PATH,
+        full_rebuild=args.rebuild,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        index_options=index_options,
+        report=args.report
+    )
+    print("\n[실행 완료]")
@@ -0,0 +1,219 @@
+"""
+Embedding Service
+
+HuggingFace 임베딩 모델을 감싸는 배치/캐시 임베딩 계층
+
+- embed_documents(): 설정한 배치 크기로 나눠 임베딩하고, 콘텐츠 해시 기준으로
+  디스크(메모리 맵 float32 파일)에 저장하여 같은 텍스트는 다시 임베딩하지 않음
+- embed_query(): 프로세스 내 LRU 캐시
+- LangChain Embeddings 인터페이스를 구현하므로 FAISS 등에 그대로 전달 가능
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def content_key(model_name: str, text: str) -> str:
+    """(모델, 텍스트) 조합의 캐시 키"""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class DiskEmbeddingStore:
+    """
+    콘텐츠 해시 → 임베딩 벡터를 저장하는 추가 전용(append-only) 디스크 저장소
+
+    - vectors.f32: float32 행렬 원본 바이트 (행 단위로 뒤에 이어 씀, np.memmap으로 읽음)
+    - keys.txt: 행 순서대로 한 줄에 하나씩 콘텐츠 해시
+    - meta.json: 모델 이름과 차원
+    """
+
+    def __init__(self, directory: str, model_name: str):
+        self.directory = directory
+        self.model_name = model_name
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._keys_path = os.path.join(directory, "keys.txt")
+        self._meta_path = os.path.join(directory, "meta.json")
+
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._dim = None
+        self._matrix = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _load(self) -> None:
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model_name:
+            return
+        self._dim = meta["dim"]
+
+        with open(self._keys_path, "r", encoding="utf-8") as f:
+            keys = f.read().split()
+
+        # 중간에 중단된 쓰기가 있으면 키/벡터 중 짧은 쪽에 맞춤
+        row_bytes = self._dim * 4
+        rows = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        count = min(len(keys), rows)
+        if count != len(keys) or count != rows:
+            self._truncate(keys[:count], count * row_bytes)
+
+        self._rows = {key: i for i, key in enumerate(keys[:count])}
+        self._map()
+
+    def _truncate(self, keys: List[str], size: int) -> None:
+        with open(self._vectors_path, "a+b") as f:
+            f.truncate(size)
+        with open(self._keys_path, "w", encoding="utf-8") as f:
+            f.write("".join(f"{key}\n" for key in keys))
+
+    def _map(self) -> None:
+        count = len(self._rows)
+        self._matrix = (
+            np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(count, self._dim))
+            if count else None
+        )
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """저장소에 있는 키의 벡터만 반환합니다."""
+        with self._lock:
+            matrix = self._matrix
+            return {key: matrix[self._rows[key]] for key in keys if key in self._rows}
+
+    def add_many(self, keys: List[str], vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            fresh = [i for i, key in enumerate(keys) if key not in self._rows]
+            if not fresh:
+                return
+
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self._meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"model": self.model_name, "dim": self._dim}, f)
+
+            # 벡터를 먼저 쓰고 키를 나중에 써서, 키가 있으면 벡터도 반드시 존재하도록 함
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors[fresh].tobytes())
+            with open(self._keys_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{keys[i]}\n" for i in fresh))
+
+            start = len(self._rows)
+            for offset, i in enumerate(fresh):
+                self._rows[keys[i]] = start + offset
+            self._map()
+
+
+class EmbeddingService(Embeddings):
+    """배치 임베딩 + 디스크 캐시(문서) + LRU 캐시(질의)"""
+
+    def __init__(
+        self,
+        model_name: str = MODEL_NAME,
+        batch_size: int = 64,
+        cache_dir: str = None,
+        query_cache_size: int = 2048,
+        model: Embeddings = None
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.query_cache_size = query_cache_size
+
+        self._model = model
+        self._model_lock = threading.Lock()
+        self._store = DiskEmbeddingStore(cache_dir, model_name) if cache_dir else None
+        self._query_cache: OrderedDict = OrderedDict()
+        self._query_lock = threading.Lock()
+        self.counters = {"document_hits": 0, "document_misses": 0, "query_hits": 0, "query_misses": 0}
+
+    @property
+    def model(self) -> Embeddings:
+        """실제 임베딩 모델 (최초 사용 시 로드)"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from langchain_huggingface import HuggingFaceEmbeddings
+                    self._model = HuggingFaceEmbeddings(
+                        model_name=self.model_name,
+                        encode_kwargs={"batch_size": self.batch_size}
+                    )
+        return self._model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [content_key(self.model_name, text) for text in texts]
+        found = self._store.get_many(keys) if self._store is not None else {}
+
+        # 같은 호출 안의 중복 텍스트도 한 번만 임베딩
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        self.counters["document_hits"] += len(keys) - len(missing)
+        self.counters["document_misses"] += len(missing)
+
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            for start in range(0, len(missing), self.batch_size):
+                batch_keys = missing[start:start + self.batch_size]
+                vectors = np.asarray(
+                    self.model.embed_documents([text_by_key[key] for key in batch_keys]),
+                    dtype=np.float32
+                )
+                if self._store is not None:
+                    self._store.add_many(batch_keys, vectors)
+                found.update(zip(batch_keys, vectors))
+
+        return [np.asarray(found[key]).tolist() for key in keys]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """여러 질의를 한 번에 임베딩합니다. LRU 캐시에 없는 질의만 배치로 모델에 전달합니다."""
+        vectors = {}
+        with self._query_lock:
+            for text in texts:
+                vector = self._query_cache.get(text)
+                if vector is not None:
+                    self._query_cache.move_to_end(text)
+                    vectors[text] = vector
+        self.counters["query_hits"] += sum(1 for text in texts if text in vectors)
+
+        missing = list(dict.fromkeys(text for text in texts if text not in vectors))
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            batch_vectors = self.model.embed_documents(batch)
+            with self._query_lock:
+                self.counters["query_misses"] += len(batch)
+                for text, vector in zip(batch, batch_vectors):
+                    vectors[text] = vector
+                    self._query_cache[text] = vector
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+        return [vectors[text] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        with self._query_lock:
+            vector = self._query_cache.get(text)
+            if vector is not None:
+                self._query_cache.move_to_end(text)
+                self.counters["query_hits"] += 1
+                return vector
+
+        vector = self.model.embed_query(text)
+
+        with self._query_lock:
+            self.counters["query_misses"] += 1
+            self._query_cache[text] = vector
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+        return vector
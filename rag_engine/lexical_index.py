@@ -0,0 +1,183 @@
+"""
+Lexical Index
+
+한국어 법령/지원 문서를 위한 BM25 희소 검색 인덱스
+
+- 토큰화: NFKC 정규화 후 공백 단위 어절을 문자 2-gram으로 분해
+  (예: "제2조제3호" → 제2, 2조, 조제, 제3, 3호 / "최우선변제금" → 최우, 우선, 선변, ...)
+  형태소 분석기 없이도 조문 번호·전문 용어의 부분 일치가 가능
+- 저장: {name}.bm25.npz (용어 배열 + CSR 형식 포스팅 + 문서 길이), pickle 없음
+- reciprocal_rank_fusion(): 벡터 검색 순위와 BM25 순위를 RRF로 결합
+"""
+
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+
+_TOKEN_SPLIT = re.compile(r"[^\w]+")
+
+# 용어는 최대 2글자이므로 고정 길이 유니코드 배열로 저장
+_TERM_DTYPE = "<U2"
+
+
+def tokenize(text: str) -> List[str]:
+    """어절별 문자 2-gram 토큰 (한 글자 어절은 그대로)"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    tokens = []
+    for word in _TOKEN_SPLIT.split(text):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def lexical_index_path(folder_path: str, index_name: str) -> str:
+    return os.path.join(folder_path, f"{index_name}.bm25.npz")
+
+
+class BM25Index:
+    """
+    CSR 형식 BM25 인덱스
+
+    terms[i]의 포스팅은 doc_ids[offsets[i]:offsets[i+1]] / tfs[같은 구간] 입니다.
+    문서 번호는 벡터 위치와 같습니다.
+    """
+
+    def __init__(
+        self,
+        terms: np.ndarray,
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        self.terms = terms
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+
+        count = len(doc_lengths)
+        avg_length = float(doc_lengths.mean()) if count else 0.0
+        df = np.diff(offsets).astype(np.float32)
+        self._idf = np.log(1.0 + (count - df + 0.5) / (df + 0.5)).astype(np.float32)
+        # 문서 길이 정규화 항 k1·(1 - b + b·dl/avgdl)은 질의와 무관하므로 미리 계산
+        self._length_norm = (
+            k1 * (1 - b + b * doc_lengths / avg_length) if avg_length else np.full(count, k1)
+        ).astype(np.float32)
+
+    @property
+    def count(self) -> int:
+        return len(self.doc_lengths)
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str]) -> "BM25Index":
+        """벡터 위치 순서대로 나열된 청크 본문으로 인덱스를 만듭니다."""
+        postings: Dict[str, list] = {}
+        doc_lengths = []
+        for position, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((position, tf))
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        doc_ids, tfs = [], []
+        for i, term in enumerate(terms):
+            entries = postings[term]
+            offsets[i + 1] = offsets[i] + len(entries)
+            doc_ids.extend(position for position, _ in entries)
+            tfs.extend(tf for _, tf in entries)
+
+        return cls(
+            terms=np.asarray(terms, dtype=_TERM_DTYPE),
+            offsets=offsets,
+            doc_ids=np.asarray(doc_ids, dtype=np.int32),
+            tfs=np.minimum(np.asarray(tfs, dtype=np.int64), np.iinfo(np.uint16).max).astype(np.uint16),
+            doc_lengths=np.asarray(doc_lengths, dtype=np.int32)
+        )
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore) -> "BM25Index":
+        """저장된 인덱스가 없을 때 문서 저장소를 한 번 훑어 만듭니다."""
+        def texts():
+            for position in range(vectorstore.index.ntotal):
+                doc = vectorstore.docstore.search(vectorstore.index_to_docstore_id[position])
+                yield getattr(doc, "page_content", "")
+        return cls.from_texts(texts())
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                terms=self.terms,
+                offsets=self.offsets,
+                doc_ids=self.doc_ids,
+                tfs=self.tfs,
+                doc_lengths=self.doc_lengths
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                terms=data["terms"],
+                offsets=data["offsets"],
+                doc_ids=data["doc_ids"],
+                tfs=data["tfs"],
+                doc_lengths=data["doc_lengths"]
+            )
+
+    def scores(self, query: str) -> np.ndarray:
+        """모든 문서의 BM25 점수"""
+        scores = np.zeros(self.count, dtype=np.float32)
+        query_terms = np.asarray(sorted(set(tokenize(query))), dtype=_TERM_DTYPE)
+        if not len(query_terms) or not len(self.terms):
+            return scores
+
+        slots = np.searchsorted(self.terms, query_terms)
+        for term, slot in zip(query_terms, slots):
+            if slot >= len(self.terms) or self.terms[slot] != term:
+                continue
+            start, end = self.offsets[slot], self.offsets[slot + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.tfs[start:end].astype(np.float32)
+            scores[docs] += self._idf[slot] * tf * (self.k1 + 1) / (tf + self._length_norm[docs])
+        return scores
+
+    def search(self, query: str, k: int, allowed: np.ndarray = None) -> List[int]:
+        """점수가 0보다 큰 상위 k개 문서 위치 (allowed가 있으면 그 안에서만)"""
+        scores = self.scores(query)
+        if allowed is not None:
+            mask = np.zeros(self.count, dtype=bool)
+            mask[allowed] = True
+            scores[~mask] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        return [int(i) for i in candidates[np.argsort(-scores[candidates], kind="stable")]]
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int = 60) -> List[int]:
+    """
+    여러 순위 목록을 RRF 점수 Σ 1/(k + 순위)로 결합합니다.
+
+    점수가 같으면 먼저 나온 목록(벡터 검색)의 순서를 따릅니다.
+    """
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, position in enumerate(ranking, start=1):
+            scores[position] = scores.get(position, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda position: -scores[position])
@@ -0,0 +1,247 @@
+"""
+Memory-mapped Vector Store
+
+pickle 없이 읽는 FAISS 인덱스 저장 형식
+
+- {name}.mmap.faiss   : faiss.write_index 결과. faiss.IO_FLAG_MMAP으로 열어 벡터를 메모리 맵으로 공유
+- {name}.docs.jsonl   : 벡터 위치 순서대로 한 줄에 하나씩 {"id", "page_content", "metadata"}
+- {name}.docs.offsets : 각 줄의 시작 바이트 위치 (uint64, 줄 수 + 1개)
+- {name}.tags.npz     : action_type / file_type → 벡터 위치 역색인 (tag_index.py)
+- {name}.bm25.npz     : 청크 본문 BM25 역색인 (lexical_index.py)
+
+빌드 하나는 builds/{name}-{빌드 ID}/ 폴더에 모두 쓰고, {name}.current 포인터 파일 하나만
+os.replace로 바꿔 공개합니다. 읽는 쪽은 포인터가 가리키는 폴더에서만 파일을 열기 때문에
+재로딩 중에도 서로 다른 빌드의 파일이 섞이지 않습니다. (포인터가 없으면 예전처럼 폴더 바로 아래)
+
+여러 워커 프로세스가 같은 파일을 열면 OS 페이지 캐시의 사본 하나를 공유하며,
+문서는 검색 결과로 필요한 청크만 오프셋으로 바로 읽습니다.
+"""
+
+import os
+import json
+import mmap
+import shutil
+import tempfile
+from datetime import datetime
+from collections.abc import Mapping
+
+import faiss
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+try:
+    from .tag_index import TagIndex, tag_index_path
+    from .lexical_index import BM25Index, lexical_index_path
+except ImportError:
+    from tag_index import TagIndex, tag_index_path
+    from lexical_index import BM25Index, lexical_index_path
+
+
+def mmap_index_files(folder_path: str, index_name: str) -> dict:
+    """mmap 형식을 구성하는 파일 경로"""
+    return {
+        "faiss": os.path.join(folder_path, f"{index_name}.mmap.faiss"),
+        "docs": os.path.join(folder_path, f"{index_name}.docs.jsonl"),
+        "offsets": os.path.join(folder_path, f"{index_name}.docs.offsets"),
+    }
+
+
+def mmap_index_exists(folder_path: str, index_name: str) -> bool:
+    return all(os.path.exists(path) for path in mmap_index_files(folder_path, index_name).values())
+
+
+# ----------------------------------------------------
+# 빌드 폴더 / 포인터
+# ----------------------------------------------------
+
+BUILDS_DIR = "builds"
+
+# 새 빌드를 공개한 뒤에도 남겨 두는 이전 빌드 수 (재로딩 중인 읽기 쪽이 아직 열고 있을 수 있음)
+KEEP_PREVIOUS_BUILDS = 1
+
+
+def current_pointer_path(folder_path: str, index_name: str) -> str:
+    return os.path.join(folder_path, f"{index_name}.current")
+
+
+def resolve_index_dir(folder_path: str, index_name: str) -> str:
+    """포인터가 가리키는 빌드 폴더 (포인터가 없거나 폴더가 없으면 folder_path 자체)"""
+    try:
+        with open(current_pointer_path(folder_path, index_name), "r", encoding="utf-8") as f:
+            build = f.read().strip()
+    except FileNotFoundError:
+        return folder_path
+    build_dir = os.path.join(folder_path, BUILDS_DIR, build)
+    return build_dir if build and os.path.isdir(build_dir) else folder_path
+
+
+def new_build_dir(folder_path: str, index_name: str) -> str:
+    """아직 공개되지 않은 새 빌드 폴더 (이름이 시간순으로 정렬됨)"""
+    builds = os.path.join(folder_path, BUILDS_DIR)
+    os.makedirs(builds, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return tempfile.mkdtemp(prefix=f"{index_name}-{stamp}-", dir=builds)
+
+
+def publish_build_dir(folder_path: str, index_name: str, build_dir: str) -> None:
+    """
+    포인터를 build_dir로 원자적으로 바꾸고 오래된 빌드 폴더를 정리합니다.
+    
+    공개된 빌드보다 이름이 앞선(먼저 만든) 폴더만 지우므로 다른 프로세스가 쓰는 중인 새 빌드는 건드리지 않습니다.
+    """
+    build = os.path.basename(build_dir)
+    pointer = current_pointer_path(folder_path, index_name)
+    fd, tmp_path = tempfile.mkstemp(prefix=".current-", dir=folder_path)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(build + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, pointer)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    builds = os.path.join(folder_path, BUILDS_DIR)
+    older = sorted(
+        name for name in os.listdir(builds)
+        if name.startswith(f"{index_name}-") and name < build
+    )
+    for name in older[:max(0, len(older) - KEEP_PREVIOUS_BUILDS)]:
+        shutil.rmtree(os.path.join(builds, name), ignore_errors=True)
+
+
+# ----------------------------------------------------
+# 저장
+# ----------------------------------------------------
+
+
+def export_mmap_index(vectorstore: FAISS, folder_path: str, index_name: str, index=None) -> int:
+    """
+    LangChain FAISS 벡터스토어를 mmap 형식으로 folder_path에 저장합니다.
+
+    index를 주면 벡터스토어의 인덱스 대신 저장합니다. (같은 벡터 순서의 근사 인덱스 등)
+    파일을 바로 쓰므로 서비스 중인 폴더가 아니라 new_build_dir()로 만든 빌드 폴더에 저장한 뒤
+    publish_build_dir()로 공개해야 합니다.
+
+    Returns:
+        저장한 벡터 수
+    """
+    os.makedirs(folder_path, exist_ok=True)
+    paths = mmap_index_files(folder_path, index_name)
+    index = index if index is not None else vectorstore.index
+    count = index.ntotal
+
+    offsets = np.zeros(count + 1, dtype=np.uint64)
+    metadatas, texts = [], []
+    with open(paths["docs"], "wb") as f:
+        for position in range(count):
+            doc_id = vectorstore.index_to_docstore_id[position]
+            doc = vectorstore.docstore.search(doc_id)
+            line = json.dumps(
+                {"id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata},
+                ensure_ascii=False
+            ).encode("utf-8") + b"\n"
+            f.write(line)
+            offsets[position + 1] = offsets[position] + len(line)
+            metadatas.append(doc.metadata)
+            texts.append(doc.page_content)
+    offsets.tofile(paths["offsets"])
+    TagIndex.from_metadatas(metadatas).save(tag_index_path(folder_path, index_name))
+    BM25Index.from_texts(texts).save(lexical_index_path(folder_path, index_name))
+    faiss.write_index(index, paths["faiss"])
+    return count
+
+
+# ----------------------------------------------------
+# 로드
+# ----------------------------------------------------
+
+
+class _PositionalIds(Mapping):
+    """벡터 위치 → 문서 ID. 위치 자체를 ID 문자열로 사용하므로 별도 매핑을 로드하지 않습니다."""
+
+    def __init__(self, count: int):
+        self._count = count
+
+    def __getitem__(self, position: int) -> str:
+        if not 0 <= position < self._count:
+            raise KeyError(position)
+        return str(position)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        return iter(range(self._count))
+
+
+class JsonlDocstore(Docstore):
+    """오프셋 파일로 필요한 줄만 읽는 읽기 전용 문서 저장소"""
+
+    def __init__(self, docs_path: str, offsets_path: str):
+        self._offsets = np.fromfile(offsets_path, dtype=np.uint64)
+        self._file = open(docs_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def record(self, position: int) -> dict:
+        """위치의 원본 레코드 {"id", "page_content", "metadata"}"""
+        start, end = int(self._offsets[position]), int(self._offsets[position + 1])
+        return json.loads(self._data[start:end])
+
+    def search(self, search: str) -> Document | str:
+        try:
+            position = int(search)
+        except ValueError:
+            return f"ID {search} not found."
+        if not 0 <= position < len(self):
+            return f"ID {search} not found."
+        record = self.record(position)
+        return Document(id=record["id"], page_content=record["page_content"], metadata=record["metadata"])
+
+    def close(self) -> None:
+        """메모리 맵과 파일을 닫습니다. (여러 번 호출해도 됨)"""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
+        self._file.close()
+
+
+def _read_index_mmap(path: str) -> faiss.Index:
+    """
+    인덱스 파일을 메모리 맵으로 엽니다.
+
+    - IO_FLAG_MMAP_IFC: Flat/HNSW의 코드 배열을 복사 없이 매핑 (faiss 1.10+)
+    - IO_FLAG_MMAP: IVF 역색인 리스트를 매핑. IVF는 IFC 플래그와 함께 쓸 수 없어 단독으로 재시도
+    """
+    ifc = getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+    if ifc:
+        try:
+            return faiss.read_index(path, faiss.IO_FLAG_MMAP | ifc)
+        except RuntimeError:
+            pass
+    return faiss.read_index(path, faiss.IO_FLAG_MMAP)
+
+
+def load_mmap_vectorstore(folder_path: str, index_name: str, embeddings) -> FAISS:
+    """mmap 형식 인덱스를 pickle 역직렬화 없이 LangChain FAISS 객체로 엽니다."""
+    paths = mmap_index_files(folder_path, index_name)
+    index = _read_index_mmap(paths["faiss"])
+    docstore = JsonlDocstore(paths["docs"], paths["offsets"])
+    if len(docstore) != index.ntotal:
+        raise ValueError(
+            f"mmap 인덱스 불일치: 벡터 {index.ntotal}개, 문서 {len(docstore)}개"
+        )
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=_PositionalIds(index.ntotal)
+    )
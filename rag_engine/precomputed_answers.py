@@ -0,0 +1,231 @@
+"""
+Precomputed Answers
+
+진단 결과(5종) × 자치구(25개)별 첫 안내 답변을 미리 만들어 두는 오프라인 작업과 저장소
+
+- 첫 질문(INITIAL_GUIDANCE_QUERY)은 모든 사용자에게 같으므로, 답변은
+  (진단 결과, 자치구)에 의해서만 정해짐
+- LLM 본문은 자치구와 무관하므로 진단 결과별로 5번만 생성하고,
+  자치구별 관련 링크/연락처를 붙여 5 × (25 + 자치구 없음) 항목으로 저장
+- 인덱스 파일(벡터, 문서 저장소 등 전체) 내용 버전 + 프롬프트 버전이 일치할 때만 사용 (다르면 RAG로 대체)
+- 저장 형식: answers-<해시>.bin (UTF-8 답변을 이어 붙인 파일, mmap으로 읽음)
+             + answers.json (버전, 항목별 오프셋/길이)
+
+실행 (ai_modules 폴더에서):
+    python -m rag_engine.precomputed_answers [--force]
+"""
+
+import os
+import json
+import mmap
+import hashlib
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+
+from .run_chain import PROMPT_VERSION, build_answer_appendix, get_engine
+from .contact_info import get_all_districts, get_contact_info_text
+
+try:
+    from ..classifier.classifier_logic import VICTIM_STATUSES
+except ImportError:
+    from classifier.classifier_logic import VICTIM_STATUSES
+
+
+# test_cli.py의 첫 안내 질문
+INITIAL_GUIDANCE_QUERY = "나는 이제 뭘해야돼? 받을 수 있는 지원이 뭐가 있어?"
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.path.join(CURRENT_DIR, "index", "precomputed")
+META_NAME = "answers.json"
+
+
+def _entry_key(diagnosis: str, district: str = None) -> str:
+    return f"{diagnosis}\t{district or ''}"
+
+
+# ----------------------------------------------------
+# 저장소 (런타임)
+# ----------------------------------------------------
+
+
+class PrecomputedAnswerStore:
+    """
+    answers.json이 바뀌면 다시 여는 읽기 전용 mmap 저장소
+
+    조회(답변 몇 KB 복사)와 교체를 같은 잠금 안에서 하므로, 다시 열 때 이전 mmap을 바로 닫습니다.
+    """
+
+    def __init__(self, directory: str = STORE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._opened = None  # (meta 파일 mtime, meta, mmap, 파일 객체)
+
+    def _current(self):
+        """현재 저장소를 열어 반환합니다. (self._lock 안에서 호출)"""
+        meta_path = os.path.join(self.directory, META_NAME)
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        if self._opened is not None and self._opened[0] == mtime:
+            return self._opened
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        data_file = open(os.path.join(self.directory, meta["data_file"]), "rb")
+        data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        previous, self._opened = self._opened, (mtime, meta, data, data_file)
+        if previous is not None:
+            _close(previous)
+        return self._opened
+
+    def get(self, diagnosis: str, district: str, index_version: str, prompt_version: str) -> str | None:
+        """버전이 일치하는 사전 생성 답변. 없으면 None"""
+        with self._lock:
+            opened = self._current()
+            if opened is None:
+                return None
+            _, meta, data, _ = opened
+            if meta.get("index_version") != index_version or meta.get("prompt_version") != prompt_version:
+                return None
+
+            entries = meta["entries"]
+            entry = entries.get(_entry_key(diagnosis, district))
+            if entry is None and not (district and get_contact_info_text(district)):
+                # 연락처가 없는 자치구는 RAG 답변에도 연락처가 붙지 않으므로 공통 답변과 같음
+                entry = entries.get(_entry_key(diagnosis))
+            if entry is None:
+                return None
+            offset, length = entry
+            encoded = data[offset:offset + length]
+        return encoded.decode("utf-8")
+
+    def close(self) -> None:
+        """열어 둔 mmap과 파일을 닫습니다. (다음 조회 때 다시 엶)"""
+        with self._lock:
+            if self._opened is not None:
+                _close(self._opened)
+                self._opened = None
+
+
+def _close(opened) -> None:
+    _, _, data, data_file = opened
+    data.close()
+    data_file.close()
+
+
+_STORE = PrecomputedAnswerStore()
+
+
+def get_precomputed_answer(diagnosis: str, district: str = None, user_query: str = INITIAL_GUIDANCE_QUERY) -> str | None:
+    """
+    첫 안내 질문에 대한 사전 생성 답변을 반환합니다.
+
+    질문이 INITIAL_GUIDANCE_QUERY가 아니거나, 저장된 답변의 인덱스/프롬프트 버전이
+    현재와 다르면 None (호출 측에서 RAG 답변으로 대체)
+    """
+    if user_query != INITIAL_GUIDANCE_QUERY:
+        return None
+    index_version = get_engine().index_content_version()
+    if index_version is None:
+        return None
+    return _STORE.get(diagnosis, district, index_version, PROMPT_VERSION)
+
+
+# ----------------------------------------------------
+# 오프라인 생성 작업
+# ----------------------------------------------------
+
+
+def _read_meta(directory: str) -> dict | None:
+    try:
+        with open(os.path.join(directory, META_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def build_precomputed_answers(directory: str = STORE_DIR, force: bool = False) -> dict:
+    """
+    진단 결과 × 자치구 답변을 생성하여 저장합니다.
+
+    저장된 답변의 버전이 현재 인덱스/프롬프트와 같으면 force가 아닌 한 건너뜁니다.
+
+    Returns:
+        저장된 메타데이터
+    """
+    engine = get_engine()
+    index_version = engine.index_content_version()
+    if index_version is None:
+        raise FileNotFoundError(f"🚨 오류: 벡터 DB 파일이 없습니다.\n경로: {engine.index_files()[0]}")
+
+    meta = _read_meta(directory)
+    if (
+        not force and meta
+        and meta.get("index_version") == index_version
+        and meta.get("prompt_version") == PROMPT_VERSION
+    ):
+        print(f"✅ 사전 생성 답변이 최신 상태입니다. (인덱스 {index_version}, 프롬프트 {PROMPT_VERSION})")
+        return meta
+
+    print(f"--- 진단 결과 {len(VICTIM_STATUSES)}종의 첫 안내 답변 생성 ---")
+    results = engine.batch([
+        {"user_situation": diagnosis, "user_query": INITIAL_GUIDANCE_QUERY}
+        for diagnosis in VICTIM_STATUSES
+    ])
+    failed = [d for d, r in zip(VICTIM_STATUSES, results) if r["error"] or not r["answer"]]
+    if failed:
+        raise RuntimeError(f"❌ 답변 생성 실패: {', '.join(failed)}")
+
+    districts = [None] + get_all_districts()
+    entries, chunks, offset = {}, [], 0
+    for diagnosis, result in zip(VICTIM_STATUSES, results):
+        for district in districts:
+            text = result["answer"] + "".join(build_answer_appendix(INITIAL_GUIDANCE_QUERY, district))
+            encoded = text.encode("utf-8")
+            entries[_entry_key(diagnosis, district)] = [offset, len(encoded)]
+            chunks.append(encoded)
+            offset += len(encoded)
+    data = b"".join(chunks)
+
+    # 데이터 파일은 내용 해시로 이름을 붙여 새로 쓰고, 메타데이터를 마지막에 교체
+    os.makedirs(directory, exist_ok=True)
+    data_file = f"answers-{hashlib.sha1(data).hexdigest()[:12]}.bin"
+    meta = {
+        "index_version": index_version,
+        "prompt_version": PROMPT_VERSION,
+        "query": INITIAL_GUIDANCE_QUERY,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "data_file": data_file,
+        "entries": entries,
+    }
+    for name, payload in (
+        (data_file, data),
+        (META_NAME, json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8")),
+    ):
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, os.path.join(directory, name))
+
+    for name in os.listdir(directory):
+        if name.startswith("answers-") and name.endswith(".bin") and name != data_file:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                # 다른 프로세스가 열고 있으면(Windows) 다음 생성 때 정리
+                pass
+
+    print(f"✅ 사전 생성 답변 {len(entries)}개 저장 완료: {directory}")
+    print(f"   -> 인덱스 버전 {index_version}, 프롬프트 버전 {PROMPT_VERSION}")
+    return meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="진단 결과 × 자치구별 첫 안내 답변을 미리 생성합니다.")
+    parser.add_argument("--force", action="store_true", help="버전이 같아도 다시 생성")
+    args = parser.parse_args()
+    build_precomputed_answers(force=args.force)
@@ -0,0 +1,110 @@
+"""
+Cross-Encoder Reranker
+
+검색 후보 청크를 (질의, 청크) 쌍 단위로 다시 채점하는 선택적 재정렬 단계 (CPU 전용)
+
+- 다국어 cross-encoder로 후보(기본 30개)를 배치 추론하여 상위 N개만 남김
+- 요청별 시간 예산: 배치 추론이 끝날 때마다 경과 시간을 확인하고, 초과하면 원래(검색) 순서로 대체
+  (마지막 배치가 예산을 넘겨도 대체 - 예산을 넘긴 요청의 점수는 캐시에만 남김)
+- (질의, 청크) 점수 LRU 캐시: 같은 질문이 다시 오면 모델을 호출하지 않음
+- backend="onnx"이면 sentence-transformers의 ONNX Runtime 백엔드 사용
+"""
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+
+
+MODEL_NAME = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+
+
+class CrossEncoderReranker:
+    """시간 예산과 점수 캐시를 갖는 cross-encoder 재정렬기"""
+
+    def __init__(
+        self,
+        model_name: str = MODEL_NAME,
+        batch_size: int = 16,
+        time_budget: float = 0.8,
+        cache_size: int = 20000,
+        backend: str = "torch",
+        model=None
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.time_budget = time_budget
+        self.cache_size = cache_size
+        self.backend = backend
+
+        self._model = model
+        self._model_lock = threading.Lock()
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()  # 캐시와 counters를 함께 보호
+        self.counters = {"requests": 0, "timeouts": 0, "cache_hits": 0, "scored_pairs": 0}
+
+    @property
+    def model(self):
+        """cross-encoder 모델 (최초 사용 시 CPU로 로드)"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+                    self._model = CrossEncoder(self.model_name, device="cpu", backend=self.backend)
+        return self._model
+
+    def rerank(
+        self,
+        query: str,
+        candidates: List[Tuple[str, str]],
+        top_n: int
+    ) -> Tuple[List[int], bool]:
+        """
+        후보를 cross-encoder 점수 순으로 정렬합니다.
+
+        Args:
+            candidates: 검색 순서대로 나열된 (청크 키, 청크 본문) 리스트
+            top_n: 남길 후보 수
+
+        Returns:
+            (남길 후보의 인덱스 리스트, 재정렬 여부)
+            배치 추론 후 시간 예산을 넘겼으면 검색 순서 그대로 상위 top_n개와 False를 반환합니다.
+        """
+        deadline = time.monotonic() + self.time_budget
+        query_key = hashlib.sha1(query.encode("utf-8")).hexdigest()
+
+        scores = {}
+        with self._cache_lock:
+            self.counters["requests"] += 1
+            for i, (chunk_key, _) in enumerate(candidates):
+                score = self._cache.get((query_key, chunk_key))
+                if score is not None:
+                    self._cache.move_to_end((query_key, chunk_key))
+                    scores[i] = score
+            self.counters["cache_hits"] += len(scores)
+
+        missing = [i for i in range(len(candidates)) if i not in scores]
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            batch_scores = self.model.predict(
+                [(query, candidates[i][1]) for i in batch],
+                batch_size=self.batch_size,
+                show_progress_bar=False
+            )
+            timed_out = time.monotonic() >= deadline
+            with self._cache_lock:
+                self.counters["scored_pairs"] += len(batch)
+                for i, score in zip(batch, batch_scores):
+                    scores[i] = float(score)
+                    self._cache[(query_key, candidates[i][0])] = float(score)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                if timed_out:
+                    self.counters["timeouts"] += 1
+            if timed_out:
+                return list(range(min(top_n, len(candidates)))), False
+
+        # 점수가 같으면 검색 순서 유지
+        order = sorted(range(len(candidates)), key=lambda i: (-scores[i], i))
+        return order[:top_n], True
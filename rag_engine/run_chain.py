@@ -1,12 +1,35 @@
 import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+import numpy as np
 from dotenv import load_dotenv
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.runnables import RunnableParallel, RunnableLambda
 from langchain.prompts import ChatPromptTemplate
 from .contact_info import get_district_contact, get_contact_info_text
 from .useful_links import get_relevant_links  # ← 수정: get_related_links → get_relevant_links
+from .answer_cache import AnswerCache, normalize_query
+from .embedding_service import EmbeddingService
+from .mmap_store import load_mmap_vectorstore, mmap_index_exists, mmap_index_files, resolve_index_dir
+from .ann_index import apply_search_params, index_type_of
+from .tag_index import TagIndex, action_types_for, search_positions, tag_index_path
+from .lexical_index import BM25Index, lexical_index_path, reciprocal_rank_fusion
+from .context_budget import ContextBudgeter, ContextChunk
+from .reranker import CrossEncoderReranker
+
+try:
+    from ..classifier.topic_classifier import score_topics
+except ImportError:
+    from classifier.topic_classifier import score_topics
 
 
 # ⭐ .env 파일 로드
@@ -64,11 +87,20 @@ SYSTEM_TEMPLATE = """
 """
 
 
+HUMAN_TEMPLATE = "사용자 상황: {user_situation}\n\n질문: {user_query}"
+LLM_MODEL = "models/gemini-2.5-flash"
+
+
 RAG_PROMPT = ChatPromptTemplate.from_messages([
     ("system", SYSTEM_TEMPLATE),
-    ("human", "사용자 상황: {user_situation}\n\n질문: {user_query}"),
+    ("human", HUMAN_TEMPLATE),
 ])
 
+# 프롬프트/모델이 바뀌면 달라지는 버전 (사전 생성 답변 무효화용)
+PROMPT_VERSION = hashlib.sha1(
+    f"{SYSTEM_TEMPLATE}\0{HUMAN_TEMPLATE}\0{LLM_MODEL}".encode("utf-8")
+).hexdigest()[:12]
+
 
 # 현재 파일의 디렉토리 기준으로 경로 설정
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -76,6 +108,54 @@ DB_PATH = os.path.join(CURRENT_DIR, "index")
 DB_NAME = "jeonse_vector_index"
 MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 
+# 인덱스 형식: auto(mmap 형식이 있으면 우선 사용) | mmap | pickle
+INDEX_FORMAT = os.getenv("RAG_INDEX_FORMAT", "auto")
+
+# 근사 검색 파라미터: IVF 계열 검색 군집 수, HNSW 탐색 후보 수
+FAISS_NPROBE = int(os.getenv("RAG_FAISS_NPROBE", "16"))
+FAISS_EF_SEARCH = int(os.getenv("RAG_FAISS_EF_SEARCH", "64"))
+
+# 검색: 프롬프트에 넣을 청크 수, 벡터/BM25 각각의 후보 수, RRF 상수, 하이브리드 검색 사용 여부
+RETRIEVAL_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+RETRIEVAL_CANDIDATES = int(os.getenv("RAG_CANDIDATES", "20"))
+RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+HYBRID_SEARCH = os.getenv("RAG_HYBRID", "1") != "0"
+
+# 재정렬(선택): cross-encoder 사용 여부, 모델, 후보 수, 요청당 시간 예산(초), 추론 백엔드(torch|onnx)
+RERANK_ENABLED = os.getenv("RAG_RERANK", "0") == "1"
+RERANK_MODEL = os.getenv("RAG_RERANK_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+RERANK_CANDIDATES = int(os.getenv("RAG_RERANK_CANDIDATES", "30"))
+RERANK_TIME_BUDGET = float(os.getenv("RAG_RERANK_TIME_BUDGET", "0.8"))
+RERANK_BACKEND = os.getenv("RAG_RERANK_BACKEND", "torch")
+
+# context 조립: 프롬프트에 넣을 검색 문서의 토큰 예산, 요청별 절약 토큰 출력 여부
+CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "1500"))
+CONTEXT_REPORT = os.getenv("RAG_CONTEXT_REPORT", "0") == "1"
+
+# 인덱스 파일 변경 여부를 확인하는 최소 간격 (초)
+RELOAD_CHECK_INTERVAL = float(os.getenv("RAG_RELOAD_CHECK_INTERVAL", "5"))
+
+# 비동기 경로: 동시에 진행 가능한 LLM 호출 수, 요청당 제한 시간(초), 검색 스레드 수
+LLM_MAX_CONCURRENCY = int(os.getenv("RAG_LLM_MAX_CONCURRENCY", "16"))
+REQUEST_TIMEOUT = float(os.getenv("RAG_REQUEST_TIMEOUT", "60"))
+RETRIEVAL_WORKERS = int(os.getenv("RAG_RETRIEVAL_WORKERS", "4"))
+
+# 배치 API: 동시 LLM 호출 수, 한 번에 묶어 처리할 요청 수, 요청 한도 초과 시 재시도 횟수/대기(초)
+BATCH_MAX_CONCURRENCY = int(os.getenv("RAG_BATCH_MAX_CONCURRENCY", "8"))
+BATCH_CHUNK_SIZE = int(os.getenv("RAG_BATCH_CHUNK_SIZE", "64"))
+BATCH_MAX_RETRIES = int(os.getenv("RAG_BATCH_MAX_RETRIES", "5"))
+BATCH_BACKOFF_BASE = float(os.getenv("RAG_BATCH_BACKOFF_BASE", "2"))
+BATCH_BACKOFF_MAX = float(os.getenv("RAG_BATCH_BACKOFF_MAX", "60"))
+
+# 질의 임베딩 LRU 캐시 크기
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("RAG_QUERY_EMBEDDING_CACHE_SIZE", "4096"))
+
+# 답변 캐시: 최대 항목 수, 유효 시간(초), 의미 유사 적중 임계값(코사인)
+# 의미 유사 적중은 임계값을 실제 질문 쌍으로 보정하기 전까지 기본으로 끔 (RAG_CACHE_SIMILARITY 미설정)
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("RAG_CACHE_MAX_ENTRIES", "2048"))
+ANSWER_CACHE_TTL = float(os.getenv("RAG_CACHE_TTL", "21600"))
+ANSWER_CACHE_SIMILARITY = float(os.getenv("RAG_CACHE_SIMILARITY")) if os.getenv("RAG_CACHE_SIMILARITY") else None
+
 
 # ⭐ 환경변수에서 API 키 로드
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
@@ -86,53 +166,915 @@ if not GOOGLE_API_KEY:
 
 
 # ----------------------------------------------------
-# RAG 체인 구성 함수
+# RAG 엔진 (프로세스 단위 싱글톤)
 # ----------------------------------------------------
 
 
-def create_rag_chain():
-    """커스텀 RAG 체인 객체를 생성하여 반환합니다."""
+class RagEngine:
+    """
+    임베딩 모델, 벡터스토어, 리트리버, LLM 클라이언트를 한 번만 로드해 보관하는 RAG 엔진
     
-    print("  -> 임베딩 모델 로드 중...")
-    embeddings = HuggingFaceEmbeddings(model_name=MODEL_NAME)
+    - warm_up(): 첫 질문 전에 모든 리소스를 미리 로드
+    - invoke(): 여러 스레드에서 동시에 호출해도 안전 (인덱스 상태는 불변 스냅샷으로 교체)
+    - ainvoke(): asyncio 경로. 검색은 스레드 풀에서, LLM 호출은 세마포어로 동시 실행 수 제한
+    - stream()/astream(): LLM 토큰이 도착하는 즉시 순서대로 반환
+    - batch(): 여러 질문을 한 번의 임베딩/FAISS 검색과 LCEL batch로 처리
+    - 답변 캐시에 적중하면 LLM 호출 없이 바로 반환
+    - 인덱스 파일이 디스크에서 바뀌면 다음 호출 시 자동으로 다시 로드
+    - mmap 형식 인덱스가 있으면 pickle 없이 메모리 맵으로 열어 워커 프로세스 간에 공유
+    - focus(주제)를 주면 해당 action_type 태그의 청크만 검색
+    - 벡터 검색과 BM25(문자 2-gram) 검색 순위를 RRF로 결합 (하이브리드 검색)
+    - reranker가 있으면 더 넓은 후보를 cross-encoder로 재정렬 (시간 초과 시 검색 순서 유지)
+    - 검색된 청크는 연속 청크 병합, 중복 제거 후 토큰 예산 안에서 context로 조립
+    """
     
-    print("  -> FAISS 벡터스토어 로드 중...")
-    vectorstore = FAISS.load_local(
-        folder_path=DB_PATH, 
-        index_name=DB_NAME, 
-        embeddings=embeddings, 
-        allow_dangerous_deserialization=True
-    )
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        db_name: str = DB_NAME,
+        index_format: str = INDEX_FORMAT,
+        reload_check_interval: float = RELOAD_CHECK_INTERVAL,
+        nprobe: int = FAISS_NPROBE,
+        ef_search: int = FAISS_EF_SEARCH,
+        top_k: int = RETRIEVAL_TOP_K,
+        candidates: int = RETRIEVAL_CANDIDATES,
+        hybrid: bool = HYBRID_SEARCH,
+        context_token_budget: int = CONTEXT_TOKEN_BUDGET,
+        max_concurrent_llm_calls: int = LLM_MAX_CONCURRENCY,
+        request_timeout: float | None = REQUEST_TIMEOUT,
+        answer_cache: AnswerCache | None = None,
+        reranker: CrossEncoderReranker | None = None
+    ):
+        self.db_path = db_path
+        self.db_name = db_name
+        self.index_format = index_format
+        self.reload_check_interval = reload_check_interval
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.top_k = top_k
+        self.candidates = candidates
+        self.hybrid = hybrid
+        self.context_budgeter = ContextBudgeter(token_budget=context_token_budget)
+        self.max_concurrent_llm_calls = max_concurrent_llm_calls
+        self.request_timeout = request_timeout
+        self.answer_cache = answer_cache
+        self.reranker = reranker
+        
+        self._lock = threading.RLock()
+        self._embeddings = None
+        self._llm = None
+        self._chain = None
+        self._generation_chain = None
+        self._state = None
+        self._readers_lock = threading.Lock()
+        self._last_checked = 0.0
+        self._content_version = None
+        self._context_totals = {"requests": 0, "tokens_in": 0, "tokens_out": 0}
+        self._stats_lock = threading.Lock()
+        
+        # 이벤트 루프마다 별도의 세마포어 (asyncio 객체는 루프에 묶임)
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._executor = None
     
-    retriever = vectorstore.as_retriever(search_kwargs={"k": 5})
-
-    print("  -> Google Gemini API 연결 중...")
-    llm = ChatGoogleGenerativeAI(
-        model="models/gemini-2.5-flash",
-        temperature=0.2,
-        google_api_key=GOOGLE_API_KEY
-    )
+    # --- 인덱스 파일 상태 ---
+    
+    def index_dir(self) -> str:
+        """현재 공개된 빌드 폴더 ({db_name}.current 포인터가 없으면 db_path)"""
+        return resolve_index_dir(self.db_path, self.db_name)
+    
+    def _use_mmap(self, index_dir: str) -> bool:
+        if self.index_format == "mmap":
+            return True
+        return self.index_format == "auto" and mmap_index_exists(index_dir, self.db_name)
+    
+    def index_files(self, index_dir: str = None) -> list:
+        """엔진이 감시하는 인덱스 파일 경로 목록 (첫 번째가 FAISS 인덱스 파일)"""
+        index_dir = index_dir or self.index_dir()
+        if self._use_mmap(index_dir):
+            paths = mmap_index_files(index_dir, self.db_name)
+            return [
+                paths["faiss"],
+                paths["docs"],
+                paths["offsets"],
+                tag_index_path(index_dir, self.db_name),
+                lexical_index_path(index_dir, self.db_name),
+            ]
+        return [
+            os.path.join(index_dir, f"{self.db_name}.faiss"),
+            os.path.join(index_dir, f"{self.db_name}.pkl"),
+        ]
+    
+    def index_exists(self) -> bool:
+        return os.path.exists(self.index_files()[0])
+    
+    def _index_signature(self) -> tuple:
+        """
+        (빌드 폴더, 인덱스 파일들의 (수정시각, 크기)...) 묶음. 값이 바뀌면 재로딩 대상입니다.
+        
+        포인터를 한 번만 읽어 폴더를 정하므로 서명과 로딩이 같은 빌드의 파일만 봅니다.
+        """
+        index_dir = self.index_dir()
+        signature = [index_dir]
+        for path in self.index_files(index_dir):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+    
+    @property
+    def index_version(self) -> str | None:
+        """현재 로드된 인덱스의 버전 문자열 (로드 전이면 None)"""
+        state = self._state
+        return state.version if state else None
+    
+    def index_content_version(self) -> str | None:
+        """
+        인덱스 파일 내용 기준 버전 (인덱스를 로드하지 않고 계산)
+        
+        공개된 빌드의 인덱스 파일(벡터, 문서 저장소, 태그/BM25 역색인 등)을 모두 해시하므로
+        벡터는 같고 문서만 바뀐 재빌드도 다른 버전이 됩니다. 수정시각 기반 index_version과 달리
+        파일을 복사/체크아웃해도 유지되며, 파일 (수정시각, 크기)가 바뀔 때만 다시 해시합니다.
+        """
+        signature = self._index_signature()
+        paths = self.index_files(signature[0])
+        cached = self._content_version
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        if not os.path.exists(paths[0]):
+            return None
+        
+        digest = hashlib.sha256()
+        for path in paths:
+            if not os.path.exists(path):
+                continue  # 선택 파일(태그/BM25 역색인)은 없으면 로드 시 다시 만듦
+            digest.update(os.path.basename(path).encode("utf-8") + b"\0")
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            digest.update(b"\0")
+        version = digest.hexdigest()[:12]
+        self._content_version = (signature, version)
+        return version
+    
+    # --- 리소스 로딩 ---
+    
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    print("  -> 임베딩 모델 로드 중...")
+                    self._embeddings = EmbeddingService(
+                        MODEL_NAME,
+                        query_cache_size=QUERY_EMBEDDING_CACHE_SIZE
+                    )
+        return self._embeddings
+    
+    @property
+    def llm(self):
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    print("  -> Google Gemini API 연결 중...")
+                    self._llm = ChatGoogleGenerativeAI(
+                        model=LLM_MODEL,
+                        temperature=0.2,
+                        google_api_key=GOOGLE_API_KEY
+                    )
+        return self._llm
+    
+    @property
+    def chain(self):
+        """검색부터 답변 생성까지의 전체 LCEL 체인"""
+        if self._chain is None:
+            self._chain = (
+                RunnableParallel({
+                    "context": RunnableLambda(
+                        lambda x: self.retrieve_context(
+                            x["user_situation"], x["user_query"], x.get("query_vector"), x.get("focus")
+                        )
+                    ),
+                    "user_situation": RunnableLambda(lambda x: x["user_situation"]),
+                    "user_query": RunnableLambda(lambda x: x["user_query"])
+                })
+                | self.generation_chain
+            )
+        return self._chain
+    
+    @property
+    def generation_chain(self):
+        """검색이 끝난 context로 답변만 생성하는 체인 (프롬프트 | LLM)"""
+        if self._generation_chain is None:
+            self._generation_chain = RAG_PROMPT | self.llm
+        return self._generation_chain
+    
+    def _load_state(self, signature: tuple) -> "_IndexState":
+        index_dir = signature[0]
+        if self._use_mmap(index_dir):
+            print("  -> FAISS 벡터스토어 로드 중... (mmap)")
+            vectorstore = load_mmap_vectorstore(index_dir, self.db_name, self.embeddings)
+        else:
+            print("  -> FAISS 벡터스토어 로드 중...")
+            vectorstore = FAISS.load_local(
+                folder_path=index_dir,
+                index_name=self.db_name,
+                embeddings=self.embeddings,
+                allow_dangerous_deserialization=True
+            )
+        apply_search_params(vectorstore.index, nprobe=self.nprobe, ef_search=self.ef_search)
+        tags = self._load_tags(vectorstore, index_dir)
+        lexical = self._load_lexical(vectorstore, index_dir) if self.hybrid else None
+        version = hashlib.sha1(repr(signature).encode("utf-8")).hexdigest()[:12]
+        
+        print(f"  -> RAG 체인 생성 완료 (인덱스: {index_type_of(vectorstore.index)}, 벡터 {vectorstore.index.ntotal}개)")
+        return _IndexState(
+            vectorstore=vectorstore,
+            tags=tags,
+            lexical=lexical,
+            signature=signature,
+            version=version
+        )
+    
+    def _load_tags(self, vectorstore, index_dir: str) -> TagIndex:
+        """빌드 시 저장된 태그 역색인을 읽고, 없거나 인덱스와 맞지 않으면 문서 저장소에서 만듭니다."""
+        path = tag_index_path(index_dir, self.db_name)
+        if self._use_mmap(index_dir) and os.path.exists(path):
+            tags = TagIndex.load(path)
+            if tags.count == vectorstore.index.ntotal:
+                return tags
+        return TagIndex.from_vectorstore(vectorstore)
+    
+    def _load_lexical(self, vectorstore, index_dir: str) -> BM25Index:
+        """빌드 시 저장된 BM25 인덱스를 읽고, 없거나 인덱스와 맞지 않으면 문서 저장소에서 만듭니다."""
+        path = lexical_index_path(index_dir, self.db_name)
+        if self._use_mmap(index_dir) and os.path.exists(path):
+            lexical = BM25Index.load(path)
+            if lexical.count == vectorstore.index.ntotal:
+                return lexical
+        print("  -> BM25 인덱스 생성 중...")
+        return BM25Index.from_vectorstore(vectorstore)
+    
+    def _current_state(self) -> "_IndexState":
+        """로드된 상태를 반환하고, 주기적으로 인덱스 파일 변경 여부를 확인합니다."""
+        state = self._state
+        if state is not None and time.monotonic() - self._last_checked < self.reload_check_interval:
+            return state
+        
+        with self._lock:
+            state = self._state
+            if state is not None and time.monotonic() - self._last_checked < self.reload_check_interval:
+                return state
+            
+            signature = self._index_signature()
+            self._last_checked = time.monotonic()
+            if state is not None and signature == state.signature:
+                return state
+            
+            try:
+                self._swap_state(self._load_state(signature))
+            except Exception as e:
+                # 인덱스 교체 도중이면 기존 상태로 계속 서비스하고 다음 확인 때 재시도
+                if state is None:
+                    raise
+                print(f"  ⚠️ 인덱스 재로딩 실패, 기존 인덱스 유지: {e}")
+            return self._state
+    
+    def _swap_state(self, state: "_IndexState") -> None:
+        """새 상태로 바꾸고, 이전 상태는 읽는 중인 요청이 모두 끝나면 닫습니다. (self._lock 안에서 호출)"""
+        previous, self._state = self._state, state
+        if previous is None:
+            return
+        with self._readers_lock:
+            previous.retired = True
+            idle = previous.readers == 0
+        if idle:
+            previous.close()
+    
+    @contextmanager
+    def _reading(self):
+        """
+        현재 인덱스 상태를 빌려 씁니다.
+        
+        빌리는 동안 재로딩으로 상태가 바뀌어도 이전 상태의 문서 저장소(mmap 파일)는 닫히지 않고,
+        마지막으로 빌린 요청이 반납할 때 닫힙니다.
+        """
+        while True:
+            state = self._current_state()
+            with self._readers_lock:
+                if not state.retired:
+                    state.readers += 1
+                    break
+        try:
+            yield state
+        finally:
+            with self._readers_lock:
+                state.readers -= 1
+                idle = state.retired and state.readers == 0
+            if idle:
+                state.close()
+    
+    def warm_up(self) -> "RagEngine":
+        """임베딩 모델, 벡터스토어, LLM 클라이언트를 미리 로드합니다."""
+        self._current_state()
+        self.chain
+        if self.reranker is not None:
+            print("  -> 재정렬 모델 로드 중...")
+            self.reranker.model
+        return self
+    
+    def reload(self) -> "RagEngine":
+        """인덱스를 강제로 다시 로드합니다."""
+        with self._lock:
+            self._swap_state(self._load_state(self._index_signature()))
+            self._last_checked = time.monotonic()
+        return self
+    
+    def stats(self) -> dict:
+        """엔진 상태 및 캐시 지표"""
+        return {
+            "index_version": self.index_version,
+            "embedding_cache": dict(self.embeddings.counters) if self._embeddings else None,
+            "answer_cache": self.answer_cache.stats() if self.answer_cache else None,
+            "reranker": dict(self.reranker.counters) if self.reranker else None,
+            "context": dict(self._context_totals, tokens_saved=(
+                self._context_totals["tokens_in"] - self._context_totals["tokens_out"]
+            )),
+        }
+    
+    # --- 검색 ---
+    
+    def embed_query(self, text: str) -> list:
+        """질의 임베딩 (LRU 캐시 공유)"""
+        return self.embeddings.embed_query(text)
+    
+    def embed_queries(self, texts: list) -> list:
+        """여러 질의 임베딩 (LRU 캐시에 없는 질의만 배치로 계산)"""
+        return self.embeddings.embed_queries(texts)
+    
+    def retrieve_context(
+        self,
+        user_situation: str,
+        user_query: str,
+        query_vector=None,
+        focus=None,
+        dense_positions: list = None
+    ) -> str:
+        """
+        질문과 관련된 문서를 검색하여 프롬프트용 context 문자열로 반환합니다.
+        
+        focus: 주제 이름 또는 주제 리스트 (예: "금융", ["금융", "법률"]).
+               해당 action_type 청크만 검색하고, 부족하면 전체 검색 결과로 채웁니다.
+        dense_positions: 이미 수행한 벡터 검색 결과 (같은 상태에서 검색한 위치여야 함)
+        """
+        with self._reading() as state:
+            chunks = self._retrieve_chunks(state, user_situation, user_query, query_vector, focus, dense_positions)
+        return self._pack_context(user_situation, user_query, chunks)
     
-    def format_docs(docs):
-        """검색된 문서들을 하나의 문자열로 결합합니다."""
-        return "\n\n".join(doc.page_content for doc in docs)
+    def _retrieve_chunks(
+        self,
+        state: "_IndexState",
+        user_situation: str,
+        user_query: str,
+        query_vector=None,
+        focus=None,
+        dense_positions: list = None
+    ) -> list:
+        """state의 인덱스로 검색하고 같은 state의 문서 저장소에서 청크 본문을 읽습니다. (_reading() 안에서 호출)"""
+        vectorstore = state.vectorstore
+        positions = self._retrieve_positions(
+            state, user_situation, user_query, query_vector, focus, self._retrieval_limit(), dense_positions
+        )
+        
+        chunks = []
+        for rank, position in enumerate(positions):
+            doc_id = vectorstore.index_to_docstore_id[position]
+            doc = vectorstore.docstore.search(doc_id)
+            chunks.append(ContextChunk(doc.page_content, rank, getattr(doc, "id", None) or doc_id))
+        return chunks
+    
+    def _pack_context(self, user_situation: str, user_query: str, chunks: list) -> str:
+        """(재정렬 후) 청크를 토큰 예산 안에서 context 문자열로 조립합니다."""
+        if self.reranker is not None and len(chunks) > self.top_k:
+            order, _ = self.reranker.rerank(
+                _search_text(user_situation, user_query),
+                [(chunk.chunk_id, chunk.text) for chunk in chunks],
+                self.top_k
+            )
+            chunks = [
+                ContextChunk(chunks[i].text, rank, chunks[i].chunk_id)
+                for rank, i in enumerate(order)
+            ]
+        
+        context, report = self.context_budgeter.pack(chunks)
+        with self._stats_lock:
+            self._context_totals["requests"] += 1
+            self._context_totals["tokens_in"] += report.tokens_in
+            self._context_totals["tokens_out"] += report.tokens_out
+        if CONTEXT_REPORT:
+            print(f"  -> context: {report.summary()}")
+        return context
+    
+    def _retrieve_positions(
+        self,
+        state: "_IndexState",
+        user_situation: str,
+        user_query: str,
+        query_vector=None,
+        focus=None,
+        limit: int = None,
+        dense_positions: list = None
+    ) -> list:
+        """
+        상위 limit개(기본 top_k) 청크의 벡터 위치를 반환합니다.
+        
+        하이브리드 검색이면 벡터 검색과 BM25 검색에서 각각 candidates개(limit보다 작으면
+        limit개) 후보를 뽑아 RRF로 결합합니다. 조문 번호("제2조제3호")나 전문 용어("최우선변제금")처럼
+        영어 임베딩 모델이 놓치는 정확한 표현을 BM25가 보완합니다.
+        """
+        search_text = _search_text(user_situation, user_query)
+        if query_vector is None:
+            query_vector = self.embed_query(search_text)
+        
+        action_types = action_types_for(focus)
+        allowed = state.tags.positions("action_type", action_types) if action_types else None
+        
+        limit = limit or self.top_k
+        candidates = self._dense_candidates(state, limit)
+        dense = dense_positions
+        if dense is None:
+            dense = search_positions(state.vectorstore.index, query_vector, candidates, allowed)
+        if state.lexical is None:
+            return dense[:limit]
+        
+        lexical = state.lexical.search(search_text, candidates, allowed)
+        return reciprocal_rank_fusion([dense, lexical], k=RRF_K)[:limit]
+    
+    def _retrieval_limit(self) -> int:
+        """context 조립(또는 재정렬) 전에 가져올 청크 수"""
+        return max(RERANK_CANDIDATES, self.top_k) if self.reranker is not None else self.top_k
+    
+    def _dense_candidates(self, state: "_IndexState", limit: int) -> int:
+        """벡터 검색 후보 수 (하이브리드 검색이면 RRF용으로 더 넓게)"""
+        return limit if state.lexical is None else max(self.candidates, limit)
+    
+    def _prepare(self, user_situation: str, user_query: str, district: str = None, focus=None):
+        """
+        질의 임베딩을 계산하고 답변 캐시를 조회합니다.
+        
+        Returns:
+            (query_vector, cached_answer) - 캐시 실패 시 cached_answer는 None
+        """
+        self._current_state()
+        query_vector = self.embed_query(_search_text(user_situation, user_query))
+        if self.answer_cache is None:
+            return query_vector, None
+        
+        cached = self.answer_cache.get(
+            user_situation,
+            user_query,
+            district,
+            query_vector=self._cache_vector(user_query),
+            index_version=self.index_version,
+            focus=_focus_key(focus)
+        )
+        return query_vector, cached
+    
+    def _cache_vector(self, user_query: str):
+        """
+        답변 캐시의 의미 유사 조회용 벡터 (의미 유사 조회가 꺼져 있으면 None)
+        
+        검색용 벡터(상황 + 질문)가 아니라 정규화된 질문만 임베딩합니다. 같은 버킷의 항목은
+        모두 상황이 같으므로, 상황 문구를 함께 임베딩하면 다른 질문끼리도 유사도가 높아집니다.
+        """
+        if self.answer_cache is None or not self.answer_cache.semantic_enabled:
+            return None
+        return self.embed_query(normalize_query(user_query))
+    
+    def _remember(self, user_situation, user_query, district, answer, focus=None) -> None:
+        if self.answer_cache is not None and answer:
+            self.answer_cache.put(
+                user_situation,
+                user_query,
+                district,
+                answer,
+                query_vector=self._cache_vector(user_query),
+                index_version=self.index_version,
+                focus=_focus_key(focus)
+            )
+    
+    # --- 실행 ---
+    
+    def invoke(self, user_situation: str, user_query: str, district: str = None, focus=None) -> str:
+        """
+        RAG 체인을 실행하여 LLM 답변 본문을 반환합니다.
+        
+        district는 답변 캐시 키로만 사용되고, focus는 검색 대상 주제를 제한합니다.
+        """
+        query_vector, cached = self._prepare(user_situation, user_query, district, focus)
+        if cached is not None:
+            return cached
+        
+        response = self.chain.invoke({
+            "user_situation": user_situation,
+            "user_query": user_query,
+            "query_vector": query_vector,
+            "focus": focus
+        })
+        self._remember(user_situation, user_query, district, response.content, focus)
+        return response.content
     
-    rag_chain = (
-        RunnableParallel({
-            "context": RunnableLambda(
-                lambda x: format_docs(
-                    retriever.invoke(f"{x['user_situation']} {x['user_query']}")
+    def stream(self, user_situation: str, user_query: str, district: str = None, focus=None):
+        """RAG 답변 본문을 LLM 토큰 단위로 생성합니다. (제너레이터)"""
+        query_vector, cached = self._prepare(user_situation, user_query, district, focus)
+        if cached is not None:
+            yield cached
+            return
+        
+        tokens = []
+        for chunk in self.chain.stream({
+            "user_situation": user_situation,
+            "user_query": user_query,
+            "query_vector": query_vector,
+            "focus": focus
+        }):
+            if chunk.content:
+                tokens.append(chunk.content)
+                yield chunk.content
+        self._remember(user_situation, user_query, district, "".join(tokens), focus)
+    
+    def batch(
+        self,
+        items: list,
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+        chunk_size: int = BATCH_CHUNK_SIZE,
+        max_retries: int = BATCH_MAX_RETRIES,
+        on_result=None
+    ) -> list:
+        """
+        여러 질문의 LLM 답변 본문을 한 번에 생성합니다.
+        
+        - 모든 질의를 한 번의 배치로 임베딩하고, 필터가 없는 질의는 chunk_size개마다 한 번의 다중 질의
+          FAISS search로 검색 (검색과 문서 읽기는 같은 인덱스 상태에서 - 그 사이 재로딩되어도 섞이지 않음)
+        - 답변 캐시에 있는 질문은 LLM을 호출하지 않음
+        - 나머지는 chunk_size개씩 LCEL batch(max_concurrency)로 생성하고,
+          요청 한도 초과(429) 오류만 지수 백오프 후 재시도
+        
+        Args:
+            items: {"user_situation", "user_query", "district"(선택), "focus"(선택)} 딕셔너리 리스트
+            on_result: 결과가 나올 때마다 호출할 함수 (index, answer, cached, error)
+        
+        Returns:
+            items 순서대로 {"answer", "cached", "error"} 리스트
+        """
+        results = [None] * len(items)
+        
+        def finish(i, answer, cached=False, error=None):
+            results[i] = {"answer": answer, "cached": cached, "error": error}
+            if on_result is not None:
+                on_result(i, answer, cached, error)
+        
+        self._current_state()
+        vectors = self.embeddings.embed_queries([
+            _search_text(item["user_situation"], item["user_query"]) for item in items
+        ])
+        
+        cache_vectors = [None] * len(items)
+        if self.answer_cache is not None and self.answer_cache.semantic_enabled:
+            cache_vectors = self.embeddings.embed_queries([normalize_query(item["user_query"]) for item in items])
+        
+        pending = []
+        for i, (item, cache_vector) in enumerate(zip(items, cache_vectors)):
+            cached = None
+            if self.answer_cache is not None:
+                cached = self.answer_cache.get(
+                    item["user_situation"],
+                    item["user_query"],
+                    item.get("district"),
+                    query_vector=cache_vector,
+                    index_version=self.index_version,
+                    focus=_focus_key(item.get("focus"))
+                )
+            if cached is not None:
+                finish(i, cached, cached=True)
+            else:
+                pending.append(i)
+        
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            
+            # 다중 질의 검색과 청크 읽기를 한 번 빌린 상태로 처리 (검색 위치가 다른 빌드의 문서를 가리키지 않도록)
+            with self._reading() as state:
+                dense = {}
+                unfiltered = [i for i in chunk if not action_types_for(items[i].get("focus"))]
+                if unfiltered:
+                    k = self._dense_candidates(state, self._retrieval_limit())
+                    _, ids = state.vectorstore.index.search(
+                        np.asarray([vectors[i] for i in unfiltered], dtype=np.float32), k
+                    )
+                    dense = {i: [int(p) for p in row if p >= 0] for i, row in zip(unfiltered, ids)}
+                
+                retrieved = {
+                    i: self._retrieve_chunks(
+                        state,
+                        items[i]["user_situation"],
+                        items[i]["user_query"],
+                        vectors[i],
+                        items[i].get("focus"),
+                        dense_positions=dense.get(i)
+                    )
+                    for i in chunk
+                }
+            
+            inputs = [
+                {
+                    "context": self._pack_context(items[i]["user_situation"], items[i]["user_query"], retrieved[i]),
+                    "user_situation": items[i]["user_situation"],
+                    "user_query": items[i]["user_query"],
+                }
+                for i in chunk
+            ]
+            for i, response in zip(chunk, self._generate_with_retry(inputs, max_concurrency, max_retries)):
+                item = items[i]
+                if isinstance(response, Exception):
+                    finish(i, None, error=f"{type(response).__name__}: {response}")
+                    continue
+                self._remember(
+                    item["user_situation"], item["user_query"], item.get("district"),
+                    response.content, item.get("focus")
                 )
+                finish(i, response.content)
+        return results
+    
+    def _generate_with_retry(self, inputs: list, max_concurrency: int, max_retries: int) -> list:
+        """generation_chain.batch를 실행하고, 요청 한도 초과로 실패한 입력만 백오프 후 다시 보냅니다."""
+        outputs = [None] * len(inputs)
+        todo = list(range(len(inputs)))
+        for attempt in range(max_retries + 1):
+            responses = self.generation_chain.batch(
+                [inputs[i] for i in todo],
+                config={"max_concurrency": max_concurrency},
+                return_exceptions=True
+            )
+            retry = []
+            for i, response in zip(todo, responses):
+                if isinstance(response, Exception) and _is_rate_limited(response) and attempt < max_retries:
+                    retry.append(i)
+                else:
+                    outputs[i] = response
+            if not retry:
+                break
+            
+            # 지수 백오프 + 지터 (동시에 실패한 요청들이 한꺼번에 재시도하지 않도록)
+            delay = min(BATCH_BACKOFF_MAX, BATCH_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"  ⚠️ 요청 한도 초과 {len(retry)}건, {delay:.1f}초 후 재시도 ({attempt + 1}/{max_retries})")
+            time.sleep(delay)
+            todo = retry
+        return outputs
+    
+    # --- 비동기 실행 ---
+    
+    def _retrieval_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=RETRIEVAL_WORKERS,
+                        thread_name_prefix="rag-retrieval"
+                    )
+        return self._executor
+    
+    def _llm_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent_llm_calls)
+            self._semaphores[loop] = semaphore
+        return semaphore
+    
+    def _prepare_with_context(self, user_situation: str, user_query: str, district: str = None, focus=None):
+        """캐시 조회 후 실패한 경우에만 문서 검색까지 수행합니다. (스레드 풀에서 실행)"""
+        query_vector, cached = self._prepare(user_situation, user_query, district, focus)
+        if cached is not None:
+            return query_vector, cached, None
+        context = self.retrieve_context(user_situation, user_query, query_vector, focus)
+        return query_vector, None, context
+    
+    async def ainvoke(
+        self,
+        user_situation: str,
+        user_query: str,
+        district: str = None,
+        timeout: float | None = None,
+        focus=None
+    ) -> str:
+        """
+        비동기로 RAG 답변 본문을 생성합니다.
+        
+        Args:
+            district: 답변 캐시 키로만 사용
+            focus: 검색 대상 주제 (retrieve_context 참고)
+            timeout: 요청 전체(세마포어 대기 포함) 제한 시간. None이면 엔진 기본값 사용
+        
+        Raises:
+            asyncio.TimeoutError: 제한 시간 초과
+            asyncio.CancelledError: 호출 측에서 작업을 취소한 경우
+        """
+        if timeout is None:
+            timeout = self.request_timeout
+        return await asyncio.wait_for(
+            self._ainvoke(user_situation, user_query, district, focus),
+            timeout
+        )
+    
+    async def _ainvoke(self, user_situation: str, user_query: str, district: str = None, focus=None) -> str:
+        loop = asyncio.get_running_loop()
+        
+        # 임베딩/FAISS 검색(및 최초 로드)은 CPU 작업이므로 이벤트 루프 밖에서 실행
+        query_vector, cached, context = await loop.run_in_executor(
+            self._retrieval_executor(),
+            self._prepare_with_context,
+            user_situation,
+            user_query,
+            district,
+            focus
+        )
+        if cached is not None:
+            return cached
+        
+        async with self._llm_semaphore():
+            response = await self.generation_chain.ainvoke({
+                "context": context,
+                "user_situation": user_situation,
+                "user_query": user_query
+            })
+        self._remember(user_situation, user_query, district, response.content, focus)
+        return response.content
+    
+    async def astream(
+        self,
+        user_situation: str,
+        user_query: str,
+        district: str = None,
+        timeout: float | None = None,
+        focus=None
+    ):
+        """
+        비동기로 RAG 답변 본문을 토큰 단위로 생성합니다. (async 제너레이터)
+        
+        timeout은 요청 전체에 대한 마감 시간이며, 다음 토큰을 기다리는 동안
+        마감 시간을 넘기면 asyncio.TimeoutError가 발생합니다.
+        """
+        if timeout is None:
+            timeout = self.request_timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        
+        def remaining():
+            return None if deadline is None else max(deadline - loop.time(), 0)
+        
+        query_vector, cached, context = await asyncio.wait_for(
+            loop.run_in_executor(
+                self._retrieval_executor(),
+                self._prepare_with_context,
+                user_situation,
+                user_query,
+                district,
+                focus
             ),
-            "user_situation": RunnableLambda(lambda x: x["user_situation"]),
-            "user_query": RunnableLambda(lambda x: x["user_query"])
-        })
-        | RAG_PROMPT
-        | llm
+            remaining()
+        )
+        if cached is not None:
+            yield cached
+            return
+        
+        tokens = []
+        async with self._llm_semaphore():
+            chunks = self.generation_chain.astream({
+                "context": context,
+                "user_situation": user_situation,
+                "user_query": user_query
+            }).__aiter__()
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), remaining())
+                    except StopAsyncIteration:
+                        break
+                    if chunk.content:
+                        tokens.append(chunk.content)
+                        yield chunk.content
+            finally:
+                await chunks.aclose()
+        self._remember(user_situation, user_query, district, "".join(tokens), focus)
+
+
+@dataclass(eq=False)
+class _IndexState:
+    """
+    한 번 로드된 인덱스 (교체만 되고 수정되지 않음)
+    
+    readers/retired는 RagEngine._readers_lock 안에서만 바꿉니다.
+    """
+    vectorstore: object
+    tags: TagIndex
+    lexical: BM25Index | None
+    signature: tuple
+    version: str
+    readers: int = 0
+    retired: bool = False
+    
+    def close(self) -> None:
+        """mmap 문서 저장소의 파일/메모리 맵을 닫습니다. (pickle 저장소는 닫을 것이 없음)"""
+        close = getattr(self.vectorstore.docstore, "close", None)
+        if close is not None:
+            close()
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """Gemini API의 요청 한도 초과(429 / ResourceExhausted) 오류인지 확인합니다."""
+    if getattr(error, "code", None) == 429 or getattr(error, "status_code", None) == 429:
+        return True
+    text = f"{type(error).__name__} {error}"
+    return any(marker in text for marker in ("429", "ResourceExhausted", "RESOURCE_EXHAUSTED", "rate limit", "quota"))
+
+
+def _focus_key(focus) -> str | None:
+    """실제로 적용되는 검색 필터를 답변 캐시 키로 사용 (필터가 없으면 None)"""
+    return ",".join(action_types_for(focus)) or None
+
+
+def _search_text(user_situation: str, user_query: str) -> str:
+    """벡터 검색에 사용할 질의 문자열"""
+    return f"{user_situation} {user_query}"
+
+
+def _default_answer_cache() -> AnswerCache | None:
+    if os.getenv("RAG_CACHE_ENABLED", "1") == "0":
+        return None
+    return AnswerCache(
+        max_entries=ANSWER_CACHE_MAX_ENTRIES,
+        ttl=ANSWER_CACHE_TTL,
+        similarity_threshold=ANSWER_CACHE_SIMILARITY
     )
+
+
+def _default_reranker() -> CrossEncoderReranker | None:
+    if not RERANK_ENABLED:
+        return None
+    return CrossEncoderReranker(
+        RERANK_MODEL,
+        time_budget=RERANK_TIME_BUDGET,
+        backend=RERANK_BACKEND
+    )
+
+
+_ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_engine() -> RagEngine:
+    """프로세스 전체에서 공유하는 RagEngine 인스턴스를 반환합니다."""
+    global _ENGINE
+    if _ENGINE is None:
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                _ENGINE = RagEngine(
+                    answer_cache=_default_answer_cache(),
+                    reranker=_default_reranker()
+                )
+    return _ENGINE
+
+
+def warm_up_in_background(*steps) -> threading.Thread:
+    """
+    공유 엔진을 백그라운드 스레드에서 미리 로드합니다.
+    
+    진단 질문에 답하는 동안 모델과 인덱스를 올려두면 첫 답변 대기 시간이 줄어듭니다.
+    로드에 실패하면 첫 질문 시점에 다시 시도합니다.
+    
+    steps: 엔진보다 먼저 실행할 준비 작업 (예: 위기 감지기 warm_up - 첫 메시지부터 쓰이므로 먼저)
+    """
+    def _warm_up():
+        for step in steps:
+            try:
+                step()
+            except Exception as e:
+                print(f"  ⚠️ 사전 준비 실패 ({getattr(step, '__qualname__', step)}): {e}")
+        try:
+            get_engine().warm_up()
+        except Exception as e:
+            print(f"  ⚠️ RAG 엔진 사전 로드 실패: {e}")
     
-    print("  -> RAG 체인 생성 완료")
-    return rag_chain
+    thread = threading.Thread(target=_warm_up, name="rag-engine-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def create_rag_chain():
+    """공유 RAG 엔진의 체인 객체를 반환합니다. (최초 호출 시 로드)"""
+    return get_engine().warm_up().chain
 
 
 # ----------------------------------------------------
@@ -150,20 +1092,51 @@ def extract_keywords_from_query(query: str) -> list:
     Returns:
         추출된 키워드 리스트
     """
-    keyword_map = {
-        "주거": ["주거", "집", "임대", "전세", "긴급주거비", "공공임대"],
-        "금융": ["금융", "대출", "이자", "상환", "디딤돌", "버팀목", "금리"],
-        "법률": ["법률", "변호사", "소송", "경매", "대항력"],
-        "생계": ["생계", "생활비", "긴급", "복지"],
-        "신청": ["신청", "절차", "서류", "방법"],
-    }
+    return score_topics(query).keywords()
+
+
+# ----------------------------------------------------
+# 답변 후처리 (관련 링크, 자치구 연락처)
+# ----------------------------------------------------
+
+
+def build_answer_appendix(user_query: str, district: str = None) -> list:
+    """
+    LLM 답변 뒤에 붙일 부가 정보 섹션 목록을 반환합니다.
+    
+    Args:
+        user_query: 사용자 질문 (관련 링크 키워드 추출용)
+        district: 사용자의 거주 자치구 (선택사항)
+    
+    Returns:
+        답변 뒤에 순서대로 이어 붙일 문자열 리스트
+    """
+    sections = []
     
-    keywords = []
-    for category, words in keyword_map.items():
-        if any(word in query for word in words):
-            keywords.append(category)
+    # ⭐ 관련 링크 추가 (키워드 기반)
+    keywords = extract_keywords_from_query(user_query)
+    if keywords:
+        related_links = get_relevant_links(keywords)
+        if related_links:
+            sections.append(
+                "\n\n" + "="*70
+                + "\n🔗 관련 유용한 링크\n"
+                + "="*70 + "\n"
+                + related_links
+            )
     
-    return keywords
+    # 자치구 정보가 있으면 연락처 추가
+    if district:
+        contact_info = get_contact_info_text(district)
+        if contact_info:
+            sections.append(
+                "\n\n" + "="*70
+                + f"\n📞 {district} 연락처\n"
+                + "="*70 + "\n"
+                + contact_info
+            )
+    
+    return sections
 
 
 # ----------------------------------------------------
@@ -171,7 +1144,7 @@ def extract_keywords_from_query(query: str) -> list:
 # ----------------------------------------------------
 
 
-def get_rag_response(user_situation: str, user_query: str, district: str = None) -> str:
+def get_rag_response(user_situation: str, user_query: str, district: str = None, focus=None) -> str:
     """
     AI 담당 2에서 호출할 수 있는 인터페이스 함수
     
@@ -179,45 +1152,21 @@ def get_rag_response(user_situation: str, user_query: str, district: str = None)
         user_situation: AI 담당 2가 판별한 상황
         user_query: 사용자의 질문
         district: 사용자의 거주 자치구 (선택사항)
+        focus: 검색을 제한할 주제 (선택사항, 예: "금융" 또는 extract_keywords_from_query 결과)
     
     Returns:
         AI 담당 1의 답변 (문자열)
     """
-    faiss_file_path = os.path.join(DB_PATH, f"{DB_NAME}.faiss")
-    if not os.path.exists(faiss_file_path):
-        return f"🚨 오류: 벡터 DB 파일이 없습니다.\n경로: {faiss_file_path}"
-    
-    rag_chain = create_rag_chain()
+    engine = get_engine()
+    if not engine.index_exists():
+        return f"🚨 오류: 벡터 DB 파일이 없습니다.\n경로: {engine.index_files()[0]}"
     
     try:
-        response = rag_chain.invoke({
-            "user_situation": user_situation,
-            "user_query": user_query
-        })
-        
         # 기본 답변
-        answer = response.content
-        
-        # ⭐ 관련 링크 추가 (키워드 기반)
-        keywords = extract_keywords_from_query(user_query)
-        if keywords:
-            related_links = get_relevant_links(keywords)  # ← 수정
-            if related_links:
-                answer += "\n\n" + "="*70
-                answer += "\n🔗 관련 유용한 링크\n"
-                answer += "="*70 + "\n"
-                answer += related_links
-        
-        # 자치구 정보가 있으면 연락처 추가
-        if district:
-            contact_info = get_contact_info_text(district)  # ← 수정: 통일된 함수명 사용
-            if contact_info:
-                answer += "\n\n" + "="*70
-                answer += f"\n📞 {district} 연락처\n"
-                answer += "="*70 + "\n"
-                answer += contact_info
-        
-        return answer
+        answer = engine.invoke(user_situation, user_query, district, focus)
+        
+        # 관련 링크 및 자치구 연락처 추가
+        return answer + "".join(build_answer_appendix(user_query, district))
         
     except Exception as e:
         import traceback
@@ -225,6 +1174,174 @@ def get_rag_response(user_situation: str, user_query: str, district: str = None)
         return f"❌ 오류 발생: {e}\n\n상세:\n{error_detail}"
 
 
+async def aget_rag_response(
+    user_situation: str,
+    user_query: str,
+    district: str = None,
+    timeout: float = None,
+    focus=None
+) -> str:
+    """
+    get_rag_response의 asyncio 버전
+    
+    여러 상담 세션을 하나의 이벤트 루프에서 동시에 처리할 때 사용합니다.
+    호출 측에서 작업을 취소하면 asyncio.CancelledError가 그대로 전파됩니다.
+    
+    Args:
+        user_situation: AI 담당 2가 판별한 상황
+        user_query: 사용자의 질문
+        district: 사용자의 거주 자치구 (선택사항)
+        timeout: 요청 제한 시간(초). None이면 RAG_REQUEST_TIMEOUT 사용
+        focus: 검색을 제한할 주제 (선택사항)
+    
+    Returns:
+        AI 담당 1의 답변 (문자열)
+    """
+    engine = get_engine()
+    if not engine.index_exists():
+        return f"🚨 오류: 벡터 DB 파일이 없습니다.\n경로: {engine.index_files()[0]}"
+    
+    try:
+        answer = await engine.ainvoke(user_situation, user_query, district, timeout=timeout, focus=focus)
+        return answer + "".join(build_answer_appendix(user_query, district))
+    
+    except asyncio.TimeoutError:
+        return "⏱️ 답변 생성 시간이 초과되었습니다. 잠시 후 다시 질문해주세요."
+    except Exception as e:
+        import traceback
+        error_detail = traceback.format_exc()
+        return f"❌ 오류 발생: {e}\n\n상세:\n{error_detail}"
+
+
+def stream_rag_response(user_situation: str, user_query: str, district: str = None, focus=None):
+    """
+    get_rag_response의 스트리밍 버전 (제너레이터)
+    
+    LLM 토큰을 도착하는 즉시 yield한 뒤, 관련 링크와 자치구 연락처 섹션을
+    마지막 청크로 이어서 yield합니다. 이어 붙인 결과는 get_rag_response와 같습니다.
+    
+    Yields:
+        답변 문자열 조각
+    """
+    engine = get_engine()
+    if not engine.index_exists():
+        yield f"🚨 오류: 벡터 DB 파일이 없습니다.\n경로: {engine.index_files()[0]}"
+        return
+    
+    try:
+        yield from engine.stream(user_situation, user_query, district, focus)
+    except Exception as e:
+        import traceback
+        error_detail = traceback.format_exc()
+        yield f"❌ 오류 발생: {e}\n\n상세:\n{error_detail}"
+        return
+    
+    yield from build_answer_appendix(user_query, district)
+
+
+async def astream_rag_response(
+    user_situation: str,
+    user_query: str,
+    district: str = None,
+    timeout: float = None,
+    focus=None
+):
+    """
+    stream_rag_response의 asyncio 버전 (async 제너레이터)
+    
+    Yields:
+        답변 문자열 조각
+    """
+    engine = get_engine()
+    if not engine.index_exists():
+        yield f"🚨 오류: 벡터 DB 파일이 없습니다.\n경로: {engine.index_files()[0]}"
+        return
+    
+    try:
+        async for token in engine.astream(user_situation, user_query, district, timeout=timeout, focus=focus):
+            yield token
+    except asyncio.TimeoutError:
+        yield "\n\n⏱️ 답변 생성 시간이 초과되었습니다. 잠시 후 다시 질문해주세요."
+        return
+    except Exception as e:
+        import traceback
+        error_detail = traceback.format_exc()
+        yield f"❌ 오류 발생: {e}\n\n상세:\n{error_detail}"
+        return
+    
+    for section in build_answer_appendix(user_query, district):
+        yield section
+
+
+def batch_rag_responses(
+    items,
+    output_path: str = None,
+    max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    chunk_size: int = BATCH_CHUNK_SIZE
+) -> list:
+    """
+    여러 (상황, 질문, 자치구) 묶음에 대한 답변을 한 번에 생성합니다. (야간 리포트, FAQ 사전 생성용)
+    
+    Args:
+        items: (user_situation, user_query[, district[, focus]]) 튜플 또는
+               {"user_situation", "user_query", "district", "focus"} 딕셔너리의 리스트
+        output_path: 지정하면 답변이 생성되는 대로 JSONL 파일에 한 줄씩 기록
+        max_concurrency: 동시에 진행할 LLM 호출 수
+        chunk_size: 한 번에 검색/생성할 요청 수 (JSONL 기록 단위)
+    
+    Returns:
+        items 순서대로 {"index", "user_situation", "user_query", "district",
+        "answer", "cached", "error"} 딕셔너리 리스트
+        (answer에는 get_rag_response와 같이 관련 링크/연락처가 붙음)
+    """
+    items = [_batch_item(item) for item in items]
+    engine = get_engine()
+    if not engine.index_exists():
+        raise FileNotFoundError(f"🚨 오류: 벡터 DB 파일이 없습니다.\n경로: {engine.index_files()[0]}")
+    
+    results = [None] * len(items)
+    output = open(output_path, "w", encoding="utf-8") if output_path else None
+    started = time.perf_counter()
+    
+    def on_result(i, answer, cached, error):
+        item = items[i]
+        if answer is not None:
+            answer += "".join(build_answer_appendix(item["user_query"], item.get("district")))
+        results[i] = {
+            "index": i,
+            "user_situation": item["user_situation"],
+            "user_query": item["user_query"],
+            "district": item.get("district"),
+            "answer": answer,
+            "cached": cached,
+            "error": error,
+        }
+        if output is not None:
+            output.write(json.dumps(results[i], ensure_ascii=False) + "\n")
+            output.flush()
+    
+    try:
+        engine.batch(items, max_concurrency=max_concurrency, chunk_size=chunk_size, on_result=on_result)
+    finally:
+        if output is not None:
+            output.close()
+    
+    failed = sum(1 for r in results if r and r["error"])
+    cached = sum(1 for r in results if r and r["cached"])
+    print(
+        f"✅ 배치 답변 {len(items)}건 완료 (캐시 {cached}, 실패 {failed}) "
+        f"- {time.perf_counter() - started:.1f}초"
+    )
+    return results
+
+
+def _batch_item(item) -> dict:
+    if isinstance(item, dict):
+        return item
+    keys = ("user_situation", "user_query", "district", "focus")
+    return dict(zip(keys, item))
+
+
 # ----------------------------------------------------
 # 메인 실행 함수 (테스트용)
 # ----------------------------------------------------
@@ -232,7 +1349,7 @@ def get_rag_response(user_situation: str, user_query: str, district: str = None)
 
 if __name__ == "__main__":
     
-    faiss_file_path = os.path.join(DB_PATH, f"{DB_NAME}.faiss")
+    faiss_file_path = os.path.join(resolve_index_dir(DB_PATH, DB_NAME), f"{DB_NAME}.faiss")
     if not os.path.exists(faiss_file_path):
         print(f"🚨 오류: 벡터 DB 파일이 없습니다.\n경로: {faiss_file_path}")
     else:
@@ -0,0 +1,128 @@
+"""
+Tag Index
+
+청크 메타데이터(action_type, file_type) → 벡터 위치 역색인 및 태그 필터 검색
+
+- 빌드 시 {name}.tags.npz 로 저장 (태그마다 정렬된 int64 위치 배열)
+- 검색 시 faiss IDSelector로 해당 태그의 벡터만 거리 계산
+- 필터 결과가 k개보다 적으면 전체 검색 결과로 나머지를 채움
+"""
+
+import os
+from typing import Dict, Iterable, List
+
+import faiss
+import numpy as np
+
+
+TAG_FIELDS = ("action_type", "file_type")
+
+# 사용자 질문 주제(detect_specific_focus / extract_keywords_from_query) → 청크 action_type
+# "주거", "신청"은 대응하는 태그가 없어 필터링하지 않습니다.
+TOPIC_ACTION_TYPES = {
+    "금융": ("금융",),
+    "법률": ("경공매_법률",),
+    "생계": ("복지_심리",),
+}
+
+
+def tag_index_path(folder_path: str, index_name: str) -> str:
+    return os.path.join(folder_path, f"{index_name}.tags.npz")
+
+
+def action_types_for(focus) -> List[str]:
+    """
+    주제(문자열 또는 주제 리스트)를 action_type 목록으로 바꿉니다.
+    태그가 없는 주제만 있으면 빈 리스트(필터 없음)를 반환합니다.
+    """
+    if not focus:
+        return []
+    topics = [focus] if isinstance(focus, str) else list(focus)
+    return list(dict.fromkeys(t for topic in topics for t in TOPIC_ACTION_TYPES.get(topic, ())))
+
+
+class TagIndex:
+    """(필드, 값) → 정렬된 벡터 위치 배열"""
+
+    def __init__(self, postings: Dict[tuple, np.ndarray], count: int):
+        self.postings = postings
+        self.count = count
+
+    @classmethod
+    def from_metadatas(cls, metadatas: Iterable[dict]) -> "TagIndex":
+        """벡터 위치 순서대로 나열된 청크 메타데이터로 역색인을 만듭니다."""
+        positions: Dict[tuple, list] = {}
+        count = 0
+        for position, metadata in enumerate(metadatas):
+            count = position + 1
+            for field in TAG_FIELDS:
+                value = metadata.get(field)
+                if value:
+                    positions.setdefault((field, value), []).append(position)
+        return cls({key: np.asarray(ids, dtype=np.int64) for key, ids in positions.items()}, count)
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore) -> "TagIndex":
+        """저장된 역색인이 없을 때 문서 저장소를 한 번 훑어 만듭니다."""
+        def metadatas():
+            for position in range(vectorstore.index.ntotal):
+                doc = vectorstore.docstore.search(vectorstore.index_to_docstore_id[position])
+                yield getattr(doc, "metadata", {})
+        return cls.from_metadatas(metadatas())
+
+    def save(self, path: str) -> None:
+        arrays = {f"{field}={value}": ids for (field, value), ids in self.postings.items()}
+        with open(path, "wb") as f:
+            np.savez(f, __count__=np.asarray([self.count], dtype=np.int64), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "TagIndex":
+        with np.load(path) as data:
+            count = int(data["__count__"][0])
+            postings = {
+                tuple(key.split("=", 1)): data[key]
+                for key in data.files if key != "__count__"
+            }
+        return cls(postings, count)
+
+    def positions(self, field: str, values: Iterable[str]) -> np.ndarray:
+        """값들 중 하나라도 해당하는 위치 (정렬, 중복 없음)"""
+        arrays = [self.postings[(field, value)] for value in values if (field, value) in self.postings]
+        if not arrays:
+            return np.empty(0, dtype=np.int64)
+        return arrays[0] if len(arrays) == 1 else np.unique(np.concatenate(arrays))
+
+    def counts(self) -> Dict[str, int]:
+        return {f"{field}={value}": len(ids) for (field, value), ids in self.postings.items()}
+
+
+def _search_params(index: faiss.Index, selector) -> faiss.SearchParameters:
+    """인덱스 종류에 맞는 검색 파라미터 (현재 nprobe / efSearch 유지)"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def search_positions(index: faiss.Index, query_vector, k: int, allowed: np.ndarray = None) -> List[int]:
+    """
+    질의 벡터와 가까운 벡터 위치 k개를 반환합니다.
+
+    allowed가 주어지면 그 위치들만 검색하고, 결과가 k개보다 적으면
+    전체 검색 결과로 나머지를 채웁니다.
+    """
+    query = np.asarray(query_vector, dtype=np.float32).reshape(1, -1)
+    found: List[int] = []
+
+    if allowed is not None and len(allowed):
+        selector = faiss.IDSelectorBatch(allowed)
+        _, ids = index.search(query, min(k, len(allowed)), params=_search_params(index, selector))
+        found = [int(i) for i in ids[0] if i >= 0]
+
+    if len(found) < k:
+        _, ids = index.search(query, k + len(found))
+        seen = set(found)
+        found += [int(i) for i in ids[0] if i >= 0 and i not in seen][:k - len(found)]
+    return found
@@ -0,0 +1,223 @@
+"""
+Async Fetcher
+
+서울시 실거래가 API의 (자치구, 접수연도) 전체 페이지를 동시에 받는 비동기 조회기
+
+- 첫 페이지에서 list_total_count를 읽고, 나머지 페이지를 동시에 요청
+  (동시 요청 수는 세마포어로 제한, 호출 간격/일일 한도는 seoul_api_client.RATE_LIMITER 공유)
+- 응답 본문은 받는 조각마다 바로 파싱하고(본문 전체를 모으지 않음),
+  페이지가 도착하는 대로 내보냄 (도착 순서, 페이지 순서 아님)
+- 5xx/타임아웃/연결 오류는 지수 백오프 + jitter로 재시도
+  (호출 한도는 페이지 요청 1건당 한 번만 차감 - 동기 클라이언트의 urllib3 재시도와 같은 기준)
+- 동기화 작업은 PartitionFetcher로 이벤트 루프와 AsyncClient(keep-alive 연결)를
+  모든 (자치구, 접수연도)에 걸쳐 하나씩만 사용
+- 네트워크 대기 시간이 겹치므로 동기화 시간이 대략 동시 요청 수만큼 줄어듦
+  (단, 초당 호출 수 제한 SEOUL_API_MAX_RPS를 넘지는 않음)
+"""
+
+import os
+import random
+import asyncio
+import logging
+import xml.etree.ElementTree as ET
+from typing import AsyncIterator, List, Optional, Tuple
+
+import httpx
+
+try:
+    from .rental_records import RentalRecord, RentalXmlParser
+    from .seoul_api_client import (
+        BACKOFF_FACTOR, CODE_NO_DATA, CONNECT_TIMEOUT, MAX_PAGE_SIZE, MAX_RETRIES, READ_TIMEOUT, RATE_LIMITER,
+        QuotaExceeded, build_api_url, is_ok_result, mask_api_key, note_api_result
+    )
+except ImportError:
+    from rental_records import RentalRecord, RentalXmlParser
+    from seoul_api_client import (
+        BACKOFF_FACTOR, CODE_NO_DATA, CONNECT_TIMEOUT, MAX_PAGE_SIZE, MAX_RETRIES, READ_TIMEOUT, RATE_LIMITER,
+        QuotaExceeded, build_api_url, is_ok_result, mask_api_key, note_api_result
+    )
+
+logger = logging.getLogger(__name__)
+
+CONCURRENCY = int(os.getenv("SEOUL_API_CONCURRENCY", "4"))
+
+RETRY_STATUSES = {500, 502, 503, 504}
+
+
+class PageFetchError(Exception):
+    """페이지를 끝내 받지 못한 경우 (부분 결과로 저장소를 덮어쓰지 않도록 전체 실패로 처리)"""
+
+
+def create_client(concurrency: int = CONCURRENCY) -> httpx.AsyncClient:
+    """keep-alive 연결을 동시 요청 수만큼 유지하는 AsyncClient"""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    )
+
+
+async def fetch_page(
+    client: httpx.AsyncClient,
+    cgg_cd: str,
+    rcpt_yr: str,
+    start_index: int,
+    end_index: int
+) -> Tuple[int, List[RentalRecord]]:
+    """
+    한 페이지를 받아 (전체 건수, RentalRecord 리스트)로 파싱합니다. 실패하면 PageFetchError
+
+    재시도를 포함해 HTTP 호출마다 RATE_LIMITER에서 1건씩 예약합니다.
+    """
+    url = build_api_url(cgg_cd=cgg_cd, rcpt_yr=rcpt_yr, start_index=start_index, end_index=end_index)
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            wait = RATE_LIMITER.reserve()
+        except QuotaExceeded as e:
+            raise PageFetchError(str(e)) from e
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        try:
+            async with client.stream("GET", url) as response:
+                if response.status_code == 200:
+                    return await _read_page(response, url)
+            retryable = response.status_code in RETRY_STATUSES
+            reason = f"HTTP {response.status_code}"
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            retryable, reason = True, type(e).__name__
+
+        if not retryable or attempt == MAX_RETRIES:
+            raise PageFetchError(f"{reason}: {mask_api_key(url)}")
+
+        backoff = random.uniform(0, BACKOFF_FACTOR * (2 ** attempt))
+        logger.warning("서울시 API %s, %.2f초 후 재시도 (%d/%d): %s",
+                       reason, backoff, attempt + 1, MAX_RETRIES, mask_api_key(url))
+        await asyncio.sleep(backoff)
+
+
+async def _read_page(response: httpx.Response, url: str) -> Tuple[int, List[RentalRecord]]:
+    """200 응답 본문을 받는 조각마다 파싱합니다. API 오류 코드면 PageFetchError"""
+    parser = RentalXmlParser()
+    records = []
+    try:
+        async for chunk in response.aiter_bytes():
+            records.extend(parser.feed(chunk))
+        records.extend(parser.close())
+    except ET.ParseError as e:
+        raise PageFetchError(f"XML 파싱 실패: {e}") from e
+
+    note_api_result(parser)
+    if parser.code == CODE_NO_DATA:
+        return 0, []
+    if not is_ok_result(parser.code):
+        raise PageFetchError(f"API 오류 응답 {parser.code}: {mask_api_key(url)}")
+    return parser.total_count, records
+
+
+async def iter_pages(
+    cgg_cd: str,
+    rcpt_yr: str,
+    client: httpx.AsyncClient = None,
+    concurrency: int = CONCURRENCY,
+    page_size: int = MAX_PAGE_SIZE,
+    first_page: Tuple[int, List[RentalRecord]] = None
+) -> AsyncIterator[Tuple[int, List[RentalRecord]]]:
+    """
+    (자치구, 접수연도)의 모든 페이지를 (전체 건수, RentalRecord 리스트)로 도착 순서대로 내보냅니다.
+
+    first_page: 이미 받은 첫 페이지가 있으면 전달 (다시 요청하지 않음)
+    """
+    own_client = client is None
+    client = client or create_client(concurrency)
+    tasks = []
+    try:
+        if first_page is None:
+            first_page = await fetch_page(client, cgg_cd, rcpt_yr, 1, page_size)
+        yield first_page
+
+        total = first_page[0]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(start: int):
+            async with semaphore:
+                return await fetch_page(client, cgg_cd, rcpt_yr, start, min(start + page_size - 1, total))
+
+        tasks = [asyncio.ensure_future(bounded(start)) for start in range(page_size + 1, total + 1, page_size)]
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if own_client:
+            await client.aclose()
+
+
+async def fetch_partition_async(
+    cgg_cd: str,
+    rcpt_yr: str,
+    first_page: Tuple[int, List[RentalRecord]] = None,
+    concurrency: int = CONCURRENCY,
+    client: httpx.AsyncClient = None
+) -> Tuple[int, List[RentalRecord]]:
+    """(전체 건수, 전체 데이터 리스트). 한 페이지라도 실패하면 PageFetchError"""
+    total, records = 0, []
+    async for page_total, page_records in iter_pages(
+        cgg_cd, rcpt_yr, client=client, concurrency=concurrency, first_page=first_page
+    ):
+        total = total or page_total
+        records.extend(page_records)
+    return total, records
+
+
+class PartitionFetcher:
+    """
+    fetch_partition_async의 동기 인터페이스 (동기화 작업용, 실행 중인 이벤트 루프 밖에서 사용)
+
+    이벤트 루프 하나와 AsyncClient 하나를 모든 파티션이 함께 쓰므로, 파티션이 바뀌어도
+    keep-alive 연결을 다시 맺지 않습니다. 다 쓰면 close() (또는 with 문)로 닫습니다.
+
+    사용 예:
+        with PartitionFetcher(concurrency=4) as fetcher:
+            result = fetcher.fetch("11140", "2025")
+    """
+
+    def __init__(self, concurrency: int = CONCURRENCY):
+        self.concurrency = concurrency
+        self._loop = asyncio.new_event_loop()
+        self._client = None
+
+    def fetch(
+        self,
+        cgg_cd: str,
+        rcpt_yr: str,
+        first_page: Tuple[int, List[RentalRecord]] = None
+    ) -> Optional[Tuple[int, List[RentalRecord]]]:
+        """(전체 건수, 전체 데이터 리스트). 실패하면 None"""
+        try:
+            return self._loop.run_until_complete(self._fetch(cgg_cd, rcpt_yr, first_page))
+        except PageFetchError as e:
+            logger.error("페이지 조회 실패 (%s %s년): %s", cgg_cd, rcpt_yr, e)
+            return None
+
+    async def _fetch(self, cgg_cd: str, rcpt_yr: str, first_page) -> Tuple[int, List[RentalRecord]]:
+        if self._client is None:
+            # 클라이언트는 자신을 쓸 이벤트 루프 안에서 만듦
+            self._client = create_client(self.concurrency)
+        return await fetch_partition_async(cgg_cd, rcpt_yr, first_page, self.concurrency, client=self._client)
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        if self._client is not None:
+            self._loop.run_until_complete(self._client.aclose())
+            self._client = None
+        self._loop.close()
+
+    def __enter__(self) -> "PartitionFetcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,305 @@
+"""
+Comparables
+
+유사 거래(비교 사례) 통계 엔진 - 실거래 데이터를 NumPy 열(column) 배열로 들고 한 번에 필터링
+
+- 자치구, 법정동, 면적 구간(±비율), 건물용도, 계약일 구간, 거래금액 구간(±비율)을
+  불리언 마스크 하나로 한 번에 계산 (행마다 딕셔너리를 순회하지 않음)
+- 법정동/건물용도는 정수 코드로 바꿔 두어 문자열 비교 없이 정수 비교로 필터링
+- 통계: 건수, 평균, 중위값, 분위수(10/25/75/90), 추세(계약일 대비 거래금액 회귀 기울기)
+- 비교 사례가 너무 적으면 조건을 하나씩 풀어 다시 찾음 (select)
+- 계약일 구간은 최근 N개월(months_ago)로 지정 (오래된 거래가 시세를 끌어내리지 않도록)
+- 저장소(transaction_store)에서는 필요한 열만 읽어 바로 배열로 만듦 (from_store)
+
+사용 예:
+    frame = ComparablesFrame.from_store(store, cgg_cd="11140", ctrt_from=months_ago(12))
+    mask, query = frame.select(ComparableQuery(stdg_nm="신당동", area=59.0, price=30000))
+    frame.stats(mask).median
+"""
+
+import os
+import calendar
+from datetime import date
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+# 비교 사례가 이보다 적으면 조건을 풀어 다시 찾음
+MIN_COMPARABLES = 5
+
+# 비교 사례 계약일 구간 (최근 N개월, 0이면 제한 없음)
+COMPARABLE_MONTHS = int(os.getenv("SEOUL_COMPARABLE_MONTHS", "12"))
+
+PERCENTILES = (10, 25, 75, 90)
+
+# ComparablesFrame이 쓰는 열 (transaction_store 컬럼명 / call_seoul_rental_api 한글 키)
+COLUMNS = ("cgg_cd", "stdg_nm", "bldg_usg", "ctrt_day", "thing_amt", "arch_area", "rtrcn_day")
+KOREAN_COLUMNS = ("자치구코드", "법정동", "건물용도", "계약일", "거래금액", "건물면적", "취소일")
+
+# 저장소에서 읽을 때 숫자/빈 값 변환은 SQLite에서 처리 (배열 변환을 한 번에 하도록)
+STORE_SELECT = (
+    "CAST(cgg_cd AS INTEGER)", "stdg_nm", "bldg_usg", "CAST(ctrt_day AS INTEGER)",
+    "COALESCE(thing_amt, 0)", "COALESCE(arch_area, 0.0)", "COALESCE(rtrcn_day, '') != ''"
+)
+
+
+@dataclass(frozen=True)
+class ComparableQuery:
+    """비교 사례 조건 (None이면 해당 조건 없음)"""
+    cgg_cd: Optional[str] = None       # 자치구코드
+    stdg_nm: Optional[str] = None      # 법정동
+    area: Optional[float] = None       # 건물면적 (㎡)
+    area_band: float = 0.2             # 면적 ±비율
+    bldg_usg: Optional[str] = None     # 건물용도 (아파트, 연립다세대, ...)
+    ctrt_from: Optional[str] = None    # 계약일 시작 (YYYYMMDD, 포함)
+    ctrt_to: Optional[str] = None      # 계약일 끝 (YYYYMMDD, 포함)
+    price: Optional[int] = None        # 거래금액 (만원)
+    price_band: float = 0.4            # 거래금액 ±비율
+    include_cancelled: bool = False    # 취소된 거래 포함 여부
+
+
+# select()에서 비교 사례가 부족할 때 푸는 조건 순서 (좁은 조건부터)
+RELAX_ORDER = ("area", "bldg_usg", "stdg_nm", "ctrt_from", "price")
+
+
+def months_ago(months: int, today: date = None) -> str:
+    """today로부터 months개월 전 날짜 (YYYYMMDD, 그 달에 없는 날이면 말일)"""
+    today = today or date.today()
+    year, month = divmod(today.year * 12 + today.month - 1 - months, 12)
+    day = min(today.day, calendar.monthrange(year, month + 1)[1])
+    return f"{year:04d}{month + 1:02d}{day:02d}"
+
+
+@dataclass(frozen=True)
+class ComparableStats:
+    count: int
+    mean: float                        # 만원
+    median: float                      # 만원
+    percentiles: Dict[int, float]      # {10: ..., 25: ..., 75: ..., 90: ...} 만원
+    trend_per_month: float             # 계약일 한 달당 거래금액 변화 (만원/월)
+    trend_pct_per_year: float          # 중위값 대비 연간 변화율 (%)
+    latest_day: Optional[str]          # 가장 최근 계약일 (YYYYMMDD)
+
+    @classmethod
+    def empty(cls) -> "ComparableStats":
+        return cls(0, 0.0, 0.0, {p: 0.0 for p in PERCENTILES}, 0.0, 0.0, None)
+
+
+def _factorize(values: Iterable) -> Tuple[np.ndarray, Dict[str, int]]:
+    """문자열 열 → (정수 코드 배열, 값 → 코드)"""
+    vocab: Dict[str, int] = {}
+    codes = np.fromiter((vocab.setdefault(v or "", len(vocab)) for v in values), dtype=np.int32)
+    return codes, vocab
+
+
+def _int_array(values) -> np.ndarray:
+    """정수 열 → 배열 (값이 모두 정수면 한 번에 변환, 빈 값/문자열이 섞이면 하나씩)"""
+    try:
+        return np.array(values, dtype=np.int64)
+    except (TypeError, ValueError):
+        return np.fromiter((_to_int(v) for v in values), dtype=np.int64, count=len(values))
+
+
+def _float_array(values) -> np.ndarray:
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.fromiter((_to_float(v) for v in values), dtype=np.float64, count=len(values))
+
+
+def _to_int(value) -> int:
+    if isinstance(value, int):
+        return value
+    try:
+        return int(value) if value else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value) if value else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ComparablesFrame:
+    """실거래 데이터의 열 배열 (행 순서는 입력 순서 그대로)"""
+
+    def __init__(self, columns: Dict[str, list]):
+        self.cgg_cd = _int_array(columns["cgg_cd"])
+        self.stdg_nm, self.dong_codes = _factorize(columns["stdg_nm"])
+        self.bldg_usg, self.usage_codes = _factorize(columns["bldg_usg"])
+        self.ctrt_day = _int_array(columns["ctrt_day"])
+        self.thing_amt = _int_array(columns["thing_amt"])
+        self.arch_area = _float_array(columns["arch_area"])
+        self.cancelled = np.array([bool(v) for v in columns["rtrcn_day"]], dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.thing_amt)
+
+    # --- 생성 ---
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "ComparablesFrame":
+        """COLUMNS 순서의 튜플들 → 프레임"""
+        rows = list(rows)
+        columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+        return cls(dict(zip(COLUMNS, columns)))
+
+    @classmethod
+    def from_records(cls, records: Iterable) -> "ComparablesFrame":
+        """call_seoul_rental_api 결과(한글 키 딕셔너리) 또는 RentalRecord들 → 프레임"""
+        def to_tuple(record) -> tuple:
+            if isinstance(record, dict):
+                return tuple(record.get(key) for key in KOREAN_COLUMNS)
+            return tuple(getattr(record, column) for column in COLUMNS)
+
+        return cls.from_rows(to_tuple(record) for record in records)
+
+    @classmethod
+    def from_store(cls, store, cgg_cd: str = None, rcpt_yr: str = None, ctrt_from: str = None) -> "ComparablesFrame":
+        """
+        transaction_store에서 필요한 열만 읽어 프레임을 만듭니다.
+
+        ctrt_from: 이 계약일(YYYYMMDD) 이후 거래만 (접수연도와 무관하게 모든 연도 파티션에서)
+        """
+        clauses, params = [], []
+        for column, value in (("cgg_cd", cgg_cd), ("rcpt_yr", rcpt_yr)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if ctrt_from:
+            clauses.append("ctrt_day >= ?")
+            params.append(ctrt_from)
+        sql = f"SELECT {', '.join(STORE_SELECT)} FROM transactions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return cls.from_rows(store.conn.execute(sql, params))
+
+    # --- 필터 ---
+
+    def mask(self, query: ComparableQuery) -> np.ndarray:
+        """조건을 모두 만족하는 행의 불리언 마스크 (거래금액이 없는 행은 항상 제외)"""
+        mask = self.thing_amt > 0
+        if not query.include_cancelled:
+            mask &= ~self.cancelled
+        if query.cgg_cd:
+            mask &= self.cgg_cd == _to_int(query.cgg_cd)
+        if query.stdg_nm:
+            mask &= self.stdg_nm == self.dong_codes.get(query.stdg_nm, -1)
+        if query.bldg_usg:
+            mask &= self.bldg_usg == self.usage_codes.get(query.bldg_usg, -1)
+        if query.area:
+            mask &= np.abs(self.arch_area - query.area) <= query.area * query.area_band
+        if query.ctrt_from:
+            mask &= self.ctrt_day >= int(query.ctrt_from)
+        if query.ctrt_to:
+            mask &= self.ctrt_day <= int(query.ctrt_to)
+        if query.price:
+            mask &= np.abs(self.thing_amt - query.price) < max(query.price, 1) * query.price_band
+        return mask
+
+    def select(
+        self,
+        query: ComparableQuery,
+        min_count: int = MIN_COMPARABLES
+    ) -> Tuple[np.ndarray, ComparableQuery]:
+        """
+        비교 사례를 찾고, min_count건보다 적으면 RELAX_ORDER 순서로 조건을 풀어 다시 찾습니다.
+
+        Returns:
+            (마스크, 실제로 적용된 조건)
+        """
+        mask = self.mask(query)
+        for field in RELAX_ORDER:
+            if mask.sum() >= min_count:
+                break
+            if getattr(query, field) is None:
+                continue
+            query = replace(query, **{field: None})
+            mask = self.mask(query)
+        return mask, query
+
+    # --- 통계 ---
+
+    def stats(self, mask: np.ndarray = None) -> ComparableStats:
+        """마스크에 해당하는 거래의 통계 (mask가 None이면 거래금액이 있는 전체)"""
+        if mask is None:
+            mask = self.thing_amt > 0
+        prices = self.thing_amt[mask].astype(np.float64)
+        if len(prices) == 0:
+            return ComparableStats.empty()
+
+        days = self.ctrt_day[mask]
+        median = float(np.median(prices))
+        percentiles = dict(zip(PERCENTILES, (float(v) for v in np.percentile(prices, PERCENTILES))))
+
+        # 추세: 계약 시점(월 단위 실수)에 대한 거래금액 최소제곱 기울기
+        months = (days // 10000) * 12 + (days // 100 % 100) - 1 + (days % 100 - 1) / 31.0
+        valid = days > 0
+        trend = 0.0
+        if valid.sum() >= 3:
+            x = months[valid] - months[valid].mean()
+            denom = float(np.dot(x, x))
+            if denom > 0:
+                trend = float(np.dot(x, prices[valid] - prices[valid].mean()) / denom)
+
+        latest = int(days.max())
+        return ComparableStats(
+            count=len(prices),
+            mean=float(prices.mean()),
+            median=median,
+            percentiles=percentiles,
+            trend_per_month=trend,
+            trend_pct_per_year=trend * 12 / median * 100 if median > 0 else 0.0,
+            latest_day=str(latest) if latest > 0 else None
+        )
+
+    def recent_count(self, mask: np.ndarray = None) -> int:
+        """데이터의 가장 최근 계약 연도에 계약된 거래 수"""
+        days = self.ctrt_day if mask is None else self.ctrt_day[mask]
+        days = days[days > 0]
+        if len(days) == 0:
+            return 0
+        return int((days // 10000 == days.max() // 10000).sum())
+
+
+def market_stats(frame: ComparablesFrame, mask: np.ndarray = None) -> Dict:
+    """시장 통계 (논문 기반) - 평균거래가, 거래량(최근 계약 연도), 시장과열도"""
+    stats = frame.stats(mask)
+    if stats.count == 0:
+        return {
+            "평균거래가": 0,
+            "거래량": 0,
+            "시장과열도": "보통"
+        }
+
+    recent_count = frame.recent_count(mask)
+
+    # 시장 과열도 판단 (논문 기반)
+    if recent_count > 100 and stats.mean > 50000:
+        market_heat = "과열"
+    elif recent_count > 50:
+        market_heat = "활성"
+    else:
+        market_heat = "보통"
+
+    return {
+        "평균거래가": int(stats.mean),
+        "거래량": recent_count,
+        "시장과열도": market_heat
+    }
+
+
+def stats_to_dict(stats: ComparableStats) -> Dict:
+    """search_similar_property 결과에 넣는 한글 키 통계"""
+    return {
+        "중위거래가": int(stats.median),
+        "거래가분위": {f"p{p}": int(v) for p, v in stats.percentiles.items()},
+        "가격추세_월": round(stats.trend_per_month, 1),
+        "가격추세_연율": round(stats.trend_pct_per_year, 1),
+        "최근계약일": stats.latest_day
+    }
@@ -0,0 +1,207 @@
+"""
+Rental Records
+
+서울시 실거래가 API(tbLnOpendataRtmsV) XML 응답의 스트리밍 파서
+
+- ET.XMLPullParser로 <row>가 끝날 때마다 레코드를 만들고 바로 자식 요소를 비우므로,
+  전체 트리(행마다 필드 요소 19개)를 메모리에 쌓지 않음
+- 입력은 bytes, 파일 객체(HTTP 응답 스트림 등), 또는 feed()로 넣는 조각 (비동기 응답용)
+  → 응답 본문 전체를 메모리에 올리지 않고 받는 대로 파싱 가능
+- read_header(): 행보다 앞에 있는 결과 코드(RESULT)까지만 읽음 (응답 검증용)
+- 행마다 자식 요소를 한 번만 순회 (필드마다 row.find를 반복하지 않음)
+- 레코드는 __slots__ 데이터클래스(RentalRecord), 기존 한글 키 딕셔너리는 to_dict()
+"""
+
+import io
+import xml.etree.ElementTree as ET
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import Dict, Iterator, List, Optional, Union
+
+
+@dataclass(slots=True)
+class RentalRecord:
+    rcpt_yr: str = ""       # 접수연도
+    cgg_cd: str = ""        # 자치구코드
+    cgg_nm: str = ""        # 자치구
+    stdg_cd: str = ""       # 법정동코드
+    stdg_nm: str = ""       # 법정동
+    lotno_se_nm: str = ""   # 지번구분
+    mno: str = ""           # 본번
+    sno: str = ""           # 부번
+    bldg_nm: str = ""       # 건물명
+    ctrt_day: str = ""      # 계약일 (YYYYMMDD)
+    thing_amt: int = 0      # 거래금액 (만원)
+    arch_area: float = 0.0  # 건물면적 (㎡)
+    land_area: float = 0.0  # 토지면적 (㎡)
+    flr: str = ""           # 층수
+    rght_se: str = ""       # 권리구분
+    rtrcn_day: str = ""     # 취소일
+    arch_yr: str = ""       # 건축연도
+    bldg_usg: str = ""      # 건물용도
+    dclr_se: str = ""       # 신고구분
+
+    def to_dict(self) -> Dict:
+        """call_seoul_rental_api가 반환하던 한글 키 딕셔너리"""
+        return {key: getattr(self, name) for name, key in KOREAN_KEYS.items()}
+
+    def as_row(self) -> tuple:
+        """필드 순서대로 나열한 튜플 (저장소 INSERT용)"""
+        return tuple(getattr(self, name) for name in FIELD_NAMES)
+
+
+# 필드 이름 → 한글 키 (to_dict 순서)
+KOREAN_KEYS = {
+    "rcpt_yr": "접수연도",
+    "cgg_cd": "자치구코드",
+    "cgg_nm": "자치구",
+    "stdg_cd": "법정동코드",
+    "stdg_nm": "법정동",
+    "lotno_se_nm": "지번구분",
+    "mno": "본번",
+    "sno": "부번",
+    "bldg_nm": "건물명",
+    "ctrt_day": "계약일",
+    "thing_amt": "거래금액",
+    "arch_area": "건물면적",
+    "land_area": "토지면적",
+    "flr": "층수",
+    "rght_se": "권리구분",
+    "rtrcn_day": "취소일",
+    "arch_yr": "건축연도",
+    "bldg_usg": "건물용도",
+    "dclr_se": "신고구분",
+}
+
+FIELD_NAMES = tuple(f.name for f in fields(RentalRecord))
+
+# XML 태그 → 필드 위치 (태그는 필드 이름의 대문자)
+_TAG_INDEX = {name.upper(): i for i, name in enumerate(FIELD_NAMES)}
+_DEFAULTS = RentalRecord().as_row()
+_INT_FIELDS = tuple(_TAG_INDEX[tag] for tag in ("THING_AMT",))
+_FLOAT_FIELDS = tuple(_TAG_INDEX[tag] for tag in ("ARCH_AREA", "LAND_AREA"))
+
+
+def _to_int(text: str) -> int:
+    try:
+        return int(text) if text else 0
+    except ValueError:
+        return 0
+
+
+def _to_float(text: str) -> float:
+    try:
+        return float(text) if text else 0.0
+    except ValueError:
+        return 0.0
+
+
+class RentalXmlParser:
+    """
+    API 응답을 한 번 훑으며 RentalRecord를 내보내는 스트리밍 파서
+
+    read_header() 후에는 total_count(list_total_count), code / message(RESULT)가 채워지고,
+    이어서 순회하면 행을 읽는 대로 내보냅니다. (헤더를 읽으며 지나친 행도 빠짐없이 내보냄)
+
+    사용 예:
+        parser = RentalXmlParser(response.raw).read_header()
+        parser.code  # "INFO-000"
+        for record in parser:
+            ...
+
+        # 비동기 응답: 받은 조각을 바로 넣음
+        parser = RentalXmlParser()
+        async for chunk in response.aiter_bytes():
+            records.extend(parser.feed(chunk))
+        records.extend(parser.close())
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    HEADER_CHUNK_SIZE = 1024  # 결과 코드는 본문 앞부분에 있으므로 작게 읽음
+
+    def __init__(self, source: Union[bytes, io.IOBase] = None):
+        self.source = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+        self.total_count = 0
+        self.code: Optional[str] = None
+        self.message: Optional[str] = None
+        self._parser = ET.XMLPullParser()  # end 이벤트만 (start까지 받으면 이벤트가 두 배라 느려짐)
+        self._pending = deque()
+        self._header_done = False
+        self._closed = False
+
+    # --- 조각 단위 입력 ---
+
+    def feed(self, data: bytes) -> List[RentalRecord]:
+        """받은 조각을 넣고 새로 완성된 레코드를 반환합니다."""
+        self._parser.feed(data)
+        return self._read_events()
+
+    def close(self) -> List[RentalRecord]:
+        """입력이 끝났음을 알리고 남은 레코드를 반환합니다. (XML이 끝나지 않았으면 ET.ParseError)"""
+        if self._closed:
+            return []
+        self._closed = True
+        self._parser.close()
+        return self._read_events()
+
+    def _read_events(self) -> List[RentalRecord]:
+        records = []
+        for _, elem in self._parser.read_events():
+            tag = elem.tag
+            if tag == "row":
+                values = list(_DEFAULTS)
+                for child in elem:
+                    index = _TAG_INDEX.get(child.tag)
+                    if index is not None:
+                        values[index] = child.text or ""
+                for index in _INT_FIELDS:
+                    values[index] = _to_int(values[index])
+                for index in _FLOAT_FIELDS:
+                    values[index] = _to_float(values[index])
+                records.append(RentalRecord(*values))
+                # 처리한 행의 자식 요소를 바로 비움 (빈 <row> 껍데기만 남음)
+                elem.clear()
+                self._header_done = True
+            elif tag == "list_total_count":
+                text = (elem.text or "").strip()
+                self.total_count = int(text) if text.isdigit() else 0
+            elif tag == "CODE":
+                self.code = elem.text
+            elif tag == "MESSAGE":
+                self.message = elem.text
+            elif tag == "RESULT":
+                self._header_done = True
+        return records
+
+    # --- source에서 읽기 ---
+
+    def _read_chunk(self, size: int) -> bool:
+        """source에서 한 조각을 읽어 넣습니다. 입력이 끝났으면 False"""
+        if self._closed:
+            return False
+        data = self.source.read(size)
+        if data:
+            self._pending.extend(self.feed(data))
+            return True
+        self._pending.extend(self.close())
+        return False
+
+    def read_header(self) -> "RentalXmlParser":
+        """결과 코드(RESULT) 또는 첫 행까지만 읽습니다."""
+        while not self._header_done and self._read_chunk(self.HEADER_CHUNK_SIZE):
+            pass
+        return self
+
+    def __iter__(self) -> Iterator[RentalRecord]:
+        while True:
+            while self._pending:
+                yield self._pending.popleft()
+            if not self._read_chunk(self.CHUNK_SIZE):
+                break
+        while self._pending:
+            yield self._pending.popleft()
+
+
+def iter_rental_records(source: Union[bytes, io.IOBase]) -> Iterator[RentalRecord]:
+    """응답 본문(또는 파일 객체)의 거래를 한 건씩 내보냅니다."""
+    return iter(RentalXmlParser(source))
@@ -0,0 +1,191 @@
+"""
+Response Cache
+
+서울시 Open API 응답(XML 본문)을 로컬 디스크에 gzip으로 저장하는 캐시
+
+- 키: (서비스명, 자치구, 접수연도, 페이지 구간) → 파일 하나 (<data>/response_cache/*.xml.gz)
+- TTL(기본 1일) 안이면 네트워크 호출 없이 캐시를 반환
+- TTL이 지났어도 stale 기간(기본 7일) 안이면 캐시를 바로 반환하고,
+  백그라운드 스레드에서 다시 받아 교체 (stale-while-revalidate, 요청은 기다리지 않음)
+- API 호출이 실패하면 기간과 무관하게 남아 있는 캐시를 반환 (stale-if-error)
+- 저장 시각은 파일 수정 시각, 쓰기는 임시 파일 → os.replace로 원자적 교체
+- 백그라운드 갱신 스레드는 처음 필요할 때 만들고, shutdown()으로 정리
+  (seoul_api_client가 프로세스 종료 시 호출 - 대기 중인 갱신은 취소)
+
+같은 자치구의 주소를 입력하는 사용자마다 같은 페이지를 다시 받지 않도록 하기 위한 것으로,
+결과가 하루 단위로 바뀌는 실거래가 API에 맞춘 기본값입니다.
+"""
+
+import os
+import gzip
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.getenv("SEOUL_API_CACHE_DIR", os.path.join(CURRENT_DIR, "data", "response_cache"))
+
+# 초 단위 (CACHE_TTL이 0이면 캐시 사용 안 함)
+CACHE_TTL = float(os.getenv("SEOUL_API_CACHE_TTL", str(24 * 3600)))
+CACHE_STALE = float(os.getenv("SEOUL_API_CACHE_STALE", str(7 * 24 * 3600)))
+
+CacheKey = Tuple[str, str, str, int, int]
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    content: bytes
+    stored_at: float
+
+
+class ResponseCache:
+    """디스크 응답 캐시 (스레드 안전, 키마다 백그라운드 갱신은 한 번에 하나만)"""
+
+    def __init__(
+        self,
+        directory: str = CACHE_DIR,
+        ttl: float = CACHE_TTL,
+        stale: float = CACHE_STALE,
+        clock: Callable[[], float] = time.time
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.stale = stale
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._refreshing = {}  # 키 → 백그라운드 갱신 Future
+        self._executor = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def path(self, key: CacheKey) -> str:
+        digest = hashlib.sha1("|".join(map(str, key)).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key[0]}-{digest}.xml.gz")
+
+    # --- 읽기/쓰기 ---
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        path = self.path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            with gzip.open(path, "rb") as f:
+                return CachedResponse(f.read(), stored_at)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError) as e:
+            logger.warning("응답 캐시 읽기 실패, 무시: %s (%s)", path, e)
+            return None
+
+    def put(self, key: CacheKey, content: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+                f.write(content)
+            now = self.clock()
+            os.utime(tmp_path, (now, now))
+            os.replace(tmp_path, self.path(key))
+        except OSError as e:
+            logger.warning("응답 캐시 저장 실패: %s", e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self) -> int:
+        """캐시 파일을 모두 지우고 지운 개수를 반환합니다."""
+        if not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(".xml.gz"):
+                os.remove(os.path.join(self.directory, name))
+                removed += 1
+        return removed
+
+    # --- 조회 ---
+
+    def fetch(
+        self,
+        key: CacheKey,
+        loader: Callable[[], Optional[bytes]],
+        validate: Callable[[bytes], bool] = None
+    ) -> Optional[bytes]:
+        """
+        캐시를 거쳐 응답 본문을 반환합니다.
+
+        Args:
+            key: 캐시 키
+            loader: 실제 호출 (실패하면 None)
+            validate: 저장해도 되는 응답인지 (API 오류 응답은 저장하지 않음)
+
+        Returns:
+            새 응답 / 유효하거나 stale 기간 안의 캐시 / 호출 실패 시 남아 있는 캐시, 모두 없으면 None
+        """
+        if not self.enabled:
+            return loader()
+
+        cached = self.get(key)
+        if cached is not None:
+            age = self.clock() - cached.stored_at
+            if age < self.ttl:
+                return cached.content
+            if age < self.ttl + self.stale:
+                self._refresh_in_background(key, loader, validate)
+                return cached.content
+
+        content = self._load(key, loader, validate)
+        if content is not None:
+            return content
+        if cached is not None:
+            logger.warning("서울시 API 호출 실패, %.1f시간 전 캐시 응답 사용", age / 3600)
+            return cached.content
+        return None
+
+    def _load(self, key: CacheKey, loader, validate) -> Optional[bytes]:
+        content = loader()
+        if content is None or (validate is not None and not validate(content)):
+            return None
+        self.put(key, content)
+        return content
+
+    def _refresh_in_background(self, key: CacheKey, loader, validate) -> None:
+        def refresh():
+            try:
+                if self._load(key, loader, validate) is None:
+                    logger.warning("응답 캐시 백그라운드 갱신 실패, 기존 캐시 유지: %s", key)
+            except Exception as e:
+                logger.warning("응답 캐시 백그라운드 갱신 오류: %s (%s)", key, e)
+            finally:
+                with self._lock:
+                    self._refreshing.pop(key, None)
+
+        with self._lock:
+            if key in self._refreshing:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="response-cache")
+            self._refreshing[key] = self._executor.submit(refresh)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        백그라운드 갱신 스레드를 정리합니다. (여러 번 호출해도 되고, 이후 갱신이 필요하면 다시 만듦)
+
+        wait=False면 아직 시작하지 않은 갱신은 취소하고 기다리지 않습니다. (프로세스 종료 시)
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        executor.shutdown(wait=wait, cancel_futures=not wait)
+        # 취소된 갱신은 finally가 실행되지 않으므로 진행 중 표시를 직접 지움
+        with self._lock:
+            for key in [key for key, future in self._refreshing.items() if future.cancelled()]:
+                del self._refreshing[key]
@@ -1,42 +1,186 @@
 # risk_analyzer/seoul_api_client.py
 import os
+import re
+import atexit
+import time
+import random
+import logging
+import threading
 import requests
+import urllib3
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import date, datetime
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from .rental_records import RentalRecord, RentalXmlParser
+    from .response_cache import ResponseCache
+    from .comparables import (
+        COMPARABLE_MONTHS, ComparableQuery, ComparablesFrame, market_stats, months_ago, stats_to_dict
+    )
+except ImportError:
+    from rental_records import RentalRecord, RentalXmlParser
+    from response_cache import ResponseCache
+    from comparables import (
+        COMPARABLE_MONTHS, ComparableQuery, ComparablesFrame, market_stats, months_ago, stats_to_dict
+    )
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 SEOUL_API_KEY = os.getenv("SEOUL_API_KEY", "sample")
-SEOUL_API_BASE = "http://openapi.seoul.go.kr:8088"
+# 로컬 스텁 서버로 테스트할 때는 SEOUL_API_BASE=http://127.0.0.1:8000 처럼 지정
+SEOUL_API_BASE = os.getenv("SEOUL_API_BASE", "http://openapi.seoul.go.kr:8088").rstrip("/")
 
+# --- HTTP 설정 (환경 변수로 조정) ---
+CONNECT_TIMEOUT = float(os.getenv("SEOUL_API_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("SEOUL_API_READ_TIMEOUT", "15"))
+MAX_RETRIES = int(os.getenv("SEOUL_API_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("SEOUL_API_BACKOFF_FACTOR", "0.5"))
+POOL_SIZE = int(os.getenv("SEOUL_API_POOL_SIZE", "10"))
 
-def call_seoul_rental_api(
+# --- 인증키별 호출 한도 ---
+MAX_REQUESTS_PER_SECOND = float(os.getenv("SEOUL_API_MAX_RPS", "5"))
+DAILY_QUOTA = int(os.getenv("SEOUL_API_DAILY_QUOTA", "1000"))  # 0이면 제한 없음
+
+# 부동산 실거래가 서비스명, 한 번에 조회할 수 있는 최대 행 수
+SERVICE_NAME = "tbLnOpendataRtmsV"
+MAX_PAGE_SIZE = 1000
+
+# 서울 열린데이터광장 결과 코드
+CODE_OK = "INFO-000"
+CODE_NO_DATA = "INFO-200"
+CODE_TRAFFIC_EXCEEDED = "ERROR-337"
+
+
+# ==========================================
+# HTTP 세션 (keep-alive 연결 풀 + 재시도)
+# ==========================================
+
+class JitterRetry(Retry):
+    """
+    지수 백오프에 full jitter를 적용한 Retry (동시에 실패한 요청이 같은 시각에 재시도하지 않도록)
+
+    재시도도 인증키 호출 1건이므로, 백오프 대기 후 RATE_LIMITER에서 다시 예약합니다.
+    (한도를 다 쓰면 QuotaExceeded로 재시도를 멈춤)
+    """
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff > 0 else 0
+
+    def sleep(self, response=None) -> None:
+        super().sleep(response)
+        RATE_LIMITER.acquire()
+
+
+class QuotaExceeded(Exception):
+    """인증키의 일일 호출 한도를 다 쓴 경우"""
+
+
+class RateLimiter:
+    """
+    인증키 단위 호출 제한
+
+    - 초당 호출 수: 직전 호출로부터 최소 간격이 지날 때까지 대기
+    - 일일 호출 수: 한도를 넘거나 API가 트래픽 초과(ERROR-337)를 알리면
+      다음 날까지 QuotaExceeded를 발생
+
+    카운터는 프로세스 메모리에만 있으므로 한도도 프로세스 단위입니다. 같은 인증키로 여러 프로세스
+    (웹 워커 여러 개, 동기화 작업과 챗봇 동시 실행 등)를 띄우면 SEOUL_API_DAILY_QUOTA /
+    SEOUL_API_MAX_RPS를 프로세스 수로 나눠 설정해야 합니다. 이 경우에도 API가 ERROR-337을 돌려주면
+    그 응답을 받은 프로세스는 당일 호출을 멈춥니다.
+    """
+
+    def __init__(self, max_per_second: float = MAX_REQUESTS_PER_SECOND, daily_quota: int = DAILY_QUOTA):
+        self.min_interval = 1.0 / max_per_second if max_per_second > 0 else 0.0
+        self.daily_quota = daily_quota
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._day = date.today()
+        self._used = 0
+        self._exhausted = False
+
+    def _roll_day(self) -> None:
+        today = date.today()
+        if today != self._day:
+            self._day, self._used, self._exhausted = today, 0, False
+
+    def reserve(self) -> float:
+        """호출 1건을 예약하고 기다려야 할 시간(초)을 반환합니다. (비동기 호출용, 대기는 호출 측에서)"""
+        with self._lock:
+            self._roll_day()
+            if self._exhausted or (self.daily_quota and self._used >= self.daily_quota):
+                raise QuotaExceeded(f"일일 호출 한도 초과 ({self._used}/{self.daily_quota or '-'}건)")
+            self._used += 1
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.min_interval
+        return max(wait, 0.0)
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def mark_exhausted(self) -> None:
+        """API가 트래픽 초과를 알린 경우 오늘은 더 호출하지 않음"""
+        with self._lock:
+            self._roll_day()
+            self._exhausted = True
+
+    @property
+    def used_today(self) -> int:
+        return self._used
+
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+RATE_LIMITER = RateLimiter()
+RESPONSE_CACHE = ResponseCache()
+# 종료할 때 대기 중인 캐시 갱신은 취소 (진행 중인 갱신만 마치고 종료)
+atexit.register(RESPONSE_CACHE.shutdown, wait=False)
+
+
+def get_session() -> requests.Session:
+    """프로세스 전체에서 공유하는 HTTP 세션 (연결 재사용, 5xx/타임아웃 재시도)"""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                retry = JitterRetry(
+                    total=MAX_RETRIES,
+                    connect=MAX_RETRIES,
+                    read=MAX_RETRIES,
+                    status=MAX_RETRIES,
+                    backoff_factor=BACKOFF_FACTOR,
+                    status_forcelist=(500, 502, 503, 504),
+                    allowed_methods=frozenset({"GET"}),
+                    raise_on_status=False,
+                    respect_retry_after_header=True
+                )
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _SESSION = session
+    return _SESSION
+
+
+def build_api_url(
     cgg_cd: str = None,
     cgg_nm: str = None,
     rcpt_yr: str = None,
     start_index: int = 1,
     end_index: int = 100
-) -> Optional[List[Dict]]:
-    """
-    서울시 부동산 실거래가 API 호출
-    
-    Args:
-        cgg_cd: 자치구 코드 (5자리, 예: 11140)
-        cgg_nm: 자치구명 (예: 중구)
-        rcpt_yr: 접수연도 (YYYY)
-        start_index: 시작 위치 (페이징)
-        end_index: 종료 위치 (페이징)
-    
-    Returns:
-        실거래가 데이터 리스트
-    """
-    
-    # URL 구성
-    url = f"{SEOUL_API_BASE}/{SEOUL_API_KEY}/xml/tbLnOpendataRtmsV/{start_index}/{end_index}"
-    
-    # 선택 파라미터 추가
+) -> str:
+    """tbLnOpendataRtmsV 호출 URL (선택 파라미터는 접수연도, 자치구 순서)"""
+    url = f"{SEOUL_API_BASE}/{SEOUL_API_KEY}/xml/{SERVICE_NAME}/{start_index}/{end_index}"
+
     params = []
     if rcpt_yr:
         params.append(rcpt_yr)
@@ -44,135 +188,327 @@ def call_seoul_rental_api(
         params.append(cgg_cd)
     elif cgg_nm:
         params.append(cgg_nm)
-    
-    # URL에 파라미터 추가
+
     if params:
         url += "/" + "/".join(params)
-    
+    return url
+
+
+def mask_api_key(url: str) -> str:
+    """로그에 인증키가 남지 않도록 가림"""
+    return url.replace(f"/{SEOUL_API_KEY}/", "/***/")
+
+
+def _get_api_response(url: str, stream: bool = False) -> Optional[requests.Response]:
+    """
+    공유 세션으로 URL을 호출하여 HTTP 200 응답을 반환합니다.
+
+    호출 한도를 지키고(RATE_LIMITER, 재시도도 1건씩), 5xx/연결 오류/타임아웃은 지수 백오프로 재시도합니다.
+    stream=True면 본문을 읽지 않은 응답을 반환하므로 호출한 쪽에서 닫아야 합니다. 실패하면 None
+    """
     try:
-        print(f"  🌐 API 호출: {url[:80]}...")
-        response = requests.get(url, timeout=15)
-        
-        if response.status_code != 200:
-            print(f"  ❌ HTTP 오류: {response.status_code}")
-            return None
-        
-        # XML 파싱
-        root = ET.fromstring(response.content)
-        
-        # 결과 코드 확인
-        result_elem = root.find('RESULT')
-        if result_elem is not None:
-            code = result_elem.find('CODE')
-            message = result_elem.find('MESSAGE')
-            
-            if code is not None and code.text != "INFO-000":
-                print(f"  ❌ API 오류: {code.text} - {message.text if message is not None else ''}")
-                return None
-        
-        # 총 건수
-        total_count = root.find('list_total_count')
-        if total_count is not None:
-            print(f"  📊 총 {total_count.text}건 중 {end_index-start_index+1}건 조회")
-        
-        # 데이터 파싱
-        data_list = []
-        for row in root.findall('row'):
-            try:
-                data = {
-                    "접수연도": safe_text(row, 'RCPT_YR'),
-                    "자치구코드": safe_text(row, 'CGG_CD'),
-                    "자치구": safe_text(row, 'CGG_NM'),
-                    "법정동코드": safe_text(row, 'STDG_CD'),
-                    "법정동": safe_text(row, 'STDG_NM'),
-                    "지번구분": safe_text(row, 'LOTNO_SE_NM'),
-                    "본번": safe_text(row, 'MNO'),
-                    "부번": safe_text(row, 'SNO'),
-                    "건물명": safe_text(row, 'BLDG_NM'),
-                    "계약일": safe_text(row, 'CTRT_DAY'),
-                    "거래금액": safe_int(row, 'THING_AMT'),  # 만원
-                    "건물면적": safe_float(row, 'ARCH_AREA'),  # ㎡
-                    "토지면적": safe_float(row, 'LAND_AREA'),  # ㎡
-                    "층수": safe_text(row, 'FLR'),
-                    "권리구분": safe_text(row, 'RGHT_SE'),
-                    "취소일": safe_text(row, 'RTRCN_DAY'),
-                    "건축연도": safe_text(row, 'ARCH_YR'),
-                    "건물용도": safe_text(row, 'BLDG_USG'),
-                    "신고구분": safe_text(row, 'DCLR_SE'),
-                }
-                data_list.append(data)
-            except Exception as e:
-                continue  # 파싱 오류 무시
-        
-        print(f"  ✅ {len(data_list)}건 파싱 완료")
-        return data_list
-    
+        RATE_LIMITER.acquire()
+    except QuotaExceeded as e:
+        logger.warning("서울시 API 호출 생략: %s", e)
+        return None
+
+    safe_url = mask_api_key(url)
+    started = time.perf_counter()
+    try:
+        response = get_session().get(url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), stream=stream)
+    except QuotaExceeded as e:
+        logger.warning("서울시 API 재시도 생략: %s (%s)", e, safe_url)
+        return None
     except requests.exceptions.Timeout:
-        print(f"  ❌ API 타임아웃 (15초)")
+        logger.error("서울시 API 타임아웃 (연결 %.0f초 / 응답 %.0f초): %s", CONNECT_TIMEOUT, READ_TIMEOUT, safe_url)
         return None
-    except Exception as e:
-        print(f"  ❌ 예외 발생: {e}")
+    except requests.exceptions.RequestException as e:
+        logger.error("서울시 API 요청 실패: %s (%s)", safe_url, e)
+        return None
+
+    elapsed = time.perf_counter() - started
+    if response.status_code != 200:
+        logger.error("서울시 API HTTP 오류 %s (%.2f초): %s", response.status_code, elapsed, safe_url)
+        response.close()
+        return None
+
+    logger.debug("서울시 API 응답 (%.2f초): %s", elapsed, safe_url)
+    return response
+
+
+def fetch_api_xml(url: str) -> Optional[bytes]:
+    """공유 세션으로 URL을 호출하여 응답 본문을 반환합니다. 실패하면 None"""
+    response = _get_api_response(url)
+    if response is None:
+        return None
+    try:
+        note_api_result(RentalXmlParser(response.content).read_header())
+    except ET.ParseError:
+        pass  # 깨진 본문은 캐시 검증(is_valid_response)이나 파싱하는 쪽에서 처리
+    return response.content
+
+
+def note_api_result(parser: RentalXmlParser) -> None:
+    """
+    응답을 받은 쪽에서 결과 코드를 기록합니다.
+
+    트래픽 초과(ERROR-337)면 오늘은 더 호출하지 않도록 RATE_LIMITER를 소진 처리합니다.
+    (응답 검증/파싱 함수는 부수 효과 없이 두고, 실제로 API를 호출한 곳에서만 호출)
+    """
+    if parser.code == CODE_TRAFFIC_EXCEEDED:
+        RATE_LIMITER.mark_exhausted()
+
+
+def is_ok_result(code: Optional[str]) -> bool:
+    """정상 결과 코드인지 (코드가 없는 응답은 행만 있는 정상 응답으로 봄)"""
+    return code is None or code in (CODE_OK, CODE_NO_DATA)
+
+
+def parse_api_response(content: bytes) -> Optional[List[Dict]]:
+    """XML 응답 본문 → 실거래가 데이터 리스트 (한글 키 딕셔너리, API 오류 코드면 None)"""
+    page = parse_api_page(content)
+    return [record.to_dict() for record in page[1]] if page is not None else None
+
+
+def parse_api_page(source) -> Optional[Tuple[int, Iterator[RentalRecord]]]:
+    """
+    XML 응답 (본문 bytes 또는 응답 스트림) → (전체 건수 list_total_count, 이 페이지의 RentalRecord 이터레이터)
+
+    결과 코드(RESULT)까지만 먼저 읽고, 행은 이터레이터를 순회할 때 읽는 대로 내보냅니다.
+    API 오류 코드면 None (본문이 깨졌으면 읽는 도중 ET.ParseError)
+    """
+    parser = RentalXmlParser(source).read_header()
+
+    # 결과 코드 확인
+    if not is_ok_result(parser.code):
+        logger.error("서울시 API 오류: %s - %s", parser.code, parser.message or '')
+        return None
+    if parser.code == CODE_NO_DATA:
+        return 0, iter(())
+
+    logger.info("서울시 API 총 %d건", parser.total_count)
+    return parser.total_count, iter(parser)
+
+
+class ResponseStreamError(Exception):
+    """fetch_api_page 레코드를 읽는 도중 응답 본문이 끊기거나 깨짐"""
+
+
+def fetch_api_page(
+    cgg_cd: str = None,
+    rcpt_yr: str = None,
+    start_index: int = 1,
+    end_index: int = MAX_PAGE_SIZE
+) -> Optional[Tuple[int, Iterator[RentalRecord]]]:
+    """
+    한 페이지를 조회하여 (전체 건수, RentalRecord 이터레이터)를 반환합니다. 실패하면 None (동기화 작업용)
+
+    응답 본문은 소켓에서 받는 대로 파싱하므로 본문 전체를 메모리에 올리지 않습니다.
+    이터레이터(제너레이터)를 끝까지 돌거나 close()하면 연결을 반납하며, 읽는 도중 본문이
+    끊기거나 깨지면 ResponseStreamError가 발생합니다.
+    """
+    response = _get_api_response(
+        build_api_url(cgg_cd=cgg_cd, rcpt_yr=rcpt_yr, start_index=start_index, end_index=end_index),
+        stream=True
+    )
+    if response is None:
         return None
 
+    response.raw.decode_content = True
+    try:
+        parser = RentalXmlParser(response.raw).read_header()
+    except (ET.ParseError, OSError, requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+        logger.error("서울시 API 응답 읽기 실패: %s", e)
+        response.close()
+        return None
 
-def safe_text(element, tag: str) -> str:
-    """XML에서 텍스트 안전하게 추출"""
-    child = element.find(tag)
-    return child.text if child is not None and child.text else ""
+    note_api_result(parser)
+    if not is_ok_result(parser.code):
+        logger.error("서울시 API 오류: %s - %s", parser.code, parser.message or '')
+        response.close()
+        return None
+    total = 0 if parser.code == CODE_NO_DATA else parser.total_count
+    return total, _stream_records(parser, response)
 
 
-def safe_int(element, tag: str) -> int:
-    """XML에서 정수 안전하게 추출"""
-    text = safe_text(element, tag)
+def _stream_records(parser: RentalXmlParser, response: requests.Response) -> Iterator[RentalRecord]:
     try:
-        return int(text) if text else 0
-    except:
-        return 0
+        yield from parser
+    except (ET.ParseError, OSError, requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+        raise ResponseStreamError(str(e)) from e
+    finally:
+        response.close()
+
+
+def fetch_cached_xml(
+    cgg_cd: str = None,
+    cgg_nm: str = None,
+    rcpt_yr: str = None,
+    start_index: int = 1,
+    end_index: int = 100
+) -> Optional[bytes]:
+    """
+    응답 캐시(RESPONSE_CACHE)를 거쳐 응답 본문을 반환합니다.
+
+    캐시가 오래되었으면 캐시를 바로 반환하고 백그라운드에서 갱신하며,
+    API 호출이 실패하면 남아 있는 캐시를 반환합니다. 오류 코드 응답은 저장하지 않습니다.
+    """
+    url = build_api_url(cgg_cd, cgg_nm, rcpt_yr, start_index, end_index)
+    key = (SERVICE_NAME, cgg_cd or cgg_nm or "", rcpt_yr or "", start_index, end_index)
+    return RESPONSE_CACHE.fetch(key, lambda: fetch_api_xml(url), validate=is_valid_response)
 
 
-def safe_float(element, tag: str) -> float:
-    """XML에서 실수 안전하게 추출"""
-    text = safe_text(element, tag)
+def is_valid_response(content: bytes) -> bool:
+    """캐시에 저장해도 되는 응답인지 (결과 코드만 확인, XML이 깨졌거나 API 오류 코드면 False)"""
     try:
-        return float(text) if text else 0.0
-    except:
-        return 0.0
+        return is_ok_result(RentalXmlParser(content).read_header().code)
+    except ET.ParseError:
+        return False
+
+
+def call_seoul_rental_api(
+    cgg_cd: str = None,
+    cgg_nm: str = None,
+    rcpt_yr: str = None,
+    start_index: int = 1,
+    end_index: int = 100,
+    use_cache: bool = True
+) -> Optional[List[Dict]]:
+    """
+    서울시 부동산 실거래가 API 호출
+    
+    Args:
+        cgg_cd: 자치구 코드 (5자리, 예: 11140)
+        cgg_nm: 자치구명 (예: 중구)
+        rcpt_yr: 접수연도 (YYYY)
+        start_index: 시작 위치 (페이징)
+        end_index: 종료 위치 (페이징)
+        use_cache: 응답 캐시 사용 여부 (False면 항상 API 호출)
+    
+    Returns:
+        실거래가 데이터 리스트 (실패 시 None)
+    """
+    if use_cache:
+        content = fetch_cached_xml(cgg_cd, cgg_nm, rcpt_yr, start_index, end_index)
+    else:
+        content = fetch_api_xml(build_api_url(cgg_cd, cgg_nm, rcpt_yr, start_index, end_index))
+    if content is None:
+        return None
+
+    try:
+        data_list = parse_api_response(content)
+    except ET.ParseError as e:
+        logger.error("서울시 API 응답 XML 파싱 실패: %s", e)
+        return None
+
+    if data_list is not None:
+        logger.info("서울시 API %d~%d 구간 %d건 파싱 완료", start_index, end_index, len(data_list))
+    return data_list
+
+
+# 서울시 25개 자치구 이름 → 코드
+DISTRICT_CODES = {
+    "종로구": "11110", "중구": "11140", "용산구": "11170",
+    "성동구": "11200", "광진구": "11215", "동대문구": "11230",
+    "중랑구": "11260", "성북구": "11290", "강북구": "11305",
+    "도봉구": "11320", "노원구": "11350", "은평구": "11380",
+    "서대문구": "11410", "마포구": "11440", "양천구": "11470",
+    "강서구": "11500", "구로구": "11530", "금천구": "11545",
+    "영등포구": "11560", "동작구": "11590", "관악구": "11620",
+    "서초구": "11650", "강남구": "11680", "송파구": "11710",
+    "강동구": "11740"
+}
 
 
 def get_district_code(district_name: str) -> str:
     """자치구 이름 → 코드 변환"""
-    codes = {
-        "종로구": "11110", "중구": "11140", "용산구": "11170",
-        "성동구": "11200", "광진구": "11215", "동대문구": "11230",
-        "중랑구": "11260", "성북구": "11290", "강북구": "11305",
-        "도봉구": "11320", "노원구": "11350", "은평구": "11380",
-        "서대문구": "11410", "마포구": "11440", "양천구": "11470",
-        "강서구": "11500", "구로구": "11530", "금천구": "11545",
-        "영등포구": "11560", "동작구": "11590", "관악구": "11620",
-        "서초구": "11650", "강남구": "11680", "송파구": "11710",
-        "강동구": "11740"
-    }
-    return codes.get(district_name, "11140")
+    return DISTRICT_CODES.get(district_name, "11140")
+
+
+_LOCAL_STORE = None
+# 자치구코드 → (((접수연도, 동기화 시각), ...), 계약일 시작, ComparablesFrame) - 다시 동기화되면 새로 읽음
+_LOCAL_FRAMES: Dict[str, Tuple[tuple, Optional[str], ComparablesFrame]] = {}
+
+
+def get_local_store():
+    """transaction_store 저장소 (처음 호출할 때 엶)"""
+    global _LOCAL_STORE
+    if _LOCAL_STORE is None:
+        try:
+            from .transaction_store import TransactionStore
+        except ImportError:
+            from transaction_store import TransactionStore
+        _LOCAL_STORE = TransactionStore()
+    return _LOCAL_STORE
+
+
+def load_local_frame(cgg_cd: str, ctrt_from: str = None) -> Optional[ComparablesFrame]:
+    """
+    자치구의 동기화된 모든 접수연도에서 ctrt_from(YYYYMMDD) 이후 계약된 거래를
+    열 배열(ComparablesFrame)로 반환합니다. (ctrt_from이 없으면 전체)
+
+    계약일 구간은 접수연도 경계를 넘으므로(연초의 최근 12개월은 대부분 작년 접수분) 연도별
+    파티션을 모두 모읍니다. 구간에 걸친 접수연도(ctrt_from 연도 ~ 올해)가 하나도 동기화되지
+    않았으면 None. 동기화 상태와 ctrt_from이 같으면 이전에 읽은 프레임을 재사용
+    """
+    store = get_local_store()
+    if not store.exists():
+        return None
+    try:
+        states = store.sync_states(cgg_cd)
+        if ctrt_from:
+            window_years = {str(y) for y in range(int(ctrt_from[:4]), datetime.now().year + 1)}
+            if not window_years & set(states):
+                return None
+            missing = sorted(window_years - set(states))
+            if missing:
+                logger.info("로컬 실거래가 저장소에 %s %s년이 없어 일부 기간만 비교", cgg_cd, ", ".join(missing))
+        elif not states:
+            return None
+
+        signature = tuple((rcpt_yr, state["synced_at"]) for rcpt_yr, state in states.items())
+        cached = _LOCAL_FRAMES.get(cgg_cd)
+        if cached is not None and cached[:2] == (signature, ctrt_from):
+            return cached[2]
+        frame = ComparablesFrame.from_store(store, cgg_cd=cgg_cd, ctrt_from=ctrt_from)
+        _LOCAL_FRAMES[cgg_cd] = (signature, ctrt_from, frame)
+        return frame
+    except Exception as e:
+        logger.warning("로컬 실거래가 저장소 조회 실패, API로 대체: %s", e)
+        return None
+
+
+def extract_dong(address: str, district: str) -> Optional[str]:
+    """주소에서 자치구 다음의 법정동 이름 추출 (예: '서울 중구 신당동 123' → '신당동')"""
+    rest = address.split(district, 1)[1] if district in address else address
+    match = re.search(r"([가-힣0-9]+(?:동|가))(?=[\s\d-]|$)", rest)
+    return match.group(1) if match else None
 
 
 def search_similar_property(
     address: str,
-    deposit: int
+    deposit: int,
+    area: float = None,
+    building_type: str = None,
+    months: int = COMPARABLE_MONTHS
 ) -> Optional[Dict]:
     """
     주소와 보증금으로 유사 매물 검색 및 통계 계산
-    
+
+    Args:
+        address: 주소 (자치구, 법정동을 찾아 비교 사례 조건으로 사용)
+        deposit: 보증금 (만원)
+        area: 건물면적 (㎡, 있으면 ±20% 면적 구간으로 비교)
+        building_type: 건물용도 (예: 아파트, 연립다세대)
+        months: 최근 몇 개월 안에 계약된 거래와 비교할지 (0이면 기간 제한 없음)
+
     Returns:
         매매가, 전세가, 통계 정보
     """
     
     # 자치구 추출
     district = None
-    for name in ["종로구", "중구", "용산구", "성동구", "광진구",
-                 "동대문구", "중랑구", "성북구", "강북구", "도봉구",
-                 "노원구", "은평구", "서대문구", "마포구", "양천구",
-                 "강서구", "구로구", "금천구", "영등포구", "동작구",
-                 "관악구", "서초구", "강남구", "송파구", "강동구"]:
+    for name in DISTRICT_CODES:
         if name in address:
             district = name
             break
@@ -183,77 +519,70 @@ def search_similar_property(
     # 현재 연도
     current_year = str(datetime.now().year)
     
-    # API 호출
     cgg_cd = get_district_code(district)
-    data_list = call_seoul_rental_api(
-        cgg_cd=cgg_cd,
-        rcpt_yr=current_year,
-        start_index=1,
-        end_index=200  # 최대 200건
-    )
     
-    if not data_list or len(data_list) == 0:
-        print("  ⚠️ API 데이터 없음, 더미 데이터 사용")
+    ctrt_from = months_ago(months) if months > 0 else None
+    
+    # 로컬 저장소 우선 (비교 기간에 걸친 접수연도 파티션을 모두 모음, 네트워크 호출 없음)
+    frame = load_local_frame(cgg_cd, ctrt_from)
+    source = "서울시 Open API (로컬 저장소)"
+    
+    if frame is None:
+        # API 호출 (응답 캐시 경유 - API 장애 시에도 캐시된 응답이 있으면 더미 데이터 대신 사용)
+        # 주의: 올해 접수분 최대 200건만 받으므로, 연초에는 비교 기간 중 작년 계약 대부분이 빠짐
+        # (비교 기간 전체를 보려면 transaction_store로 여러 연도를 동기화)
+        data_list = call_seoul_rental_api(
+            cgg_cd=cgg_cd,
+            rcpt_yr=current_year,
+            start_index=1,
+            end_index=200  # 최대 200건
+        )
+        frame = ComparablesFrame.from_records(data_list or [])
+        source = "서울시 Open API"
+    
+    if len(frame) == 0:
+        logger.warning("서울시 API 데이터 없음, 더미 데이터 사용 (%s)", district)
         return get_dummy_price_data(address, deposit)
     
-    # 유사 매물 필터링 (±40% 범위)
-    target = deposit
-    similar = [d for d in data_list 
-               if d['거래금액'] > 0 and 
-               abs(d['거래금액'] - target) / max(target, 1) < 0.4]
-    
-    if not similar:
-        similar = data_list  # 필터링 결과 없으면 전체 사용
+    # 유사 매물: 보증금 ±40% + 법정동/면적/건물용도/최근 계약일 (비교 사례가 적으면 조건을 하나씩 풀어 재검색)
+    query = ComparableQuery(
+        stdg_nm=extract_dong(address, district),
+        area=area,
+        bldg_usg=building_type,
+        ctrt_from=ctrt_from,
+        price=deposit
+    )
+    mask, applied = frame.select(query)
+    similar = frame.stats(mask)
+    if similar.count == 0:
+        similar = frame.stats()  # 필터링 결과 없으면 전체 사용
     
-    # 평균 전세가
-    avg_jeonse = sum(d['거래금액'] for d in similar) / len(similar)
+    # 평균 전세가 (거래금액이 있는 거래만 - 금액 0인 행은 평균에서 제외)
+    avg_jeonse = similar.mean
     
     # 매매가 추정 (전세가의 1.3~1.5배)
     estimated_매매가 = int(avg_jeonse * 1.4)
     
     # 통계 계산 (논문 기반)
-    stats = calculate_market_stats(data_list, district)
+    stats = market_stats(frame)
     
     return {
         "매매가": estimated_매매가 * 10000,  # 만원 → 원
         "전세가": int(avg_jeonse) * 10000,
-        "거래건수": len(data_list),
-        "유사매물": len(similar),
+        "거래건수": len(frame),
+        "유사매물": similar.count,
         "자치구": district,
-        "데이터출처": "서울시 Open API",
-        **stats  # 통계 정보 추가
+        "법정동": applied.stdg_nm,
+        "비교시작일": applied.ctrt_from,
+        "데이터출처": source,
+        **stats,  # 통계 정보 추가
+        **stats_to_dict(similar)
     }
 
 
 def calculate_market_stats(data_list: List[Dict], district: str) -> Dict:
-    """시장 통계 계산 (논문 기반)"""
-    
-    if not data_list:
-        return {
-            "평균거래가": 0,
-            "거래량": 0,
-            "시장과열도": "보통"
-        }
-    
-    # 평균 거래가
-    avg_price = sum(d['거래금액'] for d in data_list if d['거래금액'] > 0) / len(data_list)
-    
-    # 거래량 (최근 데이터 기준)
-    recent_count = len([d for d in data_list if d['계약일'] and d['계약일'].startswith('2025')])
-    
-    # 시장 과열도 판단 (논문 기반)
-    if recent_count > 100 and avg_price > 50000:
-        market_heat = "과열"
-    elif recent_count > 50:
-        market_heat = "활성"
-    else:
-        market_heat = "보통"
-    
-    return {
-        "평균거래가": int(avg_price),
-        "거래량": recent_count,
-        "시장과열도": market_heat
-    }
+    """시장 통계 계산 (논문 기반, 거래량은 데이터의 가장 최근 계약 연도 기준)"""
+    return market_stats(ComparablesFrame.from_records(data_list or []))
 
 
 def get_dummy_price_data(address: str, deposit: int) -> Dict:
@@ -275,6 +604,8 @@ def get_dummy_price_data(address: str, deposit: int) -> Dict:
 # 테스트 코드
 # ==========================================
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="  %(levelname)s %(message)s")
+
     print("="*70)
     print("🧪 서울시 부동산 API 테스트")
     print("="*70 + "\n")
@@ -0,0 +1,315 @@
+"""
+Transaction Store
+
+서울시 부동산 실거래가(tbLnOpendataRtmsV)를 로컬 SQLite에 저장하는 저장소와 동기화 작업
+
+- 25개 자치구 × 여러 접수연도를 1000건 단위 페이지로 모두 받아 저장
+  (첫 페이지 이후는 async_fetcher로 동시에 요청, --concurrency 1이면 순차)
+- 인덱스: (자치구코드, 계약일), (법정동코드, 계약일), (계약일)
+- 파티션 단위 갱신: (자치구, 접수연도)를 파티션 하나로 보고 전체 건수(list_total_count)를 기록해 두고,
+  건수가 바뀌었거나 최근 연도(취소·정정 신고가 들어오는 기간)인 파티션만 전체를 다시 받아
+  한 트랜잭션으로 교체 (행 단위 증분이나 계약일 기준 워터마크는 없음 - API가 접수연도/자치구로만
+  거르므로 파티션보다 작게 받을 수 없고, 기존 행의 취소일도 바뀌기 때문)
+- 위험도 분석(search_similar_property)은 요청 시 네트워크 없이 이 저장소를 먼저 조회
+
+실행 (risk_analyzer 폴더 또는 ai_modules 폴더에서):
+    python -m risk_analyzer.transaction_store --years 2023 2024 2025
+"""
+
+import os
+import sqlite3
+import argparse
+import threading
+import logging
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from .rental_records import RentalRecord
+    from .seoul_api_client import DISTRICT_CODES, MAX_PAGE_SIZE, ResponseStreamError, fetch_api_page
+    from .async_fetcher import CONCURRENCY, PartitionFetcher
+except ImportError:
+    from rental_records import RentalRecord
+    from seoul_api_client import DISTRICT_CODES, MAX_PAGE_SIZE, ResponseStreamError, fetch_api_page
+    from async_fetcher import CONCURRENCY, PartitionFetcher
+
+logger = logging.getLogger(__name__)
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.getenv("SEOUL_TX_DB", os.path.join(CURRENT_DIR, "data", "transactions.sqlite3"))
+
+# 이 기간(년) 안의 접수연도는 건수가 같아도 매번 다시 받음 (계약 취소일 등 기존 행이 바뀌므로)
+REFRESH_RECENT_YEARS = int(os.getenv("SEOUL_TX_REFRESH_RECENT_YEARS", "1"))
+
+# call_seoul_rental_api 결과 키 → (컬럼, SQLite 타입)
+FIELDS = (
+    ("접수연도", "rcpt_yr", "TEXT"),
+    ("자치구코드", "cgg_cd", "TEXT"),
+    ("자치구", "cgg_nm", "TEXT"),
+    ("법정동코드", "stdg_cd", "TEXT"),
+    ("법정동", "stdg_nm", "TEXT"),
+    ("지번구분", "lotno_se_nm", "TEXT"),
+    ("본번", "mno", "TEXT"),
+    ("부번", "sno", "TEXT"),
+    ("건물명", "bldg_nm", "TEXT"),
+    ("계약일", "ctrt_day", "TEXT"),
+    ("거래금액", "thing_amt", "INTEGER"),
+    ("건물면적", "arch_area", "REAL"),
+    ("토지면적", "land_area", "REAL"),
+    ("층수", "flr", "TEXT"),
+    ("권리구분", "rght_se", "TEXT"),
+    ("취소일", "rtrcn_day", "TEXT"),
+    ("건축연도", "arch_yr", "TEXT"),
+    ("건물용도", "bldg_usg", "TEXT"),
+    ("신고구분", "dclr_se", "TEXT"),
+)
+COLUMNS = [column for _, column, _ in FIELDS]
+STATE_COLUMNS = ("total_count", "row_count", "max_ctrt_day", "synced_at")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS transactions (
+    {", ".join(f"{column} {sql_type}" for _, column, sql_type in FIELDS)}
+);
+CREATE INDEX IF NOT EXISTS idx_tx_district_day ON transactions (cgg_cd, ctrt_day);
+CREATE INDEX IF NOT EXISTS idx_tx_dong_day ON transactions (stdg_cd, ctrt_day);
+CREATE INDEX IF NOT EXISTS idx_tx_day ON transactions (ctrt_day);
+CREATE INDEX IF NOT EXISTS idx_tx_district_year ON transactions (cgg_cd, rcpt_yr);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    cgg_cd TEXT NOT NULL,
+    rcpt_yr TEXT NOT NULL,
+    total_count INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    max_ctrt_day TEXT,
+    synced_at TEXT NOT NULL,
+    PRIMARY KEY (cgg_cd, rcpt_yr)
+);
+"""
+
+
+def to_row(record) -> tuple:
+    """RentalRecord(또는 API 결과 딕셔너리) → INSERT용 튜플"""
+    if isinstance(record, RentalRecord):
+        return tuple(getattr(record, column) for column in COLUMNS)
+    return tuple(record.get(key) for key, _, _ in FIELDS)
+
+
+class TransactionStore:
+    """실거래가 SQLite 저장소 (스레드마다 연결을 따로 엶)"""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    # --- 조회 ---
+
+    def sync_state(self, cgg_cd: str, rcpt_yr: str) -> Optional[Dict]:
+        row = self.conn.execute(
+            f"SELECT {', '.join(STATE_COLUMNS)} FROM sync_state WHERE cgg_cd = ? AND rcpt_yr = ?",
+            (cgg_cd, rcpt_yr)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(STATE_COLUMNS, row))
+
+    def sync_states(self, cgg_cd: str) -> Dict[str, Dict]:
+        """자치구의 동기화된 접수연도별 상태 {접수연도: 상태}"""
+        rows = self.conn.execute(
+            f"SELECT rcpt_yr, {', '.join(STATE_COLUMNS)} FROM sync_state WHERE cgg_cd = ? ORDER BY rcpt_yr",
+            (cgg_cd,)
+        )
+        return {row[0]: dict(zip(STATE_COLUMNS, row[1:])) for row in rows}
+
+    def is_synced(self, cgg_cd: str, rcpt_yr: str) -> bool:
+        return self.sync_state(cgg_cd, rcpt_yr) is not None
+
+    def query(
+        self,
+        cgg_cd: str = None,
+        rcpt_yr: str = None,
+        stdg_cd: str = None,
+        ctrt_from: str = None,
+        ctrt_to: str = None,
+        limit: int = None
+    ) -> List[Dict]:
+        """
+        조건에 맞는 거래를 call_seoul_rental_api와 같은 형식(한글 키 딕셔너리)으로 반환합니다.
+
+        ctrt_from / ctrt_to: 계약일 범위 (YYYYMMDD, 양 끝 포함)
+        """
+        clauses, params = [], []
+        for column, value in (("cgg_cd", cgg_cd), ("rcpt_yr", rcpt_yr), ("stdg_cd", stdg_cd)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if ctrt_from:
+            clauses.append("ctrt_day >= ?")
+            params.append(ctrt_from)
+        if ctrt_to:
+            clauses.append("ctrt_day <= ?")
+            params.append(ctrt_to)
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM transactions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ctrt_day DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        keys = [key for key, _, _ in FIELDS]
+        return [dict(zip(keys, row)) for row in self.conn.execute(sql, params)]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    # --- 저장 ---
+
+    def replace_partition(self, cgg_cd: str, rcpt_yr: str, records: Iterable[RentalRecord], total_count: int) -> int:
+        """(자치구, 접수연도) 행 전체를 한 트랜잭션으로 교체하고 동기화 상태를 기록합니다."""
+        rows = [to_row(record) for record in records]
+        max_day = max((row[COLUMNS.index("ctrt_day")] or "" for row in rows), default=None) or None
+        with self.conn:
+            self.conn.execute("DELETE FROM transactions WHERE cgg_cd = ? AND rcpt_yr = ?", (cgg_cd, rcpt_yr))
+            self.conn.executemany(
+                f"INSERT INTO transactions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                rows
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?, ?, ?)",
+                (cgg_cd, rcpt_yr, total_count, len(rows), max_day, datetime.now().isoformat(timespec="seconds"))
+            )
+        return len(rows)
+
+
+# ==========================================
+# 동기화 작업
+# ==========================================
+
+
+def fetch_partition(cgg_cd: str, rcpt_yr: str, first_page=None, fetcher: PartitionFetcher = None) -> Optional[tuple]:
+    """
+    (자치구, 접수연도) 전체를 페이지 단위로 받습니다.
+
+    fetcher가 있으면 나머지 페이지를 동시에 요청하고, 없으면 순차로 요청합니다.
+
+    Returns:
+        (전체 건수, RentalRecord 리스트). 중간에 한 페이지라도 실패하면 None
+        (일부만 받은 결과로 저장소를 덮어쓰지 않기 위해)
+    """
+    try:
+        if fetcher is not None:
+            if first_page is not None:
+                first_page = (first_page[0], list(first_page[1]))
+            return fetcher.fetch(cgg_cd, rcpt_yr, first_page)
+
+        page = first_page or fetch_api_page(cgg_cd=cgg_cd, rcpt_yr=rcpt_yr, start_index=1, end_index=MAX_PAGE_SIZE)
+        if page is None:
+            return None
+        total, records = page[0], list(page[1])
+
+        for start in range(MAX_PAGE_SIZE + 1, total + 1, MAX_PAGE_SIZE):
+            page = fetch_api_page(cgg_cd=cgg_cd, rcpt_yr=rcpt_yr, start_index=start, end_index=start + MAX_PAGE_SIZE - 1)
+            if page is None:
+                return None
+            records.extend(page[1])
+        return total, records
+    except ResponseStreamError as e:
+        logger.error("페이지 응답 읽기 실패 (%s %s년): %s", cgg_cd, rcpt_yr, e)
+        return None
+
+
+def sync_transactions(
+    years: List[str],
+    districts: List[str] = None,
+    store: TransactionStore = None,
+    force: bool = False,
+    concurrency: int = CONCURRENCY
+) -> Dict:
+    """
+    자치구 × 접수연도별로 실거래가를 받아 저장소를 갱신합니다.
+
+    이미 받은 과거 연도는 첫 페이지의 전체 건수가 기록과 같으면 건너뛰고,
+    나머지 파티션은 모든 페이지를 다시 받아 통째로 교체합니다.
+
+    Args:
+        years: 접수연도 목록 (예: ["2023", "2024", "2025"])
+        districts: 자치구 이름 목록 (기본: 서울시 25개 구 전체)
+        concurrency: 자치구/연도 하나 안에서 동시에 요청할 페이지 수
+
+    Returns:
+        {"updated", "skipped", "failed", "rows"} 집계
+    """
+    store = store or TransactionStore()
+    districts = districts or list(DISTRICT_CODES)
+    recent_from = datetime.now().year - REFRESH_RECENT_YEARS
+    summary = {"updated": 0, "skipped": 0, "failed": 0, "rows": 0}
+
+    # 동시 조회는 이벤트 루프/HTTP 연결을 모든 파티션이 공유
+    with PartitionFetcher(concurrency) if concurrency > 1 else nullcontext() as fetcher:
+        for rcpt_yr in map(str, years):
+            for district in districts:
+                cgg_cd = DISTRICT_CODES[district]
+                state = store.sync_state(cgg_cd, rcpt_yr)
+
+                first_page = fetch_api_page(cgg_cd=cgg_cd, rcpt_yr=rcpt_yr, start_index=1, end_index=MAX_PAGE_SIZE)
+                if first_page is None:
+                    logger.error("동기화 실패: %s %s년 (첫 페이지)", district, rcpt_yr)
+                    summary["failed"] += 1
+                    continue
+
+                if (
+                    not force and state is not None
+                    and state["total_count"] == first_page[0]
+                    and int(rcpt_yr) < recent_from
+                ):
+                    first_page[1].close()  # 읽지 않은 첫 페이지 응답의 연결 반납
+                    summary["skipped"] += 1
+                    continue
+
+                result = fetch_partition(cgg_cd, rcpt_yr, first_page, fetcher)
+                if result is None:
+                    logger.error("동기화 실패: %s %s년 (페이지 조회 중단, 기존 데이터 유지)", district, rcpt_yr)
+                    summary["failed"] += 1
+                    continue
+
+                total, records = result
+                written = store.replace_partition(cgg_cd, rcpt_yr, records, total)
+                summary["updated"] += 1
+                summary["rows"] += written
+                logger.info("동기화: %s %s년 %d건", district, rcpt_yr, written)
+
+    return summary
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="  %(levelname)s %(message)s")
+
+    this_year = datetime.now().year
+    parser = argparse.ArgumentParser(description="서울시 실거래가를 로컬 저장소로 동기화합니다.")
+    parser.add_argument("--years", nargs="+", default=[str(y) for y in range(this_year - 2, this_year + 1)],
+                        help="접수연도 목록 (기본: 최근 3년)")
+    parser.add_argument("--districts", nargs="+", default=None, help="자치구 이름 (기본: 25개 구 전체)")
+    parser.add_argument("--force", action="store_true", help="건수가 같아도 다시 받기")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="동시 페이지 요청 수 (1이면 순차)")
+    args = parser.parse_args()
+
+    store = TransactionStore()
+    print(f"🔄 실거래가 동기화 시작: {', '.join(args.years)}년 → {store.path}")
+    summary = sync_transactions(args.years, args.districts, store, force=args.force, concurrency=args.concurrency)
+    print(f"✅ 동기화 완료: 갱신 {summary['updated']}건, 건너뜀 {summary['skipped']}건, "
+          f"실패 {summary['failed']}건, 저장 {summary['rows']:,}행 (전체 {store.count():,}행)")
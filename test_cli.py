@@ -14,11 +14,18 @@ ai_modules_path = Path(__file__).resolve().parent / "ai_modules"
 sys.path.insert(0, str(ai_modules_path))
 
 from classifier.classifier_logic import (
+    DIAGNOSIS_QUESTIONS,
     start_initial_conversation,
-    determine_victim_status,
-    analyze_user_query
+    explain_victim_status,
+    analyze_user_query,
+    enable_semantic_crisis_detection,
+    SEMANTIC_CRISIS_ENABLED,
+    CRISIS_NOTICE
 )
-from rag_engine.run_chain import get_rag_response
+from classifier.eligibility import format_explanation
+from classifier.topic_classifier import TopicScores, score_topics
+from rag_engine.run_chain import get_engine, stream_rag_response, warm_up_in_background
+from rag_engine.precomputed_answers import INITIAL_GUIDANCE_QUERY, get_precomputed_answer
 from rag_engine.contact_info import get_contact_info_text
 from rag_engine.useful_links import get_relevant_links
 
@@ -34,12 +41,15 @@ class ConversationMemory:
         self.context: Dict = {}
     
     def add_message(self, role: str, content: str):
-        """메시지 추가"""
-        self.messages.append({
+        """메시지 추가 (사용자 메시지는 추가할 때 한 번만 주제 채점)"""
+        message = {
             "role": role,
             "content": content,
             "timestamp": datetime.utcnow().isoformat()
-        })
+        }
+        if role == "user":
+            message["topics"] = score_topics(content)
+        self.messages.append(message)
     
     def get_history(self, limit: int = 10) -> List[Dict]:
         """최근 N개 메시지 조회"""
@@ -80,23 +90,12 @@ class ConversationAnalyzer:
     
     @staticmethod
     def extract_keywords(messages: List[Dict], current_query: str) -> List[str]:
-        """키워드 추출"""
-        keyword_map = {
-            "주거": ["주거", "집", "임대", "전세", "긴급주거비", "공공임대"],
-            "금융": ["금융", "대출", "이자", "상환", "디딤돌", "버팀목", "금리"],
-            "법률": ["법률", "변호사", "소송", "경매", "대항력"],
-            "생계": ["생계", "생활비", "긴급", "복지"],
-            "신청": ["신청", "절차", "서류", "방법"],
-        }
-        
-        all_text = " ".join([m["content"] for m in messages if m["role"] == "user"]) + " " + current_query
-        
-        keywords = []
-        for category, words in keyword_map.items():
-            if any(word in all_text for word in words):
-                keywords.append(category)
-        
-        return keywords
+        """키워드 추출 (메시지별 주제 점수를 합산, 기록을 다시 검사하지 않음)"""
+        scores = TopicScores.combine(
+            m["topics"] if "topics" in m else score_topics(m["content"])
+            for m in messages if m["role"] == "user"
+        )
+        return (scores + score_topics(current_query)).keywords()
     
     @staticmethod
     def detect_specific_focus(query: str) -> str | None:
@@ -106,29 +105,9 @@ class ConversationAnalyzer:
         Returns:
             특정 주제명 (주거, 금융, 법률, 생계) 또는 None
         """
-        query_lower = query.lower()
-        
-        # "주거지원만", "금융만", "주거에 대해서만" 같은 표현 감지
-        focus_patterns = {
-            "주거": ["주거지원", "주거 지원", "주거만", "집", "임대"],
-            "금융": ["금융지원", "금융 지원", "금융만", "대출", "금리"],
-            "법률": ["법률지원", "법률 지원", "법률만", "소송", "변호사"],
-            "생계": ["생계지원", "생계 지원", "생계만", "생활비", "복지"],
-        }
-        
-        # 특정 주제에 대한 자세한 정보 요청 감지
-        detail_keywords = ["자세히", "구체적", "더", "상세히", "대해", "관해"]
-        has_detail_request = any(kw in query_lower for kw in detail_keywords)
-        
-        if has_detail_request:
-            for topic, patterns in focus_patterns.items():
-                if any(pattern in query_lower for pattern in patterns):
-                    # 다른 주제가 언급되지 않았는지 확인
-                    other_topics = [t for t in focus_patterns.keys() if t != topic]
-                    if not any(any(p in query_lower for p in focus_patterns[other]) for other in other_topics):
-                        return topic
-        
-        return None
+        # "주거지원만", "금융만", "주거에 대해서만" 같은 표현 + 상세 요청 표현 감지
+        # (다른 주제가 함께 언급되면 None)
+        return score_topics(query).specific_focus()
     
     @staticmethod
     def is_follow_up(query: str, history: List[Dict]) -> bool:
@@ -149,6 +128,14 @@ class ConversationAnalyzer:
         conversation_memory: ConversationMemory
     ) -> str:
         """대화 이력 기반 RAG 답변 생성"""
+        return "".join(self.stream_answer(query, conversation_memory))
+    
+    def stream_answer(
+        self,
+        query: str,
+        conversation_memory: ConversationMemory
+    ):
+        """대화 이력 기반 RAG 답변을 조각 단위로 생성 (제너레이터)"""
         
         history = conversation_memory.get_history(limit=10)
         context = conversation_memory.get_context()
@@ -168,31 +155,34 @@ class ConversationAnalyzer:
         district = context.get("district", "서울")
         
         try:
-            response = get_rag_response(
+            yield from stream_rag_response(
                 user_situation=diagnosis,
                 user_query=enhanced_query,
-                district=district
+                district=district,
+                focus=focused_topic
             )
             
             links = get_relevant_links(keywords)
             if links:
-                response += "\n\n" + "="*70
-                response += "\n🔗 관련 유용한 링크\n"
-                response += "="*70 + "\n"
-                response += links
+                yield (
+                    "\n\n" + "="*70
+                    + "\n🔗 관련 유용한 링크\n"
+                    + "="*70 + "\n"
+                    + links
+                )
             
             if district and district != "서울":
                 contact_info = get_contact_info_text(district)
                 if contact_info:
-                    response += "\n\n" + "="*70
-                    response += f"\n📞 {district} 연락처\n"
-                    response += "="*70 + "\n"
-                    response += contact_info
-            
-            return response
+                    yield (
+                        "\n\n" + "="*70
+                        + f"\n📞 {district} 연락처\n"
+                        + "="*70 + "\n"
+                        + contact_info
+                    )
             
         except Exception as e:
-            return f"죄송합니다. 답변 생성 중 오류가 발생했습니다: {str(e)}"
+            yield f"죄송합니다. 답변 생성 중 오류가 발생했습니다: {str(e)}"
     
     def _build_prompt(
         self,
@@ -274,20 +264,11 @@ def get_yes_no_input(question: str) -> bool:
 
 def run_diagnosis() -> dict:
     """7개 질문으로 진단"""
-    questions = [
-        ("주택 인도, 전입신고, 확정일자를 모두 갖추셨나요? (임차권 등기 포함)", "요건1_대항력"),
-        ("임대차 보증금이 5억 원 이하인가요?", "요건2_보증금액"),
-        ("집주인의 파산, 경매 등으로 2인 이상 임차인에게 피해가 발생했나요?", "요건3_다수피해"),
-        ("임대인이 보증금을 돌려줄 의사나 능력이 없었다고 의심되나요?", "요건4_사기의도"),
-        ("전세보증금 반환 보증보험에 가입되어 있나요?", "제외_보증보험"),
-        ("소액임차인 최우선변제 제도로 보증금 '전액'을 돌려받을 수 있나요?", "제외_최우선변제"),
-        ("대항력(경매 신청 등)을 통해 보증금 '전액'을 직접 회수할 수 있나요?", "제외_자력회수")
-    ]
     
     user_data = {}
     print("\nAI 붱: 아래 질문에 '예' 또는 '아니오'로 답해주세요.\n")
     
-    for q_text, q_key in questions:
+    for q_text, q_key in DIAGNOSIS_QUESTIONS:
         user_data[q_key] = get_yes_no_input(q_text)
     
     return user_data
@@ -302,6 +283,17 @@ def main():
     memory = ConversationMemory()
     analyzer = ConversationAnalyzer()
     
+    # (선택) 키워드에 없는 위기 표현은 RAG 엔진의 임베딩 모델(질의 캐시 공유)로 2차 감지
+    # CRISIS_SEMANTIC=1일 때만 사용하며, 상담을 끝내지 않고 상담전화 안내만 덧붙임
+    warm_up_steps = []
+    if SEMANTIC_CRISIS_ENABLED:
+        engine = get_engine()
+        crisis_detector = enable_semantic_crisis_detection(engine.embed_query, engine.embed_queries)
+        warm_up_steps.append(crisis_detector.warm_up)
+    
+    # 진단 질문이 진행되는 동안 위기 감지기와 RAG 엔진을 미리 로드
+    warm_up_in_background(*warm_up_steps)
+    
     print_separator()
     print("🏠 전세사기 피해자 지원 통합 상담 시스템")
     print_separator()
@@ -327,8 +319,11 @@ def main():
     user_data = run_diagnosis()
     
     # 4. 진단 결과
-    diagnosis_result = determine_victim_status(user_data)
+    explanation = explain_victim_status(user_data)
+    diagnosis_result = explanation["result"]
     print(f"\n📊 [진단 결과] 붱의 판단: {diagnosis_result}")
+    if explanation["unmet"]:
+        print(format_explanation(explanation, include_result=False))
     
     # 5. 자치구 입력 (대화 기록에도 저장)
     print_separator()
@@ -357,25 +352,34 @@ def main():
     print_separator()
     print("\n💭 현재 상황을 분석하고 있습니다...\n")
     
-    initial_query = "나는 이제 뭘해야돼? 받을 수 있는 지원이 뭐가 있어?"
+    initial_query = INITIAL_GUIDANCE_QUERY
     
     try:
-        initial_response = get_rag_response(
-            user_situation=diagnosis_result,
-            user_query=initial_query,
-            district=district
-        )
-        
-        # 초기 안내 메시지 저장
-        memory.add_message("assistant", initial_response)
-        
-        # 출력
+        # 출력 (토큰이 도착하는 대로 바로 출력)
         print_separator()
         print("📝 현재 상황 안내")
         print_separator()
-        print(initial_response)
+        
+        # 사전 생성된 답변이 있으면 RAG 호출 없이 바로 출력
+        precomputed = get_precomputed_answer(diagnosis_result, district, initial_query)
+        if precomputed is not None:
+            print(precomputed)
+            chunks = [precomputed]
+        else:
+            chunks = []
+            for chunk in stream_rag_response(
+                user_situation=diagnosis_result,
+                user_query=initial_query,
+                district=district
+            ):
+                print(chunk, end="", flush=True)
+                chunks.append(chunk)
+            print()
         print_separator()
         
+        # 초기 안내 메시지 저장
+        memory.add_message("assistant", "".join(chunks))
+        
     except Exception as e:
         print(f"\n❌ 오류 발생: {e}")
         print("연락처를 통해 직접 상담받으시길 권장합니다.")
@@ -410,6 +414,8 @@ def main():
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
             """)
             break
+        if crisis_check.get("crisis_notice"):
+            print(CRISIS_NOTICE)
         
         # 사용자 메시지 저장
         memory.add_message("user", user_query)
@@ -418,16 +424,20 @@ def main():
         print("\n💭 답변을 생성 중입니다...")
         
         try:
-            response = analyzer.generate_answer(user_query, memory)
-            memory.add_message("assistant", response)
-            
-            # 답변 출력
+            # 답변 출력 (토큰이 도착하는 대로 바로 출력)
             print_separator()
             print("📝 답변")
             print_separator()
-            print(response)
+            
+            chunks = []
+            for chunk in analyzer.stream_answer(user_query, memory):
+                print(chunk, end="", flush=True)
+                chunks.append(chunk)
+            print()
             print_separator()
             
+            memory.add_message("assistant", "".join(chunks))
+            
             question_count += 1
             
             print("\n💬 추가로 궁금하신 점이 있으신가요?")
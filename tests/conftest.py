@@ -0,0 +1,44 @@
+# tests/conftest.py
+# main.py처럼 각 모듈 폴더를 import 경로에 추가 (모듈들은 상대 import 실패 시 같은 폴더 import로 동작)
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for folder in ("classifier", "rag_engine", "risk_analyzer"):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# 상대 import만 쓰는 모듈(rag_engine.run_chain 등)은 main.py처럼 패키지 경로로 import
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+
+import pytest
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    """서울시 API 스텁 서버에 연결된 seoul_api_client / async_fetcher (빠른 재시도, 한도 없음, 임시 캐시)"""
+    import async_fetcher
+    import seoul_api_client
+    from response_cache import ResponseCache
+    from seoul_stub import StubApi, start_stub
+
+    api = StubApi()
+    server = start_stub(api)
+    limiter = seoul_api_client.RateLimiter(max_per_second=0, daily_quota=0)
+
+    monkeypatch.setattr(seoul_api_client, "SEOUL_API_BASE", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(seoul_api_client, "BACKOFF_FACTOR", 0.01)
+    monkeypatch.setattr(seoul_api_client, "MAX_RETRIES", 2)
+    monkeypatch.setattr(seoul_api_client, "_SESSION", None)
+    monkeypatch.setattr(seoul_api_client, "RATE_LIMITER", limiter)
+    monkeypatch.setattr(seoul_api_client, "RESPONSE_CACHE", ResponseCache(str(tmp_path / "cache"), ttl=3600, stale=0))
+    monkeypatch.setattr(async_fetcher, "BACKOFF_FACTOR", 0.01)
+    monkeypatch.setattr(async_fetcher, "MAX_RETRIES", 2)
+    monkeypatch.setattr(async_fetcher, "RATE_LIMITER", limiter)
+    yield api
+    server.shutdown()
+    server.server_close()
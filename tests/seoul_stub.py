@@ -0,0 +1,88 @@
+# tests/seoul_stub.py
+# 서울시 실거래가 API 스텁 서버 (test_seoul_api_client.py, test_async_fetcher.py, test_transaction_store.py 공용)
+import http.server
+import socketserver
+import threading
+import time
+from urllib.parse import unquote
+
+
+ROW = (
+    "<row><RCPT_YR>{year}</RCPT_YR><CGG_CD>{cgg_cd}</CGG_CD><CGG_NM>중구</CGG_NM><STDG_NM>신당동</STDG_NM>"
+    "<CTRT_DAY>202503{day:02d}</CTRT_DAY><THING_AMT>{amount}</THING_AMT><ARCH_AREA>59.5</ARCH_AREA>"
+    "<BLDG_USG>아파트</BLDG_USG></row>"
+)
+
+
+def page_xml(count: int, code: str = "INFO-000", total: int = None, first: int = 0,
+             year: str = "2025", cgg_cd: str = "11140") -> bytes:
+    """정상 행 count개 (거래금액 30000 + 행 번호)를 담은 응답 본문"""
+    rows = "".join(
+        ROW.format(year=year, cgg_cd=cgg_cd, day=i % 28 + 1, amount=30000 + i)
+        for i in range(first, first + count)
+    )
+    return (
+        f"<tbLnOpendataRtmsV><list_total_count>{count if total is None else total}</list_total_count>"
+        f"<RESULT><CODE>{code}</CODE><MESSAGE>메시지</MESSAGE></RESULT>{rows}</tbLnOpendataRtmsV>"
+    ).encode("utf-8")
+
+
+class StubApi:
+    """
+    응답 순서를 지정할 수 있는 스텁
+
+    responses에 (상태 코드, 본문)을 넣으면 순서대로 돌려주고, 비어 있으면 경로의
+    시작/끝 위치와 total로 정상 페이지를 만듭니다.
+    """
+
+    def __init__(self, total: int = 3):
+        self.total = total
+        self.delay = 0.0
+        self.responses = []
+        self.paths = []
+        self.connections = set()
+        self.lock = threading.Lock()
+
+    def respond(self, path: str, client_address) -> tuple:
+        with self.lock:
+            self.paths.append(unquote(path))
+            self.connections.add(client_address)
+            queued = self.responses.pop(0) if self.responses else None
+        if self.delay:
+            time.sleep(self.delay)
+        if queued is not None:
+            return queued
+        parts = unquote(path).strip("/").split("/")
+        start, end = int(parts[3]), int(parts[4])
+        year, cgg_cd = (parts[5], parts[6]) if len(parts) >= 7 else ("2025", "11140")
+        count = max(0, min(end, self.total) - start + 1)
+        return 200, page_xml(count, total=self.total, first=start - 1, year=year, cgg_cd=cgg_cd)
+
+    @property
+    def hits(self) -> int:
+        return len(self.paths)
+
+
+def start_stub(api: StubApi):
+    """api로 응답하는 HTTP 서버를 백그라운드 스레드에서 시작하고 서버를 반환합니다."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            status, body = api.respond(self.path, self.client_address)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    class Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+        daemon_threads = True
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    return server
@@ -0,0 +1,136 @@
+# tests/test_answer_cache.py
+import numpy as np
+import pytest
+
+import answer_cache
+from answer_cache import AnswerCache, normalize_query
+
+
+SITUATION = "피해자 요건 충족"
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(answer_cache.time, "monotonic", fake)
+    return fake
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+# --- 정확 일치 ---
+
+def test_exact_hit_ignores_punctuation_and_spacing():
+    cache = AnswerCache()
+    cache.put(SITUATION, "나는 이제 뭘 해야 돼?", "중구", "답변")
+
+    assert cache.get(SITUATION, "  나는 이제 뭘 해야 돼 !! ", "중구") == "답변"
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_exact_key_includes_situation_district_and_focus():
+    cache = AnswerCache()
+    cache.put(SITUATION, "질문", "중구", "답변", focus="금융")
+
+    assert cache.get("피해자 요건 미충족", "질문", "중구", focus="금융") is None
+    assert cache.get(SITUATION, "질문", "강남구", focus="금융") is None
+    assert cache.get(SITUATION, "질문", "중구") is None
+    assert cache.get(SITUATION, "질문", "중구", focus="금융") == "답변"
+
+
+def test_normalize_query():
+    assert normalize_query("나는 이제 뭘해야돼?  ") == "나는 이제 뭘해야돼"
+    assert normalize_query("ＡＢＣ  (특별법)") == "abc 특별법"
+
+
+# --- 의미 유사 ---
+
+def test_semantic_tier_is_off_by_default():
+    cache = AnswerCache()
+    cache.put(SITUATION, "질문 A", "중구", "답변 A", query_vector=unit(1, 0))
+
+    assert not cache.semantic_enabled
+    assert cache.get(SITUATION, "질문 B", "중구", query_vector=unit(1, 0)) is None
+
+
+def test_semantic_hit_above_threshold():
+    cache = AnswerCache(similarity_threshold=0.9)
+    cache.put(SITUATION, "보증금 어떻게 돌려받나요", "중구", "답변", query_vector=unit(1, 0.1))
+
+    assert cache.get(SITUATION, "보증금 돌려받는 방법", "중구", query_vector=unit(1, 0.15)) == "답변"
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_semantic_miss_below_threshold():
+    cache = AnswerCache(similarity_threshold=0.9)
+    cache.put(SITUATION, "보증금 어떻게 돌려받나요", "중구", "답변", query_vector=unit(1, 0))
+
+    assert cache.get(SITUATION, "경매 절차가 궁금해요", "중구", query_vector=unit(1, 1)) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_semantic_lookup_stays_within_bucket():
+    cache = AnswerCache(similarity_threshold=0.9)
+    cache.put(SITUATION, "질문", "중구", "중구 답변", query_vector=unit(1, 0))
+
+    assert cache.get(SITUATION, "다른 표현의 질문", "강남구", query_vector=unit(1, 0)) is None
+
+
+# --- TTL / LRU / 인덱스 버전 ---
+
+def test_ttl_expiry(clock):
+    cache = AnswerCache(ttl=60, similarity_threshold=0.9)
+    cache.put(SITUATION, "질문", "중구", "답변", query_vector=unit(1, 0))
+
+    clock.now += 59
+    assert cache.get(SITUATION, "질문", "중구") == "답변"
+
+    clock.now += 2
+    assert cache.get(SITUATION, "질문", "중구") is None
+    assert cache.get(SITUATION, "비슷한 질문", "중구", query_vector=unit(1, 0)) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = AnswerCache(max_entries=2)
+    cache.put(SITUATION, "질문 1", "중구", "답변 1")
+    cache.put(SITUATION, "질문 2", "중구", "답변 2")
+    assert cache.get(SITUATION, "질문 1", "중구") == "답변 1"  # 질문 1을 최근 사용으로
+
+    cache.put(SITUATION, "질문 3", "중구", "답변 3")
+
+    assert cache.get(SITUATION, "질문 2", "중구") is None
+    assert cache.get(SITUATION, "질문 1", "중구") == "답변 1"
+    assert cache.get(SITUATION, "질문 3", "중구") == "답변 3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_evicted_entry_leaves_semantic_bucket():
+    cache = AnswerCache(max_entries=1, similarity_threshold=0.9)
+    cache.put(SITUATION, "질문 1", "중구", "답변 1", query_vector=unit(1, 0))
+    cache.put(SITUATION, "질문 2", "중구", "답변 2", query_vector=unit(0, 1))
+
+    assert cache.get(SITUATION, "질문 1과 비슷", "중구", query_vector=unit(1, 0)) is None
+    assert cache.get(SITUATION, "질문 2와 비슷", "중구", query_vector=unit(0, 1)) == "답변 2"
+
+
+def test_index_version_change_invalidates_everything():
+    cache = AnswerCache(similarity_threshold=0.9)
+    cache.put(SITUATION, "질문", "중구", "답변", query_vector=unit(1, 0), index_version="v1")
+    assert cache.get(SITUATION, "질문", "중구", index_version="v1") == "답변"
+
+    assert cache.get(SITUATION, "질문", "중구", index_version="v2") is None
+    assert cache.get(SITUATION, "비슷한 질문", "중구", query_vector=unit(1, 0), index_version="v2") is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,97 @@
+# tests/test_async_fetcher.py
+import asyncio
+
+import pytest
+
+import async_fetcher
+from async_fetcher import PageFetchError, PartitionFetcher, create_client, fetch_page, fetch_partition_async
+from transaction_store import TransactionStore, sync_transactions
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def fetch_one_page(start: int = 1, end: int = 1000):
+    async with create_client(2) as client:
+        return await fetch_page(client, "11140", "2025", start, end)
+
+
+def test_partition_fetches_all_pages(stub):
+    stub.total = 2500
+
+    total, records = run(fetch_partition_async("11140", "2025", concurrency=2))
+
+    assert total == 2500
+    assert sorted(r.thing_amt for r in records) == list(range(30000, 32500))
+    assert stub.hits == 3
+
+
+def test_each_retry_consumes_one_quota_unit(stub):
+    stub.responses = [(503, b""), (502, b"")]
+
+    total, records = run(fetch_one_page())
+
+    assert total == 3 and len(records) == 3
+    assert stub.hits == 3
+    assert async_fetcher.RATE_LIMITER.used_today == 3
+
+
+def test_retries_stop_when_quota_runs_out(stub):
+    async_fetcher.RATE_LIMITER.daily_quota = 2
+    stub.responses = [(503, b"")] * 3
+
+    with pytest.raises(PageFetchError, match="한도"):
+        run(fetch_one_page())
+    assert stub.hits == 2
+
+
+def test_gives_up_after_max_retries(stub):
+    stub.responses = [(503, b"")] * 3
+
+    with pytest.raises(PageFetchError):
+        run(fetch_one_page())
+    assert stub.hits == 3
+
+
+def test_quota_exhausted_raises_without_request(stub):
+    async_fetcher.RATE_LIMITER.mark_exhausted()
+
+    with pytest.raises(PageFetchError):
+        run(fetch_one_page())
+    assert stub.hits == 0
+
+
+def test_partition_fetcher_reuses_one_client(stub):
+    stub.total = 2500
+
+    with PartitionFetcher(concurrency=2) as fetcher:
+        first = fetcher.fetch("11140", "2025")
+        second = fetcher.fetch("11110", "2024")
+
+    assert first[0] == second[0] == 2500
+    assert {r.cgg_cd for r in second[1]} == {"11110"}
+    # 파티션마다 클라이언트를 새로 만들면 연결이 동시 요청 수(2)보다 많아짐
+    assert stub.hits == 6
+    assert len(stub.connections) <= 2
+
+
+def test_partition_fetcher_returns_none_when_a_page_fails(stub):
+    stub.total = 2500
+    first_page = (2500, [])
+    stub.responses = [(404, b"")]
+
+    with PartitionFetcher(concurrency=1) as fetcher:
+        assert fetcher.fetch("11140", "2025", first_page) is None
+        # 실패 후에도 같은 fetcher로 계속 사용 가능
+        assert fetcher.fetch("11140", "2025", first_page)[0] == 2500
+
+
+def test_sync_transactions_concurrent(stub, tmp_path):
+    stub.total = 2100
+    store = TransactionStore(str(tmp_path / "tx.sqlite3"))
+
+    summary = sync_transactions(["2025"], ["중구", "종로구"], store=store, concurrency=3)
+
+    assert summary == {"updated": 2, "skipped": 0, "failed": 0, "rows": 4200}
+    assert store.sync_state("11110", "2025")["total_count"] == 2100
@@ -0,0 +1,143 @@
+# tests/test_comparables.py
+from datetime import date
+
+import numpy as np
+import pytest
+
+from comparables import ComparableQuery, ComparableStats, ComparablesFrame, market_stats, months_ago
+
+
+def row(dong="신당동", usage="아파트", day=20250310, amount=30000, area=59.0, cancelled=""):
+    """COLUMNS 순서의 행 (cgg_cd, stdg_nm, bldg_usg, ctrt_day, thing_amt, arch_area, rtrcn_day)"""
+    return (11140, dong, usage, day, amount, area, cancelled)
+
+
+QUERY = ComparableQuery(stdg_nm="신당동", area=59.0, bldg_usg="아파트", ctrt_from="20250101", price=30000)
+
+# 조건을 하나씩 풀 때마다 비교 사례가 한 건씩 늘어나도록 만든 거래
+RELAX_ROWS = [
+    row(),                                                  # 모든 조건 만족
+    row(area=120.0),                                        # 면적만 다름
+    row(area=120.0, usage="연립다세대"),                     # + 건물용도
+    row(area=120.0, usage="연립다세대", dong="황학동"),       # + 법정동
+    row(area=120.0, usage="연립다세대", dong="황학동", day=20230310),  # + 계약일
+    row(area=120.0, usage="연립다세대", dong="황학동", day=20230310, amount=90000),  # + 보증금
+]
+
+
+# --- select: 조건 완화 순서 ---
+
+@pytest.mark.parametrize("min_count, relaxed", [
+    (1, ()),
+    (2, ("area",)),
+    (3, ("area", "bldg_usg")),
+    (4, ("area", "bldg_usg", "stdg_nm")),
+    (5, ("area", "bldg_usg", "stdg_nm", "ctrt_from")),
+    (6, ("area", "bldg_usg", "stdg_nm", "ctrt_from", "price")),
+])
+def test_select_relaxes_conditions_in_order(min_count, relaxed):
+    frame = ComparablesFrame.from_rows(RELAX_ROWS)
+
+    mask, applied = frame.select(QUERY, min_count=min_count)
+
+    assert int(mask.sum()) == min_count
+    for field in ("area", "bldg_usg", "stdg_nm", "ctrt_from", "price"):
+        assert (getattr(applied, field) is None) == (field in relaxed), field
+
+
+def test_select_skips_conditions_that_are_not_set():
+    frame = ComparablesFrame.from_rows(RELAX_ROWS)
+    query = ComparableQuery(stdg_nm="신당동", price=30000)
+
+    mask, applied = frame.select(query, min_count=4)
+
+    # 면적/건물용도/계약일은 처음부터 없으므로 법정동 다음에 보증금을 풂
+    assert int(mask.sum()) == 5
+    assert applied.stdg_nm is None and applied.price == 30000
+
+
+def test_select_gives_up_after_relaxing_everything():
+    frame = ComparablesFrame.from_rows(RELAX_ROWS)
+
+    mask, applied = frame.select(QUERY, min_count=100)
+
+    assert int(mask.sum()) == len(RELAX_ROWS)
+    assert applied == ComparableQuery(area_band=QUERY.area_band, price_band=QUERY.price_band)
+
+
+def test_mask_excludes_cancelled_and_unpriced_rows():
+    frame = ComparablesFrame.from_rows([row(), row(cancelled="20250401"), row(amount=0)])
+
+    assert frame.mask(ComparableQuery()).tolist() == [True, False, False]
+    assert frame.mask(ComparableQuery(include_cancelled=True)).tolist() == [True, True, False]
+
+
+# --- stats: 빈 프레임 / 퇴화한 경우 ---
+
+def test_stats_on_empty_frame():
+    frame = ComparablesFrame.from_rows([])
+
+    assert len(frame) == 0
+    assert frame.stats() == ComparableStats.empty()
+    assert frame.recent_count() == 0
+    assert market_stats(frame) == {"평균거래가": 0, "거래량": 0, "시장과열도": "보통"}
+
+
+def test_stats_with_empty_mask_or_only_unpriced_rows():
+    frame = ComparablesFrame.from_rows([row(amount=0), row(amount=0)])
+
+    assert frame.stats() == ComparableStats.empty()
+    assert frame.stats(np.zeros(len(frame), dtype=bool)) == ComparableStats.empty()
+
+
+def test_stats_on_single_row():
+    stats = ComparablesFrame.from_rows([row(amount=30000)]).stats()
+
+    assert stats.count == 1
+    assert stats.mean == stats.median == 30000
+    assert set(stats.percentiles.values()) == {30000}
+    assert stats.trend_per_month == 0.0 and stats.trend_pct_per_year == 0.0
+    assert stats.latest_day == "20250310"
+
+
+def test_stats_trend_is_zero_when_all_contracts_share_a_day():
+    frame = ComparablesFrame.from_rows([row(amount=a) for a in (10000, 20000, 30000, 40000)])
+
+    stats = frame.stats()
+
+    assert stats.trend_per_month == 0.0
+    assert stats.median == 25000
+
+
+def test_stats_without_contract_days():
+    frame = ComparablesFrame.from_rows([row(day="", amount=a) for a in (10000, 20000, 30000)])
+
+    stats = frame.stats()
+
+    assert stats.count == 3
+    assert stats.trend_per_month == 0.0
+    assert stats.latest_day is None
+    assert frame.recent_count() == 0
+
+
+def test_stats_trend_follows_contract_month():
+    days = [20250110, 20250210, 20250310, 20250410]
+    frame = ComparablesFrame.from_rows([row(day=d, amount=30000 + 100 * i) for i, d in enumerate(days)])
+
+    stats = frame.stats()
+
+    assert stats.trend_per_month == pytest.approx(100, rel=0.05)
+    assert stats.latest_day == "20250410"
+
+
+# --- 계약일 구간 ---
+
+@pytest.mark.parametrize("today, months, expected", [
+    (date(2025, 6, 15), 12, "20240615"),
+    (date(2025, 1, 15), 1, "20241215"),
+    (date(2025, 3, 31), 1, "20250228"),
+    (date(2024, 2, 29), 12, "20230228"),
+    (date(2025, 6, 15), 0, "20250615"),
+])
+def test_months_ago(today, months, expected):
+    assert months_ago(months, today) == expected
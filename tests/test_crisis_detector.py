@@ -0,0 +1,163 @@
+# tests/test_crisis_detector.py
+import os
+
+import numpy as np
+import pytest
+
+from crisis_detector import CRISIS_EXEMPLARS, NORMAL_EXEMPLARS, SemanticCrisisDetector
+
+
+# 예시 문장에 없는 바꿔 말한 위기 표현
+PARAPHRASED_CRISIS = [
+    "그냥 다 끝내 버리고 싶어요",
+    "이제 살아갈 이유가 없는 것 같아요",
+    "어디론가 사라지고 싶다는 생각뿐이에요",
+    "죽으면 이 고통도 끝나겠죠",
+    "더는 버틸 힘도 희망도 없어요",
+    "가족들한테 마지막으로 편지를 썼어요",
+]
+
+# 위기로 판단하면 안 되는 일반 상담 메시지
+NEGATIVES = [
+    "보증금 반환 소송은 어떻게 하나요?",
+    "집주인이 경매를 신청했다고 들었어요",
+    "전세 대출 연장이 가능한지 궁금해요",
+    "피해자 결정 신청 서류가 뭐가 필요해요?",
+    "이사 비용 지원을 받을 수 있을까요?",
+    "억울해서 잠이 안 와요",
+]
+
+
+class ConceptEmbeddings:
+    """단어 → 개념 축으로 바꾸는 결정적 임베딩 (모델 없이 보정 로직만 검증)"""
+
+    CONCEPTS = [
+        ("죽", "목숨", "끝내", "끝나", "유서", "마지막", "편지"),
+        ("희망", "살아갈", "살아야", "살아서", "이유", "자신이 없", "버틸"),
+        ("사라지", "사라져", "없어지", "떠나", "깨어나", "내려놓"),
+        ("약을", "옥상"),
+        ("보증금", "대출", "돈", "금리", "지원", "비용", "서류", "신청"),
+        ("집주인", "경매", "이사", "변호사", "소송", "연락"),
+        ("화가", "억울", "스트레스", "힘들", "잠이"),
+    ]
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text: str) -> list:
+        self.calls += 1
+        vector = np.zeros(len(self.CONCEPTS) + 1, dtype=np.float32)
+        vector[-1] = 0.3  # 개념 단어가 없는 문장도 0 벡터가 되지 않도록
+        for axis, words in enumerate(self.CONCEPTS):
+            vector[axis] = sum(word in text for word in words)
+        return vector.tolist()
+
+
+def test_warm_up_embeds_exemplars_once():
+    embed = ConceptEmbeddings()
+    detector = SemanticCrisisDetector(embed).warm_up()
+    exemplar_count = sum(len(v) for v in CRISIS_EXEMPLARS.values()) + len(NORMAL_EXEMPLARS)
+    assert embed.calls == exemplar_count
+
+    detector.detect("전세 사기를 당했어요")
+    assert embed.calls == exemplar_count + 1
+
+
+def test_paraphrased_crisis_recall_and_no_false_positives():
+    detector = SemanticCrisisDetector(ConceptEmbeddings()).warm_up()
+
+    assert all(detector.detect(text)["status"] == "crisis" for text in PARAPHRASED_CRISIS)
+    assert all(detector.detect(text)["status"] == "normal" for text in NEGATIVES)
+
+
+def test_overlapping_exemplars_keep_recall():
+    # 일반 예시 하나가 대부분의 위기 예시보다 높은 점수를 받는 경우에도 임계값이 위기 예시를 놓치지 않아야 함
+    vectors = {
+        "위기1": [1.0, 0.0, 0.2], "위기2": [1.0, 0.1, 0.3], "위기3": [1.0, 0.2, 0.4], "위기4": [0.9, 0.0, 0.5],
+        "일반1": [0.0, 1.0, 0.0], "일반2": [0.1, 1.0, 0.1], "겹침": [1.0, 0.0, 0.25],
+    }
+    detector = SemanticCrisisDetector(
+        lambda text: vectors[text],
+        exemplars={"위기": ["위기1", "위기2", "위기3", "위기4"]},
+        normal_exemplars=["일반1", "일반2", "겹침"],
+    ).warm_up()
+
+    calibration = detector.calibration
+    assert calibration["max_normal_score"] >= calibration["min_crisis_score"]
+    assert calibration["exemplar_recall"] >= 0.75
+    assert calibration["normal_false_positive_rate"] <= 1 / 3
+    assert detector.detect("일반1", vector=vectors["일반1"])["status"] == "normal"
+
+
+def test_explicit_threshold_overrides_calibration(monkeypatch):
+    monkeypatch.setenv("CRISIS_SEMANTIC_THRESHOLD", "0.99")
+    detector = SemanticCrisisDetector(ConceptEmbeddings()).warm_up()
+    assert detector.threshold == 0.99
+    assert detector.detect("억울해서 죽을 것 같아요")["status"] == "normal"
+
+
+# --- 실제 임베딩 모델 보정 (RAG 엔진과 같은 모델, 한국어 문장) ---
+# 로컬에서는 모델이 캐시에 없으면 건너뛰고, CI(CI 환경 변수)에서는 모델을 받아 반드시 실행
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"  # rag_engine/embedding_service.py와 같은 모델
+
+# 상담 중 흔한 충격/혼란/일반 메시지 (2차 감지가 안내를 띄우면 안 됨)
+KOREAN_NORMAL = NEGATIVES + [
+    "갑자기 집주인이 잠적해서 멘붕이에요",
+    "오늘 경매 통지서를 받았는데 어떡해요",
+    "뭐부터 해야 할지 하나도 모르겠어요",
+    "서류가 너무 복잡해서 머리가 아파요",
+    "보증금을 못 돌려받으면 끝장이에요",
+    "이러다 길바닥에 나앉게 생겼어요",
+]
+
+KOREAN_CRISIS = PARAPHRASED_CRISIS + [
+    "이제 그만 살고 싶어요",
+    "내가 없어지면 다들 편해질 거예요",
+]
+
+
+@pytest.fixture(scope="module")
+def minilm():
+    in_ci = bool(os.getenv("CI"))
+    try:
+        import sentence_transformers
+        model = sentence_transformers.SentenceTransformer(MODEL_NAME, device="cpu", local_files_only=not in_ci)
+    except Exception as e:
+        if in_ci:
+            pytest.fail(f"CI에서 임베딩 모델을 불러올 수 없음: {e}")
+        pytest.skip(f"임베딩 모델을 불러올 수 없음: {e}")
+    return model
+
+
+@pytest.fixture(scope="module")
+def minilm_detector(minilm):
+    return SemanticCrisisDetector(
+        lambda text: minilm.encode(text),
+        lambda texts: minilm.encode(list(texts))
+    ).warm_up()
+
+
+def test_minilm_korean_calibration_has_no_false_positives(minilm_detector):
+    results = minilm_detector.detect_batch(KOREAN_NORMAL)
+
+    false_positives = [t for t, r in zip(KOREAN_NORMAL, results) if r["status"] == "crisis"]
+    assert false_positives == [], minilm_detector.calibration
+
+
+def test_minilm_korean_crisis_recall(minilm_detector):
+    results = minilm_detector.detect_batch(KOREAN_CRISIS)
+
+    recall = np.mean([r["status"] == "crisis" for r in results])
+    assert recall >= 0.5, (recall, minilm_detector.calibration)
+
+
+def test_minilm_notice_never_changes_keyword_status(minilm_detector, monkeypatch):
+    import classifier_logic
+    monkeypatch.setattr(classifier_logic, "CRISIS_DETECTOR", minilm_detector)
+    texts = KOREAN_NORMAL + KOREAN_CRISIS
+
+    results = classifier_logic.analyze_user_queries(texts)
+
+    keyword_only = classifier_logic.EMOTION_MATCHER.classify_batch(texts)
+    assert [r["status"] for r in results] == [r["status"] for r in keyword_only]
@@ -0,0 +1,175 @@
+# tests/test_keyword_matcher.py
+import pytest
+
+import classifier_logic
+from keyword_matcher import AhoCorasick, KeywordMatcher
+
+
+LEXICON = {
+    "crisis": ["죽고 싶다", "죽고싶", "자살"],
+    "shock": ["갑자기", "큰일났다"],
+    "confused": ["모르겠어", "어디서부터"],
+}
+
+
+@pytest.fixture
+def matcher():
+    return KeywordMatcher(LEXICON)
+
+
+def spans(matches):
+    return [(m.status, m.keyword, m.start, m.end) for m in matches]
+
+
+# --- 오토마톤 ---
+
+def test_automaton_reports_overlapping_and_nested_patterns():
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+
+    found = [(end, automaton.patterns[i]) for end, i in automaton.iter_matches("ushers")]
+
+    # "she"와 접미사 "he"가 같은 위치에서 끝나고, "hers"는 그 뒤에서 겹쳐서 일치
+    assert sorted(found) == [(4, "he"), (4, "she"), (6, "hers")]
+
+
+# --- 일치 위치 / 띄어쓰기 정규화 ---
+
+def test_overlapping_keywords_are_all_reported(matcher):
+    matches = matcher.find_all("죽고싶다")
+
+    # "죽고 싶다"(정규화하면 "죽고싶다")와 그 접두사 "죽고싶"이 모두 일치
+    assert spans(matches) == [("crisis", "죽고싶", 0, 3), ("crisis", "죽고 싶다", 0, 4)]
+
+
+def test_offsets_refer_to_original_text_with_spaces(matcher):
+    text = "집이  갑자기 경매에 넘어가서 죽 고 싶 다"
+
+    matches = matcher.find_all(text)
+
+    assert ("shock", "갑자기", 4, 7) in spans(matches)
+    crisis = [m for m in matches if m.keyword == "죽고 싶다"]
+    assert len(crisis) == 1
+    assert text[crisis[0].start:crisis[0].end] == "죽 고 싶 다"
+
+
+@pytest.mark.parametrize("text", ["죽고 싶다", "죽고싶다", "죽 고 싶 다", "  죽고   싶다  "])
+def test_spacing_variants_match_the_same_keyword(matcher, text):
+    assert matcher.classify(text)["status"] == "crisis"
+
+
+def test_no_match_is_normal(matcher):
+    assert matcher.classify("보증금을 돌려받고 싶어요") == {"status": "normal", "matches": []}
+    assert matcher.classify("") == {"status": "normal", "matches": []}
+
+
+# --- 우선순위 ---
+
+@pytest.mark.parametrize("text, status, keyword", [
+    ("어디서부터 해야 할지 모르겠어 갑자기 죽고 싶다", "crisis", "죽고 싶다"),
+    ("모르겠어, 갑자기 큰일났다", "shock", "갑자기"),
+    ("어디서부터 모르겠어", "confused", "모르겠어"),
+])
+def test_priority_is_crisis_then_shock_then_confused(matcher, text, status, keyword):
+    result = matcher.classify(text)
+
+    assert (result["status"], result["keyword"]) == (status, keyword)
+
+
+def test_keyword_order_breaks_ties_within_a_status():
+    # 문장에서 뒤에 나오더라도 목록에서 앞선 키워드를 대표 키워드로 사용
+    matcher = KeywordMatcher({"shock": ["큰일났다", "갑자기"]})
+
+    assert matcher.classify("갑자기 큰일났다")["keyword"] == "큰일났다"
+
+
+def test_duplicate_keywords_use_the_first_rank():
+    matcher = KeywordMatcher({"crisis": ["자살", "극단적", "자살"]})
+
+    result = matcher.classify("극단적인 생각, 자살")
+
+    assert result["keyword"] == "자살"
+    assert len(result["matches"]) == 3  # 중복 키워드는 항목마다 보고
+
+
+# --- 대화 기록 일괄 검사 ---
+
+TRANSCRIPT = ["안녕하세요", "갑자기 경매 통지가 왔어요", "죽고 싶다", "", "서류가 뭐가 필요한지 모르겠어"]
+
+
+def test_classify_batch_matches_classify(matcher):
+    assert matcher.classify_batch(TRANSCRIPT) == [matcher.classify(text) for text in TRANSCRIPT]
+
+
+class FakeDetector:
+    """detect_batch 호출을 기록하고, 문장에 '사라지'가 있으면 위기로 판정"""
+
+    def __init__(self, error: Exception = None):
+        self.batches = []
+        self.error = error
+
+    def _result(self, text):
+        crisis = "사라지" in text
+        return {"status": "crisis" if crisis else "normal", "score": 0.9 if crisis else 0.1}
+
+    def detect(self, text):
+        return self.detect_batch([text])[0]
+
+    def detect_batch(self, texts):
+        self.batches.append(list(texts))
+        if self.error:
+            raise self.error
+        return [self._result(text) for text in texts]
+
+
+def test_analyze_user_queries_without_semantic_stage(monkeypatch):
+    monkeypatch.setattr(classifier_logic, "CRISIS_DETECTOR", None)
+
+    results = classifier_logic.analyze_user_queries(TRANSCRIPT)
+
+    assert results == classifier_logic.EMOTION_MATCHER.classify_batch(TRANSCRIPT)
+    assert [r["status"] for r in results] == ["normal", "shock", "crisis", "normal", "confused"]
+
+
+def test_analyze_user_queries_embeds_pending_messages_in_one_batch(monkeypatch):
+    detector = FakeDetector()
+    monkeypatch.setattr(classifier_logic, "CRISIS_DETECTOR", detector)
+    texts = TRANSCRIPT + ["그냥 사라지고 싶어요"]
+
+    results = classifier_logic.analyze_user_queries(texts)
+
+    # 키워드로 이미 위기인 메시지와 빈 메시지는 임베딩하지 않음
+    assert detector.batches == [[t for t in texts if t and t != "죽고 싶다"]]
+    assert results == [classifier_logic.analyze_user_query(text) for text in texts]
+    assert "semantic" not in results[2] and "semantic" not in results[3]
+    assert results[-1]["semantic"]["status"] == "crisis"
+
+
+def test_semantic_stage_only_adds_notice(monkeypatch):
+    monkeypatch.setattr(classifier_logic, "CRISIS_DETECTOR", FakeDetector())
+
+    shock, confused, normal = classifier_logic.analyze_user_queries(
+        ["갑자기 다 사라지고 싶어요", "사라지고 싶은데 뭐부터 해야 돼", "그냥 사라지고 싶어요"]
+    )
+
+    # 임베딩 감지는 키워드 판정을 덮어쓰지 않고 안내 여부만 표시
+    assert (shock["status"], shock["keyword"], shock["crisis_notice"]) == ("shock", "갑자기", True)
+    assert (confused["status"], confused["crisis_notice"]) == ("confused", True)
+    assert (normal["status"], normal["crisis_notice"]) == ("normal", True)
+    assert classifier_logic.analyze_user_query("보증금 반환 소송")["crisis_notice"] is False
+
+
+def test_semantic_notice_does_not_end_initial_conversation(monkeypatch, capsys):
+    monkeypatch.setattr(classifier_logic, "CRISIS_DETECTOR", FakeDetector())
+
+    result = classifier_logic.start_initial_conversation("전세금을 잃고 그냥 사라지고 싶어요")
+
+    assert result["status"] == "normal"
+    assert "1393" in capsys.readouterr().out
+
+
+def test_analyze_user_queries_falls_back_to_keywords_on_embedding_error(monkeypatch):
+    monkeypatch.setattr(classifier_logic, "CRISIS_DETECTOR", FakeDetector(RuntimeError("no model")))
+
+    results = classifier_logic.analyze_user_queries(TRANSCRIPT)
+
+    assert results == classifier_logic.EMOTION_MATCHER.classify_batch(TRANSCRIPT)
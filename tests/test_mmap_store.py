@@ -0,0 +1,76 @@
+# tests/test_mmap_store.py
+import os
+
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import mmap_store
+from mmap_store import (
+    BUILDS_DIR,
+    export_mmap_index,
+    load_mmap_vectorstore,
+    new_build_dir,
+    publish_build_dir,
+    resolve_index_dir,
+)
+
+
+NAME = "test_index"
+
+
+@pytest.fixture
+def embeddings():
+    return DeterministicFakeEmbedding(size=8)
+
+
+def build(folder, texts, embeddings) -> str:
+    """texts로 빌드 폴더 하나를 만들어 공개하고 그 경로를 반환합니다."""
+    vectorstore = FAISS.from_texts(texts, embeddings)
+    build_dir = new_build_dir(folder, NAME)
+    export_mmap_index(vectorstore, build_dir, NAME)
+    publish_build_dir(folder, NAME, build_dir)
+    return build_dir
+
+
+def contents(index_dir, embeddings) -> list:
+    vectorstore = load_mmap_vectorstore(index_dir, NAME, embeddings)
+    try:
+        return [vectorstore.docstore.search(str(i)).page_content for i in range(vectorstore.index.ntotal)]
+    finally:
+        vectorstore.docstore.close()
+
+
+def test_without_pointer_resolves_to_flat_folder(tmp_path):
+    assert resolve_index_dir(str(tmp_path), NAME) == str(tmp_path)
+
+
+def test_publish_swaps_whole_build(tmp_path, embeddings):
+    folder = str(tmp_path)
+    first = build(folder, ["가", "나"], embeddings)
+    assert resolve_index_dir(folder, NAME) == first
+    assert contents(first, embeddings) == ["가", "나"]
+
+    second = build(folder, ["다", "라", "마"], embeddings)
+    assert resolve_index_dir(folder, NAME) == second
+    assert contents(resolve_index_dir(folder, NAME), embeddings) == ["다", "라", "마"]
+    # 새 빌드는 별도 폴더에 쓰므로 이전 빌드의 파일은 그대로 (읽는 중인 쪽이 계속 사용 가능)
+    assert contents(first, embeddings) == ["가", "나"]
+
+
+def test_publish_keeps_previous_build_and_prunes_older(tmp_path, monkeypatch):
+    folder = str(tmp_path)
+    builds = os.path.join(folder, BUILDS_DIR)
+    os.makedirs(builds)
+    for name in ("a", "b", "c", "d"):
+        os.makedirs(os.path.join(builds, f"{NAME}-2026010{ord(name) - 96}-000000-{name}"))
+    monkeypatch.setattr(mmap_store, "KEEP_PREVIOUS_BUILDS", 1)
+
+    publish_build_dir(folder, NAME, os.path.join(builds, f"{NAME}-20260103-000000-c"))
+
+    # 공개한 빌드, 직전 빌드 하나, 아직 공개되지 않은 더 새로운 빌드만 남음
+    assert sorted(os.listdir(builds)) == [
+        f"{NAME}-20260102-000000-b",
+        f"{NAME}-20260103-000000-c",
+        f"{NAME}-20260104-000000-d",
+    ]
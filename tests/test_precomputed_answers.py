@@ -0,0 +1,74 @@
+# tests/test_precomputed_answers.py
+import json
+import os
+
+os.environ.setdefault("GOOGLE_API_KEY", "test")  # run_chain은 import 시 키를 확인
+
+from rag_engine.precomputed_answers import META_NAME, PrecomputedAnswerStore, _entry_key
+from rag_engine.run_chain import RagEngine
+
+
+NAME = "test_index"
+
+
+# --- 인덱스 내용 버전 ---
+
+def write(path, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_content_version_covers_every_index_file(tmp_path):
+    faiss_path, pkl_path = tmp_path / f"{NAME}.faiss", tmp_path / f"{NAME}.pkl"
+    write(faiss_path, b"vectors")
+    write(pkl_path, b"docstore v1")
+    engine = RagEngine(db_path=str(tmp_path), db_name=NAME, index_format="pickle")
+
+    first = engine.index_content_version()
+    write(pkl_path, b"docstore v2")  # 벡터는 그대로, 문서만 바뀐 재빌드
+    second = engine.index_content_version()
+    write(pkl_path, b"docstore v1")  # 내용이 같으면 수정시각이 달라도 같은 버전
+
+    assert first is not None and second != first
+    assert engine.index_content_version() == first
+
+
+def test_content_version_is_none_without_index(tmp_path):
+    assert RagEngine(db_path=str(tmp_path), db_name=NAME, index_format="pickle").index_content_version() is None
+
+
+# --- 저장소 ---
+
+def publish_answers(directory, answers: dict, version: str, mtime: int) -> None:
+    """{진단 결과: 답변} → answers-<version>.bin + answers.json"""
+    data, entries = b"", {}
+    for diagnosis, answer in answers.items():
+        encoded = answer.encode("utf-8")
+        entries[_entry_key(diagnosis)] = [len(data), len(encoded)]
+        data += encoded
+    data_file = f"answers-{version}.bin"
+    write(os.path.join(directory, data_file), data)
+    meta_path = os.path.join(directory, META_NAME)
+    meta = {"index_version": "idx", "prompt_version": "prompt", "data_file": data_file, "entries": entries}
+    write(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+    os.utime(meta_path, ns=(mtime, mtime))
+
+
+def test_store_reopens_on_change_and_closes_previous_mapping(tmp_path):
+    store = PrecomputedAnswerStore(str(tmp_path))
+    publish_answers(str(tmp_path), {"피해자 결정": "첫 답변"}, "a", mtime=1_000_000_000)
+
+    assert store.get("피해자 결정", None, "idx", "prompt") == "첫 답변"
+    assert store.get("피해자 결정", None, "other", "prompt") is None
+    previous = store._opened
+
+    publish_answers(str(tmp_path), {"피해자 결정": "새 답변"}, "b", mtime=2_000_000_000)
+
+    assert store.get("피해자 결정", None, "idx", "prompt") == "새 답변"
+    assert previous[2].closed and previous[3].closed
+
+    current = store._opened
+    store.close()
+    assert current[2].closed and store._opened is None
+    assert store.get("피해자 결정", None, "idx", "prompt") == "새 답변"  # 닫은 뒤에도 다시 엶
+    store.close()
@@ -0,0 +1,102 @@
+# tests/test_reranker.py
+import threading
+
+import pytest
+
+import reranker
+from reranker import CrossEncoderReranker
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeModel:
+    """본문 길이를 점수로 주고, 추론 한 번에 step초가 걸리는 모델"""
+
+    def __init__(self, clock: FakeClock, step: float = 0.0):
+        self.clock = clock
+        self.step = step
+        self.calls = 0
+
+    def predict(self, pairs, batch_size=None, show_progress_bar=False):
+        self.calls += 1
+        self.clock.now += self.step
+        return [float(len(text)) for _, text in pairs]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(reranker.time, "monotonic", fake)
+    return fake
+
+
+CANDIDATES = [("a", "x"), ("b", "xxx"), ("c", "xx"), ("d", "xxxx")]
+
+
+def test_rerank_orders_by_score(clock):
+    model = FakeModel(clock)
+    order, reranked = CrossEncoderReranker(model=model, batch_size=2).rerank("질문", CANDIDATES, 2)
+
+    assert reranked
+    assert order == [3, 1]
+    assert model.calls == 2
+
+
+def test_budget_exceeded_by_last_batch_falls_back_to_retrieval_order(clock):
+    # 배치가 하나뿐이어도 추론이 예산을 넘기면 검색 순서로 대체
+    model = FakeModel(clock, step=1.0)
+    rr = CrossEncoderReranker(model=model, batch_size=16, time_budget=0.5)
+
+    order, reranked = rr.rerank("질문", CANDIDATES, 2)
+
+    assert not reranked
+    assert order == [0, 1]
+    assert rr.counters["timeouts"] == 1
+    assert rr.counters["scored_pairs"] == 4
+
+
+def test_budget_exceeded_mid_way_stops_scoring(clock):
+    model = FakeModel(clock, step=0.3)
+    rr = CrossEncoderReranker(model=model, batch_size=1, time_budget=0.5)
+
+    order, reranked = rr.rerank("질문", CANDIDATES, 3)
+
+    assert not reranked
+    assert order == [0, 1, 2]
+    assert model.calls == 2
+
+
+def test_cached_scores_skip_the_model(clock):
+    model = FakeModel(clock, step=1.0)
+    rr = CrossEncoderReranker(model=model, batch_size=16, time_budget=0.5)
+    rr.rerank("질문", CANDIDATES, 2)  # 예산은 넘겼지만 점수는 캐시에 남음
+
+    order, reranked = rr.rerank("질문", CANDIDATES, 2)
+
+    assert reranked
+    assert order == [3, 1]
+    assert model.calls == 1
+    assert rr.counters["cache_hits"] == 4
+
+
+def test_counters_are_consistent_under_concurrency():
+    rr = CrossEncoderReranker(model=FakeModel(FakeClock()), batch_size=2, time_budget=60)
+
+    def work(n):
+        for i in range(200):
+            rr.rerank(f"질문 {n} {i}", CANDIDATES, 2)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert rr.counters["requests"] == 8 * 200
+    assert rr.counters["scored_pairs"] == 8 * 200 * len(CANDIDATES)
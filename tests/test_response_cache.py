@@ -0,0 +1,129 @@
+# tests/test_response_cache.py
+import threading
+
+import pytest
+
+from response_cache import ResponseCache
+
+
+KEY = ("tbLnOpendataRtmsV", "11140", "2025", 1, 100)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Loader:
+    """호출 횟수를 세고, gate가 있으면 열릴 때까지 기다렸다가 응답하는 loader"""
+
+    def __init__(self, content: bytes = None, gate: threading.Event = None):
+        self.content = content
+        self.gate = gate
+        self.calls = 0
+        self.started = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        if self.gate is not None:
+            assert self.gate.wait(5)
+        return self.content
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), ttl=100, stale=1000, clock=clock)
+    yield cache
+    cache.shutdown()
+
+
+def refresh_threads() -> list:
+    return [t for t in threading.enumerate() if t.name.startswith("response-cache")]
+
+
+def test_fresh_entry_skips_loader(cache, clock):
+    assert cache.fetch(KEY, Loader(b"v1")) == b"v1"
+
+    clock.now += 99
+    loader = Loader(b"v2")
+    assert cache.fetch(KEY, loader) == b"v1"
+    assert loader.calls == 0
+
+
+def test_stale_entry_is_served_while_refreshing_in_background(cache, clock):
+    cache.fetch(KEY, Loader(b"v1"))
+    clock.now += 150  # TTL은 지났고 stale 기간 안
+
+    gate = threading.Event()
+    loader = Loader(b"v2", gate)
+    assert cache.fetch(KEY, loader) == b"v1"  # 갱신을 기다리지 않음
+    assert cache.fetch(KEY, loader) == b"v1"  # 진행 중인 갱신이 있으면 다시 시작하지 않음
+
+    gate.set()
+    cache.shutdown()  # 진행 중인 갱신이 끝날 때까지 기다림
+
+    assert loader.calls == 1
+    assert cache.fetch(KEY, Loader(b"v3")) == b"v2"  # 갱신 시각 기준으로 다시 유효
+    assert refresh_threads() == []
+
+
+def test_failed_background_refresh_keeps_stale_entry(cache, clock):
+    cache.fetch(KEY, Loader(b"v1"))
+    clock.now += 150
+
+    assert cache.fetch(KEY, Loader(None)) == b"v1"
+    cache.shutdown()
+
+    loader = Loader(b"v2")
+    assert cache.fetch(KEY, loader) == b"v1"  # 여전히 stale → 다시 백그라운드 갱신
+    cache.shutdown()
+    assert loader.calls == 1
+
+
+def test_expired_entry_loads_synchronously_and_falls_back_on_error(cache, clock):
+    cache.fetch(KEY, Loader(b"v1"))
+    clock.now += 1200  # stale 기간도 지남
+
+    assert cache.fetch(KEY, Loader(None)) == b"v1"  # 호출 실패 → 남아 있는 캐시
+    assert cache.fetch(KEY, Loader(b"v2")) == b"v2"
+    assert refresh_threads() == []
+
+
+def test_invalid_response_is_not_stored(cache):
+    assert cache.fetch(KEY, Loader(b"error"), validate=lambda content: False) is None
+    assert cache.get(KEY) is None
+
+
+def test_shutdown_without_wait_cancels_pending_refreshes(cache, clock):
+    keys = [KEY[:3] + (start, start + 99) for start in (1, 101, 201)]
+    for key in keys:
+        cache.fetch(key, Loader(b"v1"))
+    clock.now += 150
+
+    gate = threading.Event()
+    loaders = [Loader(b"v2", gate) for _ in keys]
+    for key, loader in zip(keys, loaders):
+        cache.fetch(key, loader)  # 작업 스레드 2개 → 세 번째 갱신은 대기열에
+    assert loaders[0].started.wait(5) and loaders[1].started.wait(5)
+
+    cache.shutdown(wait=False)
+    gate.set()
+    for thread in refresh_threads():
+        thread.join(5)
+
+    assert [loader.calls for loader in loaders] == [1, 1, 0]
+
+    # 취소된 키도 다음 조회에서 다시 갱신할 수 있음
+    loader = Loader(b"v3")
+    assert cache.fetch(keys[2], loader) == b"v1"
+    cache.shutdown()
+    assert loader.calls == 1
@@ -0,0 +1,140 @@
+# tests/test_run_chain.py
+import json
+import os
+
+import pytest
+
+os.environ.setdefault("GOOGLE_API_KEY", "test")  # run_chain은 import 시 키를 확인 (LLM은 가짜로 대체)
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from rag_engine import run_chain
+from rag_engine.mmap_store import export_mmap_index, new_build_dir, publish_build_dir
+from rag_engine.run_chain import RagEngine
+
+
+NAME = "test_index"
+
+
+class FakeEmbeddings(DeterministicFakeEmbedding):
+    """EmbeddingService처럼 embed_queries를 제공하는 결정적 임베딩"""
+
+    def embed_queries(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+class RateLimited(Exception):
+    pass
+
+
+class Response:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeGeneration:
+    """질문과 context를 그대로 답변으로 돌려주고, rate_limited 질문은 첫 시도에 429로 실패하는 생성 체인"""
+
+    def __init__(self, rate_limited=(), on_batch=None):
+        self.rate_limited = set(rate_limited)
+        self.on_batch = on_batch
+        self.calls = []
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        self.calls.append([x["user_query"] for x in inputs])
+        if self.on_batch is not None:
+            self.on_batch()
+        outputs = []
+        for x in inputs:
+            if x["user_query"] in self.rate_limited:
+                self.rate_limited.discard(x["user_query"])
+                outputs.append(RateLimited("429 Resource has been exhausted"))
+            else:
+                outputs.append(Response(f"{x['user_query']}|{x['context']}"))
+        return outputs
+
+
+def publish(folder, texts, embeddings) -> None:
+    build_dir = new_build_dir(folder, NAME)
+    export_mmap_index(FAISS.from_texts(texts, embeddings), build_dir, NAME)
+    publish_build_dir(folder, NAME, build_dir)
+
+
+OLD_TEXTS = [f"이전 문서 {i}" for i in range(6)]
+NEW_TEXTS = [f"새 문서 {i}" for i in range(6)]
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    embeddings = FakeEmbeddings(size=8)
+    publish(str(tmp_path), OLD_TEXTS, embeddings)
+    engine = RagEngine(db_path=str(tmp_path), db_name=NAME, reload_check_interval=3600, top_k=2, hybrid=False)
+    engine._embeddings = embeddings
+    engine._generation_chain = FakeGeneration()
+    monkeypatch.setattr(run_chain, "_ENGINE", engine)
+    monkeypatch.setattr(run_chain.time, "sleep", lambda seconds: None)
+    return engine
+
+
+def items(n):
+    return [(f"상황 {i}", f"질문 {i}", "중구") for i in range(n)]
+
+
+def test_batch_rag_responses_keeps_order_and_writes_jsonl(engine, tmp_path):
+    output = tmp_path / "answers.jsonl"
+
+    results = run_chain.batch_rag_responses(items(5), output_path=str(output), chunk_size=2)
+
+    assert [r["index"] for r in results] == list(range(5))
+    for i, result in enumerate(results):
+        assert result["answer"].startswith(f"질문 {i}|")
+        assert "📞 중구 연락처" in result["answer"]
+        assert result["error"] is None and result["cached"] is False
+
+    lines = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(line["index"] for line in lines) == list(range(5))
+    assert {line["index"]: line["answer"] for line in lines} == {r["index"]: r["answer"] for r in results}
+    assert engine.generation_chain.calls == [["질문 0", "질문 1"], ["질문 2", "질문 3"], ["질문 4"]]
+
+
+def test_batch_retries_only_rate_limited_inputs(engine):
+    engine._generation_chain = FakeGeneration(rate_limited={"질문 1"})
+
+    results = run_chain.batch_rag_responses(items(3))
+
+    assert all(r["error"] is None for r in results)
+    assert results[1]["answer"].startswith("질문 1|")
+    assert engine.generation_chain.calls == [["질문 0", "질문 1", "질문 2"], ["질문 1"]]
+
+
+def test_batch_gives_up_after_max_retries(engine):
+    engine._generation_chain = FakeGeneration(rate_limited={"질문 0"})
+
+    results = engine.batch(
+        [{"user_situation": "상황", "user_query": "질문 0"}], max_retries=0
+    )
+
+    assert results[0]["answer"] is None
+    assert "429" in results[0]["error"]
+
+
+def test_batch_reads_chunks_from_the_index_it_searched(engine, tmp_path, monkeypatch):
+    """다중 질의 검색 직후 인덱스가 재로딩되어도 context는 검색한 빌드의 문서로 조립"""
+    search_candidates = engine._dense_candidates
+
+    def reload_then_search(state, limit):
+        publish(str(tmp_path), NEW_TEXTS, engine.embeddings)
+        engine.reload()
+        return search_candidates(state, limit)
+
+    monkeypatch.setattr(engine, "_dense_candidates", reload_then_search)
+
+    results = engine.batch([{"user_situation": "상황", "user_query": f"질문 {i}"} for i in range(3)])
+
+    for result in results:
+        assert "이전 문서" in result["answer"]
+        assert "새 문서" not in result["answer"]
+    # 다음 요청부터는 새 빌드를 사용
+    monkeypatch.setattr(engine, "_dense_candidates", search_candidates)
+    assert "새 문서" in engine.retrieve_context("상황", "질문 0")
@@ -0,0 +1,253 @@
+# tests/test_seoul_api_client.py
+import io
+from datetime import date
+
+import pytest
+
+import seoul_api_client as client
+from seoul_api_client import RateLimiter
+from seoul_stub import page_xml
+
+
+# --- 재시도 / 백오프 ---
+
+def test_retries_5xx_then_succeeds(stub):
+    stub.responses = [(503, b""), (502, b"")]
+
+    total, records = client.fetch_api_page("11140", "2025", 1, 10)
+
+    assert stub.hits == 3
+    assert client.RATE_LIMITER.used_today == 3  # 재시도도 호출 한도에서 1건씩 차감
+    assert total == 3
+    assert [r.thing_amt for r in records] == [30000, 30001, 30002]
+
+
+def test_gives_up_after_max_retries(stub):
+    stub.responses = [(503, b"")] * 3
+
+    assert client.fetch_api_page("11140", "2025", 1, 10) is None
+    assert stub.hits == 3  # 첫 호출 + 재시도 2번
+    assert client.RATE_LIMITER.used_today == 3
+
+
+def test_retries_stop_when_daily_quota_runs_out(stub):
+    client.RATE_LIMITER.daily_quota = 2
+    stub.responses = [(503, b"")] * 3
+
+    assert client.fetch_api_page("11140", "2025", 1, 10) is None
+    assert stub.hits == 2
+    assert client.RATE_LIMITER.used_today == 2
+
+
+def test_retry_waits_for_rate_limiter_slot(monkeypatch):
+    limiter = RateLimiter(max_per_second=0, daily_quota=0)
+    monkeypatch.setattr(client, "RATE_LIMITER", limiter)
+    retry = client.JitterRetry(total=2, backoff_factor=0)
+
+    retry.increment(method="GET", url="/", error=ConnectionError()).sleep()
+
+    assert limiter.used_today == 1
+
+
+def test_backoff_uses_full_jitter(monkeypatch):
+    monkeypatch.setattr(client.random, "uniform", lambda low, high: (low, high))
+    retry = client.JitterRetry(total=5, backoff_factor=0.5)
+    for _ in range(3):
+        retry = retry.increment(method="GET", url="/", error=ConnectionError())
+
+    assert retry.get_backoff_time() == (0, 0.5 * 2 ** 2)
+
+
+# --- 호출 한도 ---
+
+def test_daily_quota_stops_calls(stub):
+    client.RATE_LIMITER.daily_quota = 2
+
+    assert client.fetch_api_page("11140", "2025") is not None
+    assert client.fetch_api_page("11140", "2025") is not None
+    assert client.fetch_api_page("11140", "2025") is None
+    assert stub.hits == 2
+
+
+def test_traffic_exceeded_code_exhausts_quota_for_the_day(stub):
+    stub.responses = [(200, page_xml(0, code="ERROR-337"))]
+
+    assert client.fetch_api_page("11140", "2025") is None
+    assert client.fetch_api_page("11140", "2025") is None
+    assert stub.hits == 1
+    with pytest.raises(client.QuotaExceeded):
+        client.RATE_LIMITER.reserve()
+
+
+def test_traffic_exceeded_code_on_cached_path_exhausts_quota(stub):
+    stub.responses = [(200, page_xml(0, code="ERROR-337"))]
+
+    assert client.call_seoul_rental_api(cgg_cd="11140", rcpt_yr="2025") is None
+    with pytest.raises(client.QuotaExceeded):
+        client.RATE_LIMITER.reserve()
+
+
+def test_rate_limiter_spaces_calls(monkeypatch):
+    limiter = RateLimiter(max_per_second=10, daily_quota=0)
+    monkeypatch.setattr(client.time, "monotonic", lambda: 100.0)
+
+    waits = [limiter.reserve() for _ in range(3)]
+
+    assert waits == pytest.approx([0.0, 0.1, 0.2])
+    assert limiter.used_today == 3
+
+
+# --- 결과 코드 ---
+
+def test_no_data_code_is_an_empty_page(stub):
+    stub.responses = [(200, page_xml(0, code="INFO-200"))]
+
+    total, records = client.fetch_api_page("11140", "2025")
+    assert (total, list(records)) == (0, [])
+
+
+def test_error_code_returns_none(stub):
+    stub.responses = [(200, page_xml(0, code="ERROR-500"))]
+
+    assert client.fetch_api_page("11140", "2025") is None
+
+
+def test_http_error_status_returns_none(stub):
+    stub.responses = [(404, b"")]
+
+    assert client.call_seoul_rental_api(cgg_cd="11140", rcpt_yr="2025", use_cache=False) is None
+
+
+def test_error_responses_are_not_cached(stub):
+    stub.responses = [(200, page_xml(0, code="ERROR-500"))]
+
+    assert client.call_seoul_rental_api(cgg_cd="11140", rcpt_yr="2025") is None
+    data = client.call_seoul_rental_api(cgg_cd="11140", rcpt_yr="2025")
+    assert len(data) == 3
+    assert client.call_seoul_rental_api(cgg_cd="11140", rcpt_yr="2025") == data
+    assert stub.hits == 2
+
+
+def test_request_path_order(stub):
+    client.fetch_api_page("11140", "2025", 1, 10)
+
+    assert stub.paths == [f"/{client.SEOUL_API_KEY}/xml/tbLnOpendataRtmsV/1/10/2025/11140"]
+
+
+# --- 스트리밍 파싱 / 응답 검증 ---
+
+def test_parse_api_page_reads_rows_lazily():
+    body = page_xml(2000)
+    source = io.BytesIO(body)
+
+    total, records = client.parse_api_page(source)
+
+    assert total == 2000
+    assert source.tell() < len(body) // 10  # 결과 코드까지만 읽음
+    assert next(records).thing_amt == 30000
+    assert sum(1 for _ in records) == 1999
+
+
+def test_truncated_body_raises_while_streaming(stub):
+    stub.responses = [(200, page_xml(3)[:-40])]
+
+    total, records = client.fetch_api_page("11140", "2025")
+
+    assert total == 3
+    with pytest.raises(client.ResponseStreamError):
+        list(records)
+
+
+def test_validation_reads_result_code_only_without_side_effects(monkeypatch):
+    limiter = RateLimiter(max_per_second=0, daily_quota=0)
+    monkeypatch.setattr(client, "RATE_LIMITER", limiter)
+
+    assert client.is_valid_response(page_xml(3)[:-40])  # 행이 깨졌어도 결과 코드만 확인
+    assert not client.is_valid_response(page_xml(0, code="ERROR-500"))
+    assert not client.is_valid_response(b"<tbLnOpendataRtmsV><RESULT>")
+
+    assert not client.is_valid_response(page_xml(0, code="ERROR-337"))
+    limiter.reserve()  # 검증만으로는 한도를 소진 처리하지 않음
+
+
+# --- 유사 매물 검색 ---
+
+def test_search_similar_property_compares_recent_contracts(monkeypatch):
+    from comparables import ComparablesFrame, months_ago
+
+    recent, old = int(months_ago(1)), int(months_ago(36))
+    rows = [(11140, "신당동", "아파트", recent, 25000, 59.0, "")] * 5
+    rows += [(11140, "신당동", "아파트", old, 15000, 59.0, "")] * 5
+    frame = ComparablesFrame.from_rows(rows)
+    monkeypatch.setattr(client, "load_local_frame", lambda cgg_cd, ctrt_from=None: frame)
+
+    result = client.search_similar_property("서울 중구 신당동 123", 20000)
+    assert result["비교시작일"] == months_ago(client.COMPARABLE_MONTHS)
+    assert (result["유사매물"], result["전세가"]) == (5, 25000 * 10000)
+
+    result = client.search_similar_property("서울 중구 신당동 123", 20000, months=0)
+    assert result["비교시작일"] is None
+    assert (result["유사매물"], result["전세가"]) == (10, 20000 * 10000)
+
+
+# --- 로컬 저장소: 접수연도 경계를 넘는 비교 기간 ---
+
+THIS_YEAR = date.today().year
+WINDOW_FROM = f"{THIS_YEAR - 1}1201"  # 연초의 비교 기간처럼 작년 12월부터
+
+
+def tx(rcpt_yr, day, amount=25000):
+    return {"접수연도": str(rcpt_yr), "자치구코드": "11140", "법정동": "신당동", "계약일": day,
+            "거래금액": amount, "건물면적": 59.0, "건물용도": "아파트"}
+
+
+@pytest.fixture
+def local_store(monkeypatch, tmp_path):
+    from transaction_store import TransactionStore
+
+    store = TransactionStore(str(tmp_path / "transactions.sqlite3"))
+    last, this = THIS_YEAR - 1, THIS_YEAR
+    store.replace_partition("11140", str(last), [
+        tx(last, f"{last}1115", 90000), tx(last, f"{last}1215"), tx(last, f"{last}1228"),
+    ], 3)
+    store.replace_partition("11140", str(this), [
+        tx(this, f"{last}1230"), tx(this, f"{this}0105"), tx(this, f"{this}0110"),
+    ], 3)
+    monkeypatch.setattr(client, "_LOCAL_STORE", store)
+    monkeypatch.setattr(client, "_LOCAL_FRAMES", {})
+    return store
+
+
+def test_local_frame_collects_contracts_across_receipt_years(local_store):
+    frame = client.load_local_frame("11140", WINDOW_FROM)
+
+    days = sorted(int(d) for d in frame.ctrt_day)
+    last, this = THIS_YEAR - 1, THIS_YEAR
+    assert days == [int(f"{last}1215"), int(f"{last}1228"), int(f"{last}1230"), int(f"{this}0105"), int(f"{this}0110")]
+    assert client.load_local_frame("11140", WINDOW_FROM) is frame  # 동기화 상태가 같으면 재사용
+    assert len(client.load_local_frame("11140")) == 6
+
+
+def test_local_frame_is_reloaded_when_a_year_is_synced(local_store):
+    frame = client.load_local_frame("11140", f"{THIS_YEAR - 2}0101")
+    local_store.replace_partition("11140", str(THIS_YEAR - 2), [tx(THIS_YEAR - 2, f"{THIS_YEAR - 2}0301")], 1)
+
+    reloaded = client.load_local_frame("11140", f"{THIS_YEAR - 2}0101")
+
+    assert reloaded is not frame and len(reloaded) == len(frame) + 1
+
+
+def test_local_frame_requires_a_synced_year_in_the_window(local_store):
+    assert client.load_local_frame("11140", f"{THIS_YEAR + 1}0101") is None
+    assert client.load_local_frame("11110", WINDOW_FROM) is None
+
+
+def test_search_similar_property_uses_every_year_in_the_window(local_store, monkeypatch):
+    monkeypatch.setattr(client, "months_ago", lambda months: WINDOW_FROM)
+    monkeypatch.setattr(client, "call_seoul_rental_api", lambda **kwargs: pytest.fail("API를 호출하면 안 됨"))
+
+    result = client.search_similar_property("서울 중구 신당동 123", 25000)
+
+    assert result["데이터출처"] == "서울시 Open API (로컬 저장소)"
+    assert result["비교시작일"] == WINDOW_FROM
+    assert (result["거래건수"], result["유사매물"], result["전세가"]) == (5, 5, 25000 * 10000)
@@ -0,0 +1,158 @@
+# tests/test_transaction_store.py
+from datetime import datetime
+
+import pytest
+
+import transaction_store
+from transaction_store import TransactionStore, sync_transactions
+from seoul_stub import page_xml
+
+
+PAST_YEAR = "2020"
+THIS_YEAR = str(datetime.now().year)
+CGG_CD = "11140"  # 중구
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TransactionStore(str(tmp_path / "transactions.sqlite3"))
+
+
+def sync(store, year=PAST_YEAR, **kwargs):
+    kwargs.setdefault("concurrency", 1)
+    return sync_transactions([year], ["중구"], store, **kwargs)
+
+
+# --- 동기화 ---
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_sync_stores_every_page(stub, store, concurrency):
+    stub.total = 2500  # 1000건 페이지 3개
+
+    summary = sync(store, concurrency=concurrency)
+
+    assert summary == {"updated": 1, "skipped": 0, "failed": 0, "rows": 2500}
+    assert stub.hits == 3
+    assert store.count() == 2500
+    state = store.sync_state(CGG_CD, PAST_YEAR)
+    assert (state["total_count"], state["row_count"], state["max_ctrt_day"]) == (2500, 2500, "20250328")
+
+
+def test_past_year_with_same_count_is_skipped(stub, store):
+    sync(store)
+    synced_at = store.sync_state(CGG_CD, PAST_YEAR)["synced_at"]
+
+    summary = sync(store)
+
+    assert summary["skipped"] == 1 and summary["updated"] == 0
+    assert stub.hits == 2  # 두 번째 동기화는 첫 페이지만
+    assert store.sync_state(CGG_CD, PAST_YEAR)["synced_at"] == synced_at
+
+
+def test_past_year_with_changed_count_is_refetched(stub, store):
+    sync(store)
+    stub.total = 5
+
+    summary = sync(store)
+
+    assert summary["updated"] == 1
+    assert store.count() == 5
+
+
+def test_recent_year_is_always_refreshed(stub, store):
+    sync(store, THIS_YEAR)
+
+    summary = sync(store, THIS_YEAR)
+
+    assert summary["updated"] == 1 and summary["skipped"] == 0
+    assert store.count() == 3
+
+
+def test_force_refetches_unchanged_past_year(stub, store):
+    sync(store)
+
+    summary = sync(store, force=True)
+
+    assert summary["updated"] == 1 and summary["skipped"] == 0
+    assert store.count() == 3
+
+
+def test_refresh_recent_years_setting(stub, store, monkeypatch):
+    monkeypatch.setattr(transaction_store, "REFRESH_RECENT_YEARS", datetime.now().year - int(PAST_YEAR) + 1)
+    sync(store)
+
+    assert sync(store)["updated"] == 1
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_failed_page_keeps_existing_rows(stub, store, concurrency):
+    stub.total = 2500
+    sync(store)
+    stub.total = 2600
+    stub.responses = [(200, page_xml(1000, total=2600, year=PAST_YEAR)), (404, b"")]
+
+    summary = sync(store, concurrency=concurrency)
+
+    assert summary == {"updated": 0, "skipped": 0, "failed": 1, "rows": 0}
+    assert store.count() == 2500
+    assert store.sync_state(CGG_CD, PAST_YEAR)["total_count"] == 2500
+
+
+def test_failed_first_page_is_reported(stub, store):
+    stub.responses = [(404, b"")]
+
+    summary = sync(store)
+
+    assert summary["failed"] == 1
+    assert not store.is_synced(CGG_CD, PAST_YEAR)
+
+
+# --- 조회 ---
+
+def record(cgg_cd="11140", year="2024", dong_cd="11140101", day="20240315", amount=30000):
+    return {"접수연도": year, "자치구코드": cgg_cd, "법정동코드": dong_cd, "법정동": "신당동",
+            "계약일": day, "거래금액": amount, "건물면적": 59.5, "건물용도": "아파트"}
+
+
+@pytest.fixture
+def filled(store):
+    store.replace_partition("11140", "2024", [
+        record(day="20240110"), record(day="20240315"), record(day="20241231", dong_cd="11140102"),
+    ], 3)
+    store.replace_partition("11140", "2025", [record(year="2025", day="20250105")], 1)
+    store.replace_partition("11110", "2024", [record(cgg_cd="11110", dong_cd="11110101")], 1)
+    return store
+
+
+def days(rows):
+    return [row["계약일"] for row in rows]
+
+
+def test_query_filters_by_district_year_and_dong(filled):
+    assert days(filled.query(cgg_cd="11140")) == ["20250105", "20241231", "20240315", "20240110"]
+    assert days(filled.query(cgg_cd="11140", rcpt_yr="2024")) == ["20241231", "20240315", "20240110"]
+    assert days(filled.query(stdg_cd="11140102")) == ["20241231"]
+    assert len(filled.query()) == 5
+
+
+def test_query_contract_day_range_is_inclusive_across_years(filled):
+    rows = filled.query(cgg_cd="11140", ctrt_from="20240315", ctrt_to="20250105")
+
+    assert days(rows) == ["20250105", "20241231", "20240315"]
+    assert {row["접수연도"] for row in rows} == {"2024", "2025"}
+
+
+def test_query_limit_and_result_format(filled):
+    rows = filled.query(cgg_cd="11140", limit=2)
+
+    assert days(rows) == ["20250105", "20241231"]
+    assert rows[0]["거래금액"] == 30000 and rows[0]["건물면적"] == 59.5
+    assert set(rows[0]) == {key for key, _, _ in transaction_store.FIELDS}
+
+
+def test_replace_partition_only_touches_its_partition(filled):
+    filled.replace_partition("11140", "2024", [record(day="20240601")], 1)
+
+    assert days(filled.query(cgg_cd="11140")) == ["20250105", "20240601"]
+    assert filled.count() == 3
+    assert filled.sync_state("11140", "2024")["max_ctrt_day"] == "20240601"